@@ -25,7 +25,12 @@ from PartSeg._roi_analysis.partseg_settings import PartSettings
 from PartSeg.common_gui.searchable_combo_box import SearchComboBox
 from PartSeg.common_gui.universal_gui_part import ChannelComboBox
 from PartSeg.common_gui.waiting_dialog import ExecuteFunctionDialog
-from PartSegCore.analysis.measurement_calculation import FILE_NAME_STR, MeasurementProfile, MeasurementResult
+from PartSegCore.analysis.measurement_calculation import (
+    FILE_NAME_STR,
+    MeasurementCache,
+    MeasurementProfile,
+    MeasurementResult,
+)
 from PartSegCore.universal_const import Units
 
 NO_MEASUREMENT_STRING = "<none>"
@@ -137,6 +142,7 @@ class MeasurementWidgetBase(QWidget):
         self.settings = settings
         self.segment = segment
         self.measurements_storage = MeasurementsStorage()
+        self.measurement_cache = MeasurementCache()
         self.recalculate_button = QPushButton("Recalculate and\n replace measurement", self)
         self.recalculate_button.clicked.connect(self.replace_measurement_result)
         self.recalculate_append_button = QPushButton("Recalculate and\n append measurement", self)
@@ -378,6 +384,7 @@ class MeasurementWidget(MeasurementWidgetBase):
         dial = ExecuteFunctionDialog(
             compute_class.calculate,
             [self.settings.image, self.channels_chose.currentIndex(), self.settings.roi_info, units],
+            {"cache": self.measurement_cache, "max_workers": None},
             text="Measurement calculation",
         )  # , exception_hook=exception_hook)
         dial.exec_()
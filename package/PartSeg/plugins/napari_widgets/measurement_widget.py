@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from magicgui.widgets import create_widget
 from napari import Viewer
@@ -17,6 +17,7 @@ from PartSegCore.roi_info import ROIInfo
 
 if TYPE_CHECKING:
     from PartSegCore.analysis.measurement_calculation import MeasurementProfile, MeasurementResult
+    from PartSegImage import Image
 
 
 class NapariMeasurementSettings(MeasurementSettings):
@@ -43,10 +44,45 @@ class NapariMeasurementWidget(MeasurementWidgetBase):
         self.file_names.setCurrentEnum(FileNamesEnum.No)
         self.file_names.setVisible(False)
         self.file_names_label.setVisible(False)
+        self._measurement_data: Optional[Tuple[list, "Image", ROIInfo]] = None
+        self._painted_layers: List[Labels] = []
 
     def _get_mask(self):
         return self.mask_chose.value
 
+    def _clear_measurement_data(self, event=None):
+        for layer in self._painted_layers:
+            layer.events.paint.disconnect(self._clear_measurement_data)
+        self._painted_layers = []
+        self._measurement_data = None
+
+    def _get_measurement_data(self, compute_class: "MeasurementProfile") -> Tuple["Image", ROIInfo]:
+        """
+        Create image and roi for measurement. They are reused while selected layers, their data and scale
+        are not changed, so values from :py:attr:`measurement_cache` could be used.
+        """
+        layer_names = (self.channels_chose.value.name, *compute_class.get_channels_num())
+        layers = [self.napari_viewer.layers[name] for name in dict.fromkeys(layer_names)]
+        layers += [self.roi_chose.value, self.mask_chose.value]
+        key = [(layer, getattr(layer, "data", None), tuple(getattr(layer, "scale", ()))) for layer in layers]
+        if self._measurement_data is not None:
+            old_key, image, roi_info = self._measurement_data
+            if len(old_key) == len(key) and all(
+                x[0] is y[0] and x[1] is y[1] and x[2] == y[2] for x, y in zip(old_key, key)
+            ):
+                return image, roi_info
+        self._clear_measurement_data()
+        image = generate_image(self.napari_viewer, *layer_names)
+        if self.mask_chose.value is not None:
+            image.set_mask(self.mask_chose.value.data)
+        roi_info = ROIInfo(self.roi_chose.value.data).fit_to_image(image)
+        # labels could be painted in place
+        self._painted_layers = [layer for layer in layers[-2:] if layer is not None]
+        for layer in self._painted_layers:
+            layer.events.paint.connect(self._clear_measurement_data)
+        self._measurement_data = key, image, roi_info
+        return image, roi_info
+
     def append_measurement_result(self):
         try:
             compute_class = self.settings.measurement_profiles[self.measurement_type.currentText()]
@@ -62,13 +98,11 @@ class NapariMeasurementWidget(MeasurementWidgetBase):
                 show_info(f"Cannot calculate this measurement because image do not have layer {name}")
                 return
         units = self.units_choose.currentEnum()
-        image = generate_image(self.napari_viewer, self.channels_chose.value.name, *compute_class.get_channels_num())
-        if self.mask_chose.value is not None:
-            image.set_mask(self.mask_chose.value.data)
-        roi_info = ROIInfo(self.roi_chose.value.data).fit_to_image(image)
+        image, roi_info = self._get_measurement_data(compute_class)
         dial = ExecuteFunctionDialog(
             compute_class.calculate,
             [image, self.channels_chose.value.name, roi_info, units],
+            {"cache": self.measurement_cache, "max_workers": None},
             text="Measurement calculation",
             parent=self,
         )  # , exception_hook=exception_hook)
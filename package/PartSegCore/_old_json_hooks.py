@@ -1,6 +1,7 @@
+import sys
+
 import local_migrator
 import numpy as np
-from napari.utils import Colormap
 
 from PartSegCore.algorithm_describe_base import ROIExtractionProfile
 from PartSegCore.class_generator import SerializeClassEncoder
@@ -8,6 +9,12 @@ from PartSegCore.color_image.base_colors import Color
 from PartSegCore.image_operations import RadiusType
 
 
+def _is_napari_colormap(obj) -> bool:
+    """Check type without importing napari, so it is not loaded in headless usage (like batch cli)"""
+    napari_utils = sys.modules.get("napari.utils")
+    return napari_utils is not None and isinstance(obj, napari_utils.Colormap)
+
+
 class ProfileEncoder(SerializeClassEncoder):
     """
     Json encoder for :py:class:`ProfileDict`, :py:class:`RadiusType`,
@@ -27,7 +34,7 @@ class ProfileEncoder(SerializeClassEncoder):
             return {"__RadiusType__": True, "value": o.value}
         if isinstance(o, ROIExtractionProfile):
             return {"__SegmentationProfile__": True, "name": o.name, "algorithm": o.algorithm, "values": o.values}
-        if isinstance(o, Colormap):
+        if _is_napari_colormap(o):
             return {
                 "__Colormap__": True,
                 "name": o.name,
@@ -135,6 +142,8 @@ def profile_hook(dkt):
             if any(isinstance(c, Color) for c in colors):
                 colors = [c.as_tuple() if isinstance(c, Color) else (*c, 1) for c in colors]
 
+            from napari.utils import Colormap
+
             return Colormap(colors, controls=positions)
         if "__Serializable__" in dkt and dkt["__subtype__"] == "PartSegCore.color_image.base_colors.ColorPosition":
             return (dkt["color_position"], dkt["color"])
@@ -148,6 +157,8 @@ def profile_hook(dkt):
             if dkt["controls"][-1] != 1:
                 dkt["controls"].append(1)
                 dkt["colors"].append(dkt["colors"][-1])
+            from napari.utils import Colormap
+
             return Colormap(**dkt)
     except Exception as e:  # pylint: disable=broad-except
         if problematic_fields := local_migrator.check_for_errors_in_dkt_values(dkt2):
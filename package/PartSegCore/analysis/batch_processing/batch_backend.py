@@ -17,6 +17,8 @@ Calculation hierarchy:
       "FileData"[shape=rectangle];
       "SheetData"[shape=rectangle];
       "DataWriter" -> "FileData" -> "SheetData"[arrowhead="crow"];
+      "ResultSpool"[shape=rectangle];
+      "FileData" -> "ResultSpool";
    }
 
 """
@@ -24,13 +26,18 @@ Calculation hierarchy:
 from __future__ import annotations
 
 import contextlib
+import hashlib
+import importlib.util
 import json
 import logging
 import math
 import os
+import pickle  # nosec
+import tempfile
 import threading
 import traceback
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
+from copy import copy
 from enum import Enum
 from os import path
 from queue import Queue
@@ -65,6 +72,7 @@ from PartSegCore.analysis.calculation_plan import (
 from PartSegCore.analysis.io_utils import ProjectTuple
 from PartSegCore.analysis.load_functions import LoadImageForBatch, LoadMaskSegmentation, LoadProject
 from PartSegCore.analysis.measurement_base import has_mask_components, has_roi_components
+from PartSegCore.analysis.measurement_calculation import MeasurementCache
 from PartSegCore.analysis.save_functions import save_dict
 from PartSegCore.json_hooks import PartSegEncoder
 from PartSegCore.mask_create import calculate_mask
@@ -72,7 +80,7 @@ from PartSegCore.project_info import AdditionalLayerDescription, HistoryElement
 from PartSegCore.roi_info import ROIInfo
 from PartSegCore.segmentation.algorithm_base import ROIExtractionAlgorithm, report_empty_fun
 from PartSegCore.utils import iterate_names
-from PartSegImage import Image, TiffImageReader
+from PartSegImage import GenericImageReader, Image, TiffImageReader
 
 if TYPE_CHECKING:
     import uuid
@@ -86,6 +94,8 @@ if TYPE_CHECKING:
 # page with excel limits
 MAX_CHAR_IN_EXCEL_CELL = 30_000  # real limit is 32_767 but it is better to have some margin
 MAX_ROWS_IN_EXCEL_CELL = 50  # real limit is 253 but 50 provides better readability
+# image data, roi, masks and temporary arrays of segmentation algorithms
+MEMORY_ESTIMATION_FACTOR = 4
 
 
 class ResponseData(NamedTuple):
@@ -148,6 +158,82 @@ def do_calculation(file_info: tuple[int, str], calculation: BaseCalculation) ->
         return index, [prepare_error_data(e)]
 
 
+def estimate_calculation_memory(file_info: tuple[int, str], calculation: BaseCalculation) -> int:
+    """
+    Estimate memory (in bytes) needed for calculation of single file.
+    For images size of data is read from file header, for projects the size of file is used.
+
+    :param file_info: index and path to file which should be processed
+    :param calculation: calculation description
+    """
+    _, file_path = file_info
+    root_type = calculation.calculation_plan.get_root_type()
+    if root_type == RootType.Image and path.splitext(file_path)[1].lower() in LoadImageForBatch.get_extensions():
+        size = GenericImageReader.estimate_image_size(file_path)
+    else:
+        size = os.path.getsize(file_path)
+    return size * MEMORY_ESTIMATION_FACTOR
+
+
+class ResultCache:
+    """
+    On disk cache for intermediate results of :py:class:`CalculationProcess` (ROI and masks).
+    Key of each entry is hash of processed file content and operations on path from root
+    of :py:class:`.CalculationTree` to given node, so change of one branch of the plan
+    does not invalidate results of other branches.
+
+    :param cache_dir: directory where cached data are stored
+    """
+
+    suffix = ".partseg_cache"
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def file_hash(file_path: str) -> str:
+        """Calculate hash of file content"""
+        hasher = hashlib.sha256()
+        with open(file_path, "rb") as f_p:
+            for chunk in iter(lambda: f_p.read(2**20), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def key(parent_key: str, *parts: Any) -> str:
+        """Create key for node based on key of parent node and data describing node"""
+        hasher = hashlib.sha256(parent_key.encode())
+        hasher.update(json.dumps(parts, cls=PartSegEncoder, sort_keys=True).encode())
+        return hasher.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + self.suffix)
+
+    def load(self, key: str) -> Any:
+        """
+        Load cached data.
+
+        :return: cached data or None if there is no valid entry for key
+        """
+        try:
+            with open(self._path(key), "rb") as f_p:
+                return pickle.load(f_p)  # nosec  # noqa: S301
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, AttributeError):
+            return None
+
+    def save(self, key: str, data: Any):
+        """Save data in cache. Data are written to temporary file first, so parallel workers do not conflict."""
+        file_path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=self.suffix, dir=os.path.dirname(file_path))
+            with os.fdopen(fd, "wb") as f_p:
+                pickle.dump(data, f_p, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, file_path)
+        except OSError:  # pragma: no cover
+            logging.warning("Cannot save cache entry %s", file_path, exc_info=True)
+
+
 class CalculationProcess:
     """
     Main class to calculate PartSeg calculation plan.
@@ -167,6 +253,11 @@ class CalculationProcess:
         self.history: list[HistoryElement] = []
         self.algorithm_parameters: dict = {}
         self.results: CalculationResultList = []
+        self.cache: ResultCache | None = None
+        self.cache_key = ""
+        self.mask_key_dict: dict[str, str] = {}
+        self.measurement_cache = MeasurementCache()
+        self._measurement_image: tuple[Image, np.ndarray | None, Image] | None = None
 
     def _reset_image_cache(self):
         self.image = None
@@ -177,6 +268,10 @@ class CalculationProcess:
         self.algorithm_parameters = {}
         self.measurement = []
         self.reused_mask = set()
+        self.cache_key = ""
+        self.mask_key_dict = {}
+        self.measurement_cache.clear()
+        self._measurement_image = None
 
     @staticmethod
     def load_data(operation, calculation: FileCalculation) -> ProjectTuple | list[ProjectTuple]:
@@ -205,11 +300,22 @@ class CalculationProcess:
         self.results = []
         operation = calculation.calculation_plan.execution_tree.operation
         projects = self.load_data(operation, calculation)
+        self.cache = ResultCache(calculation.cache_dir) if calculation.cache_dir else None
+        file_key = ""
+        if self.cache is not None:
+            file_key = ResultCache.key(
+                ResultCache.file_hash(calculation.file_path),
+                operation,
+                calculation.voxel_size,
+                calculation.overwrite_voxel_size,
+            )
 
         if isinstance(projects, ProjectTuple):
             projects = [projects]
-        for project in projects:
+        for i, project in enumerate(projects):
             try:
+                if self.cache is not None:
+                    self.cache_key = ResultCache.key(file_key, i)
                 self.image = project.image
                 if calculation.overwrite_voxel_size:
                     self.image.set_spacing(calculation.voxel_size)
@@ -274,10 +380,12 @@ class CalculationProcess:
             # TODO fix this time bug fix
         except ValueError as e:  # pragma: no cover
             raise ValueError("Mask do not fit to given image") from e
-        old_mask = self.mask
+        old_mask, old_key = self.mask, self.cache_key
         self.mask = mask
+        if self.cache is not None:
+            self.cache_key = ResultCache.key(self.cache_key, operation, ResultCache.file_hash(mask_path))
         self.iterate_over(children)
-        self.mask = old_mask
+        self.mask, self.cache_key = old_mask, old_key
 
     def step_segmentation(self, operation: ROIExtractionProfile, children: list[CalculationTree]):
         """
@@ -286,6 +394,26 @@ class CalculationProcess:
         :param ROIExtractionProfile operation: Specification of segmentation operation
         :param List[CalculationTree] children: list of nodes to iterate over after perform segmentation
         """
+        backup_data = self.roi_info, self.additional_layers, self.algorithm_parameters, self.cache_key
+        cached = None
+        if self.cache is not None:
+            self.cache_key = ResultCache.key(self.cache_key, operation)
+            cached = self.cache.load(self.cache_key)
+        if cached is None:
+            roi_info, additional_layers = self._run_segmentation(operation)
+            if self.cache is not None:
+                self.cache.save(self.cache_key, (roi_info, additional_layers))
+        else:
+            roi_info, additional_layers = cached
+        self.roi_info = roi_info
+        self.additional_layers = additional_layers
+        self.algorithm_parameters = {"algorithm_name": operation.algorithm, "values": operation.values}
+        self.iterate_over(children)
+        self.roi_info, self.additional_layers, self.algorithm_parameters, self.cache_key = backup_data
+
+    def _run_segmentation(
+        self, operation: ROIExtractionProfile
+    ) -> tuple[ROIInfo, dict[str, AdditionalLayerDescription]]:
         segmentation_class = AnalysisAlgorithmSelection.get(operation.algorithm)
         if segmentation_class is None:  # pragma: no cover
             raise ValueError(f"Segmentation class {operation.algorithm} do not found")
@@ -297,12 +425,7 @@ class CalculationProcess:
         else:
             segmentation_algorithm.set_parameters(**operation.values)
         result = segmentation_algorithm.calculation_run(report_empty_fun)
-        backup_data = self.roi_info, self.additional_layers, self.algorithm_parameters
-        self.roi_info = ROIInfo(result.roi, result.roi_annotation, result.alternative_representation)
-        self.additional_layers = result.additional_layers
-        self.algorithm_parameters = {"algorithm_name": operation.algorithm, "values": operation.values}
-        self.iterate_over(children)
-        self.roi_info, self.additional_layers, self.algorithm_parameters = backup_data
+        return ROIInfo(result.roi, result.roi_annotation, result.alternative_representation), result.additional_layers
 
     def step_mask_use(self, operation: MaskUse, children: list[CalculationTree]):
         """
@@ -311,11 +434,13 @@ class CalculationProcess:
         :param MaskUse operation:
         :param List[CalculationTree] children: list of nodes to iterate over after perform segmentation
         """
-        old_mask = self.mask
+        old_mask, old_key = self.mask, self.cache_key
         mask = self.mask_dict[operation.name]
         self.mask = mask
+        if self.cache is not None:
+            self.cache_key = ResultCache.key(self.mask_key_dict[operation.name], operation)
         self.iterate_over(children)
-        self.mask = old_mask
+        self.mask, self.cache_key = old_mask, old_key
 
     def step_mask_operation(self, operation: MaskSum | MaskIntersection, children: list[CalculationTree]):
         """
@@ -325,7 +450,7 @@ class CalculationProcess:
         :type operation: Union[MaskSum, MaskIntersection]
         :param List[CalculationTree] children: list of nodes to iterate over after perform segmentation
         """
-        old_mask = self.mask
+        old_mask, old_key = self.mask, self.cache_key
         mask1 = self.mask_dict[operation.mask1]
         mask2 = self.mask_dict[operation.mask2]
         if isinstance(operation, MaskSum):
@@ -333,8 +458,12 @@ class CalculationProcess:
         else:
             mask = np.logical_and(mask1, mask2).astype(np.uint8)
         self.mask = mask
+        if self.cache is not None:
+            self.cache_key = ResultCache.key(
+                self.cache_key, operation, self.mask_key_dict[operation.mask1], self.mask_key_dict[operation.mask2]
+            )
         self.iterate_over(children)
-        self.mask = old_mask
+        self.mask, self.cache_key = old_mask, old_key
 
     def step_save(self, operation: Save):
         """
@@ -364,26 +493,36 @@ class CalculationProcess:
         :param MaskCreate operation: mask create description.
         :param List[CalculationTree] children: list of nodes to iterate over after perform segmentation
         """
-        mask = calculate_mask(
-            mask_description=operation.mask_property,
-            roi=self.roi_info.roi,
-            old_mask=self.mask,
-            spacing=self.image.spacing,
-            time_axis=self.image.time_pos,
-        )
+        mask = None
+        key = self.cache_key
+        if self.cache is not None:
+            key = ResultCache.key(self.cache_key, operation)
+            mask = self.cache.load(key)
+        if mask is None:
+            mask = calculate_mask(
+                mask_description=operation.mask_property,
+                roi=self.roi_info.roi,
+                old_mask=self.mask,
+                spacing=self.image.spacing,
+                time_axis=self.image.time_pos,
+            )
+            if self.cache is not None:
+                self.cache.save(key, mask)
         if operation.name in self.reused_mask:
             self.mask_dict[operation.name] = mask
+            self.mask_key_dict[operation.name] = key
         history_element = HistoryElement.create(
             self.roi_info,
             self.mask,
             self.algorithm_parameters,
             operation.mask_property,
         )
-        backup = self.mask, self.history
+        backup = self.mask, self.history, self.cache_key
         self.mask = mask
+        self.cache_key = key
         self.history.append(history_element)
         self.iterate_over(children)
-        self.mask, self.history = backup
+        self.mask, self.history, self.cache_key = backup
 
     def step_measurement(self, operation: MeasurementCalculate):
         """
@@ -404,16 +543,30 @@ class CalculationProcess:
                 channel = self.algorithm_parameters["values"][segmentation_class.get_channel_parameter_name()]
 
         # FIXME use additional information
-        old_mask = self.image.mask
-        self.image.set_mask(self.mask)
         measurement = operation.measurement_profile.calculate(
-            self.image,
+            self._get_measurement_image(),
             channel,
             self.roi_info,
             operation.units,
+            cache=self.measurement_cache,
+            max_workers=1,
         )
         self.measurement.append(measurement)
-        self.image.set_mask(old_mask)
+
+    def _get_measurement_image(self) -> Image:
+        """
+        Image with current mask. It is reused until image or mask changes,
+        so values from :py:attr:`measurement_cache` could be used by next measurement steps.
+        """
+        if (
+            self._measurement_image is None
+            or self._measurement_image[0] is not self.image
+            or self._measurement_image[1] is not self.mask
+        ):
+            image = copy(self.image)
+            image.set_mask(self.mask)
+            self._measurement_image = self.image, self.mask, image
+        return self._measurement_image[2]
 
     def recursive_calculation(self, node: CalculationTree):
         """
@@ -452,14 +605,93 @@ class BatchResultDescription(NamedTuple):
     jobs_status: dict[uuid.UUID, int]  #: for each job information about progress
 
 
+class CalculationJournal:
+    """
+    On disc journal of files already processed in calculation.
+    It allows to resume calculation after crash. Journal is identified by
+    measurement file, sheet name, voxel size and calculation plan, so rerun of the
+    same calculation with new uuid use the same journal.
+    Only results without errors are stored, so failed files are calculated again.
+    Size and modification time of each input file are stored with its result,
+    so result of file changed since it was processed is not reused.
+
+    :param BaseCalculation calculation: calculation information
+    """
+
+    suffix = ".partseg_journal"
+
+    def __init__(self, calculation: BaseCalculation):
+        self.plan_hash = self.calculation_hash(calculation)
+        base_path = path.splitext(calculation.measurement_file_path)[0]
+        self.file_path = f"{base_path}_{self.plan_hash[:12]}{self.suffix}"
+        self._storage = ResultSpool(self.file_path)
+
+    @staticmethod
+    def calculation_hash(calculation: BaseCalculation) -> str:
+        """
+        Calculate hash of parts of calculation which have impact on result.
+        """
+        hash_fun = hashlib.sha256()
+        hash_fun.update(json.dumps(calculation.calculation_plan, cls=PartSegEncoder).encode())
+        hash_fun.update(
+            json.dumps(
+                [calculation.sheet_name, list(calculation.voxel_size), calculation.overwrite_voxel_size]
+            ).encode()
+        )
+        return hash_fun.hexdigest()
+
+    def load(self) -> dict[str, list[ResponseData]]:
+        """
+        Load already calculated results.
+
+        :return: dict from path to processed file to calculation result
+        """
+        res = {}
+        try:
+            for plan_hash, file_path, signature, result_list in self._storage.iterate():
+                if plan_hash == self.plan_hash and signature == self.file_signature(file_path):
+                    res[file_path] = result_list
+        except (EOFError, pickle.UnpicklingError, ValueError, AttributeError) as e:
+            # last entry may be broken if previous run was killed during write
+            logging.warning("[CalculationJournal] %s", e)
+        return res
+
+    @staticmethod
+    def file_signature(file_path: str) -> tuple[int, int] | None:
+        """Size and modification time of file or None if file is not available"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def add(self, file_path: str, result_list: list[ResponseData | ErrorInfo]):
+        """
+        Store result of calculation for single file. Results with errors are skipped.
+        """
+        if not result_list or not all(isinstance(x, ResponseData) for x in result_list):
+            return
+        try:
+            self._storage.append([(self.plan_hash, file_path, self.file_signature(file_path), result_list)])
+        except OSError as e:  # pragma: no cover
+            logging.warning("[CalculationJournal] %s", e)
+
+    def remove(self):
+        """Remove journal file"""
+        self._storage.remove()
+
+
 class CalculationManager:
     """
     This class manage batch processing in PartSeg.
 
+    :param bool resume: if use :py:class:`CalculationJournal` to skip files processed in previous run
+        of the same calculation. Journal is written only in this mode, so only such run could be resumed later.
+    :param bool gui_plugins: passed to :py:class:`BatchManager`, disable to avoid import of GUI libraries in workers
     """
 
-    def __init__(self):
-        self.batch_manager = BatchManager()
+    def __init__(self, resume: bool = False, gui_plugins: bool = True):
+        self.batch_manager = BatchManager(gui_plugins=gui_plugins)
         self.calculation_queue = Queue()
         self.calculation_dict: dict[uuid.UUID, Calculation] = OrderedDict()
         self.calculation_sizes = []
@@ -468,6 +700,9 @@ class CalculationManager:
         self.counter_dict = OrderedDict()
         self.errors_list = []
         self.writer = DataWriter()
+        self.resume = resume
+        self.journal_dict: dict[uuid.UUID, CalculationJournal] = {}
+        self._replay_errors: list[tuple[str, ErrorInfo]] = []
 
     def is_valid_sheet_name(self, excel_path: str, sheet_name: str) -> bool:
         """
@@ -488,19 +723,60 @@ class CalculationManager:
     def cancel_calculation(self, calculation: Calculation):
         self.batch_manager.cancel_work(calculation)
 
-    def add_calculation(self, calculation: Calculation):
+    def set_priority(self, calculation: Calculation, priority: int):
+        """
+        Change priority of calculation in progress.
+
+        :param calculation: calculation to reprioritize
+        :param priority: new priority
+        """
+        self.batch_manager.set_priority(calculation.uuid, priority)
+
+    def add_calculation(self, calculation: Calculation, priority: int = 0):
         """
         :param calculation: Calculation
+        :param priority: files of calculations with higher priority are processed first,
+            calculations with the same priority are processed in parallel.
+        :raises ImportError: when result should be saved in parquet or feather format and pyarrow is not installed
         """
+        self.writer.add_data_part(calculation)
         self.calculation_dict[calculation.uuid] = calculation
         self.counter_dict[calculation.uuid] = 0
         size = len(calculation.file_list)
         self.calculation_sizes.append(size)
         self.calculation_size += size
-        self.batch_manager.add_work(
-            list(enumerate(calculation.file_list)), calculation.get_base_calculation(), do_calculation
-        )
-        self.writer.add_data_part(calculation)
+        done = {}
+        if self.resume:
+            journal = CalculationJournal(calculation)
+            self.journal_dict[calculation.uuid] = journal
+            done = journal.load()
+        to_calculate = []
+        for ind, file_path in enumerate(calculation.file_list):
+            if file_path not in done:
+                to_calculate.append((ind, file_path))
+                continue
+            for el in done[file_path]:
+                errors = self.writer.add_result(el, calculation, ind=ind)
+                self._replay_errors.extend((el.path_to_file, err) for err in errors)
+            self.calculation_done += 1
+            self.counter_dict[calculation.uuid] += 1
+        if to_calculate:
+            self.batch_manager.add_work(
+                to_calculate,
+                calculation.get_base_calculation(),
+                do_calculation,
+                cost_fun=estimate_calculation_memory,
+                priority=priority,
+            )
+        else:
+            errors = self.writer.calculation_finished(calculation, cleanup=self._journal_cleanup(calculation.uuid))
+            self._replay_errors.extend(("", err) for err in errors)
+
+    def _journal_cleanup(self, uuid_id: uuid.UUID) -> list[str]:
+        """journal file to be removed when output file of calculation is written"""
+        if uuid_id in self.journal_dict:
+            return [self.journal_dict[uuid_id].file_path]
+        return []
 
     @property
     def has_work(self) -> bool:
@@ -521,6 +797,15 @@ class CalculationManager:
         logging.debug("Number off process %s", val)
         self.batch_manager.set_number_of_process(val)
 
+    def set_memory_budget(self, val: int | None):
+        """
+        Set limit of memory (in bytes) for files processed in parallel.
+        Memory usage of each file is estimated with :py:func:`estimate_calculation_memory`.
+
+        :param val: memory limit, None means no limit
+        """
+        self.batch_manager.set_memory_budget(val)
+
     def get_results(self) -> BatchResultDescription:
         """
         Consume results from :py:class:`BatchWorker` and transfer it to :py:class:`DataWriter`
@@ -529,7 +814,8 @@ class CalculationManager:
         :rtype: BatchResultDescription
         """
         responses: list[tuple[uuid.UUID, WrappedResult]] = self.batch_manager.get_result()
-        new_errors: list[tuple[str, ErrorInfo]] = []
+        # errors from storing results of files restored from journal and writing calculations restored in whole
+        new_errors, self._replay_errors = self._replay_errors, []
         for uuid_id, (ind, result_list) in responses:
             if uuid_id == "-1":  # pragma: no cover
                 self.errors_list.append((f"Unknown file {ind}", result_list))
@@ -539,6 +825,10 @@ class CalculationManager:
             self.calculation_done += 1
             self.counter_dict[uuid_id] += 1
             calculation = self.calculation_dict[uuid_id]
+            if ind != -1 and uuid_id in self.journal_dict:
+                self.writer.add_journal_entry(
+                    calculation, self.journal_dict[uuid_id], calculation.file_list[ind], result_list
+                )
             for el in result_list:
                 if isinstance(el, ResponseData):
                     errors = self.writer.add_result(el, calculation, ind=ind)
@@ -550,7 +840,7 @@ class CalculationManager:
                     new_errors.append((file_info, el))
 
                 if self.counter_dict[uuid_id] == len(calculation.file_list):
-                    errors = self.writer.calculation_finished(calculation)
+                    errors = self.writer.calculation_finished(calculation, cleanup=self._journal_cleanup(uuid_id))
                     new_errors.extend(("", err) for err in errors)
         return BatchResultDescription(new_errors, self.calculation_done, self.counter_dict.copy())
 
@@ -559,6 +849,72 @@ class FileType(Enum):
     excel_xlsx_file = 1
     excel_xls_file = 2
     text_file = 3
+    parquet_file = 4
+    feather_file = 5
+
+
+COLUMNAR_FILE_TYPES = {FileType.parquet_file, FileType.feather_file}
+COLUMNAR_UNITS_KEY = b"partseg_units"
+COLUMNAR_NAME_KEY = b"partseg_name"
+COLUMNAR_PLANS_KEY = b"partseg_calculation_plans"
+
+
+def _columnar_field_name(name: str, units: str) -> str:
+    return f"{name} ({units})" if units else name
+
+
+def dataframe_to_arrow(data_frame: pd.DataFrame, plans: list[CalculationPlan] | None = None):
+    """
+    Convert sheet data to :py:class:`pyarrow.Table`.
+    Two level columns (name, units) are flattened and name and units are stored as field metadata.
+
+    :param data_frame: sheet data with two level columns
+    :param plans: calculation plans to be stored in table metadata
+    """
+    import pyarrow as pa
+
+    names = [_columnar_field_name(str(name), str(units)) for name, units in data_frame.columns]
+    table = pa.Table.from_pandas(data_frame.set_axis(names, axis=1), preserve_index=False)
+    fields = [
+        field.with_metadata({COLUMNAR_NAME_KEY: str(name), COLUMNAR_UNITS_KEY: str(units)})
+        for field, (name, units) in zip(table.schema, data_frame.columns)
+    ]
+    metadata = {}
+    if plans:
+        metadata[COLUMNAR_PLANS_KEY] = json.dumps(plans, cls=PartSegEncoder)
+    return table.cast(pa.schema(fields, metadata=metadata))
+
+
+def arrow_to_dataframe(table) -> pd.DataFrame:
+    """
+    Convert table created with :py:func:`dataframe_to_arrow` back to data frame with two level columns.
+    """
+    columns = []
+    for field in table.schema:
+        metadata = field.metadata or {}
+        columns.append(
+            (
+                metadata.get(COLUMNAR_NAME_KEY, field.name.encode()).decode(),
+                metadata.get(COLUMNAR_UNITS_KEY, b"").decode(),
+            )
+        )
+    return table.to_pandas().set_axis(pd.MultiIndex.from_tuples(columns), axis=1)
+
+
+def load_columnar_result(file_path: str) -> pd.DataFrame:
+    """
+    Load sheet of batch result saved in parquet or feather format.
+
+    :param str file_path: path to ``.parquet``, ``.feather`` or ``.arrow`` file
+    :return: data frame with (name, units) columns
+    """
+    if path.splitext(file_path)[1].lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        return arrow_to_dataframe(pq.read_table(file_path))
+    import pyarrow.feather as pf
+
+    return arrow_to_dataframe(pf.read_table(file_path))
 
 
 class SheetData:
@@ -607,10 +963,82 @@ class SheetData:
         self.row_list = []
         return self.name, self.data_frame
 
+    def get_new_data(self) -> pd.DataFrame:
+        """
+        Get rows added since last call and forget them.
+        In opposite to :py:meth:`get_data_to_write` already returned rows are not kept in memory.
+
+        :return: data frame with new rows
+        """
+        sorted_row = [x[1] for x in sorted(self.row_list)]
+        self.row_list = []
+        return pd.DataFrame(sorted_row, columns=self.columns)
+
     def __repr__(self):
         return f"SheetData(name={self.name}, columns{list(self.columns)[1:]}, wait_rows={len(self.row_list)})"
 
 
+class ResultSpool:
+    """
+    Append only storage of measurement rows.
+    Each write store only new rows of sheets, so cost of writing do not depend
+    on number of already processed files. Full sheets are assembled only when
+    final file is created.
+
+    :param Optional[str] file_path: path to spool file. If not provided then temporary file is used.
+    """
+
+    def __init__(self, file_path: str | None = None):
+        if file_path is None:
+            fd, file_path = tempfile.mkstemp(suffix=".partseg_spool")
+            os.close(fd)
+        self.file_path = file_path
+
+    def append(self, chunks: list[tuple[uuid.UUID, str, pd.DataFrame]]):
+        """
+        Append new rows to spool.
+
+        :param chunks: list of (calculation uuid, sheet name, new rows)
+        """
+        with open(self.file_path, "ab") as f_p:
+            for chunk in chunks:
+                pickle.dump(chunk, f_p, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def iterate(self):
+        """iterate over chunks stored in spool"""
+        if not path.exists(self.file_path):
+            return
+        with open(self.file_path, "rb") as f_p:
+            size = os.fstat(f_p.fileno()).st_size
+            while f_p.tell() < size:
+                yield pickle.load(f_p)  # nosec  # noqa: S301
+
+    def collect(self, sheets: list[tuple[uuid.UUID, str, pd.MultiIndex]]) -> list[tuple[str, pd.DataFrame]]:
+        """
+        Assemble full sheets from stored chunks.
+
+        :param sheets: list of (calculation uuid, sheet name, columns) of sheets to assemble.
+            Columns are used for sheets without any rows.
+        :return: list of sheet name and data to write
+        """
+        parts = defaultdict(list)
+        for uuid_id, sheet_name, data_frame in self.iterate():
+            parts[(uuid_id, sheet_name)].append(data_frame)
+        res = []
+        for uuid_id, sheet_name, columns in sheets:
+            frames = parts.get((uuid_id, sheet_name))
+            if frames:
+                res.append((sheet_name, pd.concat(frames, axis=0, ignore_index=True)))
+            else:
+                res.append((sheet_name, pd.DataFrame([], columns=columns)))
+        return res
+
+    def remove(self):
+        """remove spool file"""
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.file_path)
+
+
 class FileData:
     """
     Handle information about single file.
@@ -618,6 +1046,13 @@ class FileData:
     This class run separate thread for writing purpose.
     This need additional synchronisation. but not freeze
 
+    Every ``write_threshold`` results only new rows are appended to :py:class:`ResultSpool`
+    (or directly to csv files for text output). Excel file, or per sheet ``.parquet``/``.feather``
+    files (requires ``pyarrow``), are rebuild from spool at checkpoints, so interrupted
+    calculation leaves readable partial result. Distance between checkpoints is doubled after each one,
+    so total cost of writing stays linear in number of results. Final file is build
+    when calculation is finished (:py:meth:`DataWriter.calculation_finished`).
+
     :param BaseCalculation calculation: calculation information
     :param int write_threshold: every how many lines of data are written to disk
     :cvar component_str: separator for per component sheet information
@@ -636,8 +1071,17 @@ class FileData:
             self.file_type = FileType.excel_xlsx_file
         elif ext == ".xls":  # pragma: no cover
             self.file_type = FileType.excel_xls_file
+        elif ext == ".parquet":
+            self.file_type = FileType.parquet_file
+        elif ext in {".feather", ".arrow"}:
+            self.file_type = FileType.feather_file
         else:  # pragma: no cover
             self.file_type = FileType.text_file
+        if self.file_type in COLUMNAR_FILE_TYPES and importlib.util.find_spec("pyarrow") is None:
+            raise ImportError(
+                "Saving batch results in parquet or feather format requires pyarrow. "
+                "Install it with 'pip install PartSeg[parquet]'"
+            )
         self.writing = False
         data = SheetData("calculation_info", [("Description", "str"), ("JSON", "str")], raw=True)
         data.add_data(
@@ -648,8 +1092,12 @@ class FileData:
         self.sheet_set = {"Errors"}
         self.new_count = 0
         self.write_threshold = write_threshold
+        self.result_count = 0
+        self.checkpoint_count = write_threshold
         self.wrote_queue = Queue()
         self.error_queue = Queue()
+        self.spool = ResultSpool()
+        self._text_rows: dict[str, int] = {}
         self.write_thread = threading.Thread(target=self.wrote_data_to_file)
         self.write_thread.daemon = True
         self.write_thread.start()
@@ -761,24 +1209,45 @@ class FileData:
             if comp_sheet is not None:
                 comp_sheet.add_data_list(comp_list, ind)
         main_sheet.add_data(data_list, ind)
+        self.result_count += 1
         if self.new_count >= self.write_threshold:
-            self.dump_data()
+            checkpoint = self.result_count >= self.checkpoint_count
+            if checkpoint:
+                self.checkpoint_count = 2 * self.result_count
+            self.dump_data(write_file=checkpoint)
             self.new_count = 0
 
+    def wrote_journal(self, journal: CalculationJournal, file_path: str, result_list: list):
+        """Add result of single file to journal in writing thread"""
+        self.wrote_queue.put(("journal", journal, file_path, result_list))
+
     def wrote_errors(self, file_path, error_description):
         self.new_count += 1
         self._error_info.append((file_path, str(error_description)))
 
-    def dump_data(self):
-        """
-        Fire writing data to disc
+    def dump_data(self, write_file: bool = False, cleanup: list[str] | None = None):
         """
-        data = []
-        for main_sheet, component_sheets, _ in self.sheet_dict.values():
-            data.append(main_sheet.get_data_to_write())
-            data.extend(sheet.get_data_to_write() for sheet in component_sheets if sheet is not None)
+        Fire writing new data to disc
 
-        self.wrote_queue.put((data, list(self.calculation_info.values()), self._error_info[:]))
+        :param bool write_file: if create output file from all data collected so far
+        :param cleanup: list of files to be removed after output file is successfully written
+        """
+        chunks = [
+            (uuid_id, sheet.name, sheet.get_new_data())
+            for uuid_id, (main_sheet, component_sheets, _) in self.sheet_dict.items()
+            for sheet in [main_sheet, *component_sheets]
+            if sheet is not None and sheet.row_list
+        ]
+        if chunks:
+            self.wrote_queue.put(("append", chunks))
+        if write_file:
+            sheets = []
+            for uuid_id, (main_sheet, component_sheets, _) in self.sheet_dict.items():
+                sheets.append((uuid_id, main_sheet.name, main_sheet.columns))
+                sheets.extend((uuid_id, sheet.name, sheet.columns) for sheet in component_sheets if sheet is not None)
+            self.wrote_queue.put(
+                ("write", sheets, list(self.calculation_info.values()), self._error_info[:], cleanup or [])
+            )
 
     def wrote_data_to_file(self):
         """
@@ -788,32 +1257,89 @@ class FileData:
         while True:
             data = self.wrote_queue.get()
             if data == "finish":
+                self.spool.remove()
                 break
             self.writing = True
             try:
-                if self.file_type == FileType.text_file:
-                    base_path, ext = path.splitext(self.file_path)
-                    for sheet_name, data_frame in data[0]:
-                        data_frame.to_csv(f"{base_path}_{sheet_name}{ext}")
-                    continue
-                file_path = self.file_path
-                i = 0
-                while i < 100:
-                    i += 1
-                    try:
-                        self.write_to_excel(file_path, data)
-                        break
-                    except OSError:
-                        base, ext = path.splitext(self.file_path)
-                        file_path = f"{base}({i}){ext}"
-                if i == 100:  # pragma: no cover
-                    raise PermissionError(f"Fail to write result excel {self.file_path}")
+                if data[0] == "journal":
+                    data[1].add(data[2], data[3])
+                elif data[0] == "append":
+                    self._append_data(data[1])
+                elif self.file_type in COLUMNAR_FILE_TYPES:
+                    self._write_columnar_files((self.spool.collect(data[1]), data[2], data[3]))
+                elif self.file_type == FileType.text_file:
+                    self._append_data(
+                        [(uuid_id, name, pd.DataFrame([], columns=cols)) for uuid_id, name, cols in data[1]]
+                    )
+                else:
+                    self._write_excel_file((self.spool.collect(data[1]), data[2], data[3]))
+                if data[0] == "write":
+                    for file_path in data[4]:
+                        with contextlib.suppress(FileNotFoundError):
+                            os.remove(file_path)
             except Exception as e:  # pragma: no cover   # pylint: disable=broad-except
                 logging.error("[batch_backend] %s", e)
                 self.error_queue.put(prepare_error_data(e))
             finally:
                 self.writing = False
 
+    def _append_data(self, chunks: list[tuple[uuid.UUID, str, pd.DataFrame]]):
+        if self.file_type != FileType.text_file:
+            self.spool.append(chunks)
+            return
+        base_path, ext = path.splitext(self.file_path)
+        for _, sheet_name, data_frame in chunks:
+            if sheet_name in self._text_rows and data_frame.empty:
+                continue
+            offset = self._text_rows.get(sheet_name, 0)
+            shifted = data_frame.set_axis(pd.RangeIndex(offset, offset + len(data_frame)), axis=0)
+            shifted.to_csv(
+                f"{base_path}_{sheet_name}{ext}",
+                mode="a" if sheet_name in self._text_rows else "w",
+                header=sheet_name not in self._text_rows,
+            )
+            self._text_rows[sheet_name] = offset + len(data_frame)
+
+    def _write_excel_file(
+        self, data: tuple[list[tuple[str, pd.DataFrame]], list[CalculationPlan], list[tuple[str, str]]]
+    ):
+        base, ext = path.splitext(self.file_path)
+        tmp_path = f"{base}.partial{ext}"
+        self.write_to_excel(tmp_path, data)
+        file_path = self.file_path
+        i = 0
+        while i < 100:
+            i += 1
+            try:
+                os.replace(tmp_path, file_path)
+                break
+            except OSError:
+                file_path = f"{base}({i}){ext}"
+        if i == 100:  # pragma: no cover
+            os.remove(tmp_path)
+            raise PermissionError(f"Fail to write result excel {self.file_path}")
+
+    def _write_columnar_files(
+        self, data: tuple[list[tuple[str, pd.DataFrame]], list[CalculationPlan], list[tuple[str, str]]]
+    ):
+        base_path, ext = path.splitext(self.file_path)
+        sheets, plans, errors = data
+        if errors:
+            columns = pd.MultiIndex.from_tuples([("File path", ""), ("error description", "")])
+            sheets = [*sheets, ("Errors", pd.DataFrame(errors, columns=columns))]
+        for sheet_name, data_frame in sheets:
+            table = dataframe_to_arrow(data_frame, plans)
+            tmp_path = f"{base_path}_{sheet_name}.partial{ext}"
+            if self.file_type == FileType.parquet_file:
+                import pyarrow.parquet as pq
+
+                pq.write_table(table, tmp_path)
+            else:
+                import pyarrow.feather as pf
+
+                pf.write_feather(table, tmp_path)
+            os.replace(tmp_path, f"{base_path}_{sheet_name}{ext}")
+
     @classmethod
     def write_to_excel(
         cls, file_path: str, data: tuple[list[tuple[str, pd.DataFrame]], list[CalculationPlan], list[tuple[str, str]]]
@@ -945,6 +1471,15 @@ class DataWriter:
         file_writer = self.file_dict[calculation.measurement_file_path]
         file_writer.wrote_errors(file_path, error)
 
+    def add_journal_entry(
+        self, calculation: BaseCalculation, journal: CalculationJournal, file_path: str, result_list: list
+    ):
+        """
+        Store result of file in journal. It is done in writing thread of calculation output file,
+        before journal is removed when output file is written.
+        """
+        self.file_dict[calculation.measurement_file_path].wrote_journal(journal, file_path, result_list)
+
     def writing_finished(self) -> bool:
         """check if all data are written to disc"""
         return all(x.finished() for x in self.file_dict.values())
@@ -954,14 +1489,15 @@ class DataWriter:
         for file_data in self.file_dict.values():
             file_data.finish()
 
-    def calculation_finished(self, calculation) -> list[ErrorInfo]:
+    def calculation_finished(self, calculation, cleanup: list[str] | None = None) -> list[ErrorInfo]:
         """
         Force write data for given calculation.
 
+        :param cleanup: list of files to be removed after output file is successfully written
         :raises ValueError: when measurement is not added with :py:meth:`.add_data_part`
         :return: list of errors during write.
         """
         if calculation.measurement_file_path not in self.file_dict:
             raise ValueError("Unknown measurement file")
-        self.file_dict[calculation.measurement_file_path].dump_data()
+        self.file_dict[calculation.measurement_file_path].dump_data(write_file=True, cleanup=cleanup)
         return self.file_dict[calculation.measurement_file_path].get_errors()
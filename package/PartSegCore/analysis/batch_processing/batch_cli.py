@@ -0,0 +1,211 @@
+"""
+Command line interface for running calculation plans without GUI.
+It uses only :py:mod:`PartSegCore` and does not import napari or Qt, so could be used on headless machines.
+
+Example::
+
+    PartSeg-batch plan.json "data/**/*.tif" -o result.xlsx --workers 4
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, Sequence, TextIO
+
+from PartSegCore.analysis.batch_processing.batch_backend import CalculationManager
+from PartSegCore.analysis.calculation_plan import Calculation, CalculationPlan, MaskFile
+from PartSegCore.io_utils import LoadPlanExcel, LoadPlanJson
+from PartSegCore.plugins import register_if_need
+
+if TYPE_CHECKING:
+    from PartSegCore.analysis.batch_processing.batch_backend import ErrorInfo
+
+
+def load_plan(plan_path: str, plan_name: str | None = None) -> CalculationPlan:
+    """
+    Load calculation plan from file saved by PartSeg (json or excel with measurement result).
+
+    :param plan_path: path to file with calculation plans
+    :param plan_name: name of plan to select. Could be omitted if file contains only one plan.
+    :raises ValueError: if plan cannot be selected
+    """
+    loader = LoadPlanExcel if os.path.splitext(plan_path)[1].lower() in {".xlsx", ".xls"} else LoadPlanJson
+    plans, errors = loader.load([plan_path])
+    for err in errors:
+        print(err, file=sys.stderr)
+    plans = {name: plan for name, plan in plans.items() if isinstance(plan, CalculationPlan)}
+    if not plans:
+        raise ValueError(f"File {plan_path} does not contain any valid calculation plan")
+    if plan_name is None:
+        if len(plans) > 1:
+            raise ValueError(
+                f"File {plan_path} contains multiple calculation plans ({', '.join(plans)}). "
+                "Select one with --plan-name"
+            )
+        return next(iter(plans.values()))
+    if plan_name not in plans:
+        raise ValueError(f"Calculation plan {plan_name} not found in {plan_path}. Available: {', '.join(plans)}")
+    return plans[plan_name]
+
+
+def collect_files(patterns: Sequence[str]) -> list[str]:
+    """
+    Find files matching glob patterns. ``**`` matches any number of directories.
+
+    :return: sorted list of absolute paths without duplicates
+    """
+    file_set = set()
+    for pattern in patterns:
+        file_set.update(
+            os.path.abspath(path)
+            for path in glob.glob(os.path.expanduser(pattern), recursive=True)
+            if os.path.isfile(path)
+        )
+    return sorted(file_set)
+
+
+def prepare_calculation(args: argparse.Namespace) -> Calculation:
+    """Create :py:class:`.Calculation` based on parsed command line arguments"""
+    calculation_plan = load_plan(args.plan, args.plan_name)
+    file_list = collect_files(args.input)
+    if not file_list:
+        raise ValueError(f"No files found for patterns: {', '.join(args.input)}")
+    mask_files = [el for el in calculation_plan.get_list_file_mask() if isinstance(el, MaskFile)]
+    if len(mask_files) != len(args.mask_mapping):
+        raise ValueError(
+            f"Calculation plan uses {len(mask_files)} mask mapping files, but {len(args.mask_mapping)} provided"
+        )
+    for mask_file, map_path in zip(mask_files, args.mask_mapping):
+        mask_file.set_map_path(os.path.abspath(map_path))
+    output = os.path.abspath(args.output)
+    if len(file_list) == 1:
+        base_prefix = os.path.dirname(file_list[0])
+    else:
+        base_prefix = os.path.commonpath(file_list)
+    return Calculation(
+        file_list=file_list,
+        base_prefix=args.base_prefix or base_prefix,
+        result_prefix=args.result_prefix or os.path.dirname(output),
+        measurement_file_path=output,
+        sheet_name=args.sheet_name,
+        calculation_plan=calculation_plan,
+        voxel_size=tuple(x / 10**9 for x in args.voxel_size),
+        overwrite_voxel_size=args.overwrite_voxel_size,
+        cache_dir=args.cache_dir,
+    )
+
+
+def _error_text(error: ErrorInfo) -> str:
+    exception = error[0]
+    return f"{exception.__class__.__name__}: {exception}"
+
+
+def run_calculation(
+    manager: CalculationManager, calculation: Calculation, stream: TextIO | None = None, interval: float = 0.1
+) -> int:
+    """
+    Run calculation and report progress to ``stream`` (default stdout).
+
+    :return: number of errors
+    """
+    if stream is None:
+        stream = sys.stdout
+    total = len(calculation.file_list)
+    error_count = 0
+    done = -1
+    manager.add_calculation(calculation)
+    try:
+        while True:
+            res = manager.get_results()
+            for file_path, error in res.errors:
+                error_count += 1
+                print(f"Error: {file_path} {_error_text(error)}", file=stream, flush=True)
+            progress = res.jobs_status.get(calculation.uuid, 0)
+            if progress != done:
+                done = progress
+                print(f"Progress: {done}/{total}", file=stream, flush=True)
+            if not manager.has_work:
+                break
+            time.sleep(interval)
+    finally:
+        manager.writer.finish()
+    return error_count
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        "PartSeg-batch", description="Run PartSeg calculation plan on set of files without GUI"
+    )
+    parser.add_argument("plan", help="file with calculation plan (json export or excel file with batch result)")
+    parser.add_argument("input", nargs="+", help="glob pattern(s) for input files, '**' is supported")
+    parser.add_argument(
+        "-o",
+        "--output",
+        required=True,
+        help="file for measurement results, format is chosen base on extension (xlsx, xls, csv, parquet, feather)",
+    )
+    parser.add_argument("--plan-name", default=None, help="name of plan if file contains multiple plans")
+    parser.add_argument("--sheet-name", default="Sheet1", help="name of sheet for measurements")
+    parser.add_argument("--base-prefix", default="", help="base directory of input files (default: common path)")
+    parser.add_argument("--result-prefix", default="", help="directory for saved files (default: output directory)")
+    parser.add_argument(
+        "--voxel-size",
+        nargs=3,
+        type=float,
+        default=(1000, 1000, 1000),
+        metavar=("Z", "Y", "X"),
+        help="voxel size in nanometers used for files without this information",
+    )
+    parser.add_argument(
+        "--overwrite-voxel-size", action="store_true", help="use --voxel-size even if file contains voxel size"
+    )
+    parser.add_argument(
+        "--mask-mapping", action="append", default=[], help="mapping file for each 'mask file' step of plan, in order"
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes (default: 1). Each worker loads whole image, so check available memory",
+    )
+    parser.add_argument("--memory-budget", type=float, default=None, help="memory limit for workers in MiB")
+    parser.add_argument(
+        "--cache-dir", default=None, help="directory to cache segmentation and masks between runs of modified plan"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="store progress in journal and reuse results of interrupted run of the same calculation "
+        "started with this option",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = create_parser().parse_args(argv)
+    register_if_need()
+    try:
+        calculation = prepare_calculation(args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    manager = CalculationManager(resume=args.resume, gui_plugins=False)
+    manager.set_number_of_workers(args.workers)
+    if args.memory_budget is not None:
+        manager.set_memory_budget(int(args.memory_budget * 2**20))
+    print(f"Processing {len(calculation.file_list)} files with plan {calculation.calculation_plan.name}", flush=True)
+    error_count = run_calculation(manager, calculation)
+    print(f"Finished. Result saved in {calculation.measurement_file_path}", flush=True)
+    return 1 if error_count else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
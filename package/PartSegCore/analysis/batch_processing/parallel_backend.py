@@ -15,17 +15,20 @@ and consume results (:py:meth:`BatchManager.get_result`) until
 
 """
 
+import itertools
 import logging
 import multiprocessing
 import os
+import pickle  # nosec
 import time
 import traceback
 import uuid
+from collections import OrderedDict, deque
 from contextlib import suppress
 from enum import Enum
 from queue import Empty, Queue
 from threading import RLock, Timer
-from typing import Any, Callable, Dict, List, Tuple
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
 
 __author__ = "Grzegorz Bokota"
 
@@ -47,19 +50,55 @@ class BatchManager:
     This class is used for manage pending works.
     It use :py:class:`.BatchWorker` for running calculation.
 
+    Tasks and results are transferred with :py:class:`multiprocessing.Queue`,
+    so data are sent directly between processes without additional server process.
+    Each worker has own ``control_queue`` which is used to broadcast
+    global parameters of works and information about canceled works.
+    Global parameters are serialized once per work and each task contains only work uuid.
+    Workers are blocked on ``task_queue``, so orders (like kill) are put there (see :py:meth:`send_order`)
+    and are executed by first idle worker.
+    Canceled works are also announced to workers started later, because their tasks could still wait in queue.
+
+    If :py:attr:`memory_budget` is set then tasks are put in ``task_queue`` only when
+    sum of estimated memory usage of tasks in progress fits in budget
+    (estimation is done with ``cost_fun`` passed to :py:meth:`add_work`).
+    At least one task is always admitted, so single task bigger than budget is still calculated.
+
+    Tasks wait in manager until worker could take them (at most :py:attr:`prefetch` tasks per worker
+    are put in ``task_queue``). Next task is taken from work with highest priority
+    (see :py:meth:`set_priority`) and works with the same priority are interleaved (round-robin),
+    so small work added after big one does not wait until big one finish.
+
+    :param gui_plugins: if workers should register plugins from ``PartSeg`` package
+        (they import GUI libraries, so it should be disabled for headless calculation)
+
     :type task_queue: Queue
-    :type order_queue: Queue
     :type result_queue: Queue
     :type calculation_dict: dict
+    :type control_queues: dict[multiprocessing.Process, Queue]
     :type process_list: list[multiprocessing.Process]
     """
 
-    def __init__(self):
-        self.manager = multiprocessing.Manager()
-        self.task_queue = self.manager.Queue()
-        self.order_queue = self.manager.Queue()
-        self.result_queue = self.manager.Queue()
-        self.calculation_dict = self.manager.dict()
+    def __init__(self, gui_plugins: bool = True):
+        self.gui_plugins = gui_plugins
+        self.task_queue = multiprocessing.Queue()
+        self.result_queue = multiprocessing.Queue()
+        # pending tasks should not block closing of main process
+        self.task_queue.cancel_join_thread()
+        self.calculation_dict: Dict[uuid.UUID, bytes] = {}
+        self.control_queues: Dict[multiprocessing.Process, multiprocessing.Queue] = {}
+        self.pending_tasks: Dict[uuid.UUID, int] = {}
+        self.pending_kills = 0
+        self.memory_budget: Optional[int] = None
+        self.memory_in_use = 0
+        self.waiting_tasks: OrderedDict[uuid.UUID, Deque[list]] = OrderedDict()
+        self.priorities: Dict[uuid.UUID, int] = {}
+        self.canceled_results: List[Tuple[uuid.UUID, Any]] = []
+        self.canceled_works: Set[uuid.UUID] = set()
+        self.prefetch = 2
+        self.cost_functions: Dict[uuid.UUID, Tuple[Callable[[Any, Any], int], Any]] = {}
+        self.task_cost: Dict[int, int] = {}
+        self._task_counter = itertools.count()
         self.number_off_available_process = 1
         self.number_off_process = 0
         self.number_off_alive_process = 0
@@ -75,16 +114,114 @@ class BatchManager:
         :return: List of results as tuple where first element is uuid of job and second is
             function result or tuple with exception as first argument and second is traceback
         """
-        res = []
-        while not self.result_queue.empty():
-            res.append(self.result_queue.get())
+        with self.locker:
+            res, self.canceled_results = self.canceled_results, []
+        with suppress(Empty):
+            while True:
+                res.append(self._free_task(self.result_queue.get_nowait()))
+        with self.locker:
+            if not self.task_cost:
+                # no task of canceled works could be in ``task_queue``
+                self.canceled_works.clear()
+        for task_uuid, _ in res:
+            if task_uuid not in self.pending_tasks:
+                continue
+            self.pending_tasks[task_uuid] -= 1
+            if self.pending_tasks[task_uuid] == 0:
+                self._remove_calculation(task_uuid)
         self.work_task -= len(res)
         if self.work_task == 0:
             logging.debug("computation finished")
             Timer(0.1, self._change_process_num, args=[-self.number_off_available_process]).start()
+        self._admit_tasks()
         return res
 
-    def add_work(self, individual_parameters_list: List, global_parameters, fun: Callable[[Any, Any], Any]) -> str:
+    def _free_task(self, result: tuple) -> Tuple[uuid.UUID, Any]:
+        """Release memory reserved for finished task and strip internal task id"""
+        if len(result) == 2:
+            # error reported by spawn_worker
+            return result
+        task_uuid, res, task_id = result
+        with self.locker:
+            self.memory_in_use -= self.task_cost.pop(task_id, 0)
+        return task_uuid, res
+
+    def set_memory_budget(self, memory_budget: Optional[int]):
+        """
+        Set limit of estimated memory (in bytes) used by tasks in progress.
+
+        :param memory_budget: limit in bytes, None means no limit
+        """
+        self.memory_budget = memory_budget
+        self._admit_tasks()
+
+    def _estimate_cost(self, el, task_uuid: uuid.UUID) -> int:
+        if self.memory_budget is None or task_uuid not in self.cost_functions:
+            return 0
+        cost_fun, global_parameters = self.cost_functions[task_uuid]
+        try:
+            return max(int(cost_fun(el, global_parameters)), 0)
+        except Exception:  # pylint: disable=broad-except
+            # problems with file will be reported by worker
+            logging.debug("Cannot estimate memory for %s", el, exc_info=True)
+            return 0
+
+    @property
+    def waiting_tasks_count(self) -> int:
+        """Number of tasks which are not passed to workers yet"""
+        return sum(len(x) for x in self.waiting_tasks.values())
+
+    def set_priority(self, task_uuid: uuid.UUID, priority: int):
+        """
+        Change priority of work. Tasks of works with higher priority are passed to workers first.
+        Could be called for work in progress.
+
+        :param task_uuid: work uuid returned by :py:meth:`add_work`
+        :param priority: new priority, default priority of work is 0
+        """
+        with self.locker:
+            if task_uuid in self.calculation_dict:
+                self.priorities[task_uuid] = priority
+
+    def _next_work(self) -> Optional[uuid.UUID]:
+        """Select work from which next task should be taken"""
+        if not self.waiting_tasks:
+            return None
+        priority = max(self.priorities.get(task_uuid, 0) for task_uuid in self.waiting_tasks)
+        return next(x for x in self.waiting_tasks if self.priorities.get(x, 0) == priority)
+
+    def _admit_tasks(self):
+        """Move waiting tasks to ``task_queue`` while there are free workers and memory budget allows"""
+        with self.locker:
+            while len(self.task_cost) < max(self.number_off_available_process, 1) * self.prefetch:
+                task_uuid = self._next_work()
+                if task_uuid is None:
+                    break
+                queue = self.waiting_tasks[task_uuid]
+                entry = queue[0]
+                el, _, cost = entry
+                if cost is None:
+                    cost = entry[2] = self._estimate_cost(el, task_uuid)
+                if self.memory_budget is not None and self.task_cost and self.memory_in_use + cost > self.memory_budget:
+                    break
+                queue.popleft()
+                if queue:
+                    self.waiting_tasks.move_to_end(task_uuid)
+                else:
+                    del self.waiting_tasks[task_uuid]
+                task_id = next(self._task_counter)
+                self.task_cost[task_id] = cost
+                self.memory_in_use += cost
+                self.task_queue.put((el, task_uuid, task_id))
+
+    def add_work(
+        self,
+        individual_parameters_list: List,
+        global_parameters,
+        fun: Callable[[Any, Any], Any],
+        cost_fun: Optional[Callable[[Any, Any], int]] = None,
+        priority: int = 0,
+    ) -> str:
         """
         This function add next works to internal structures.
         Number of works is length of ``individual_parameters_list``
@@ -94,29 +231,63 @@ class BatchManager:
         :param global_parameters: second argument of fun. If has field uuid then it is used as work uuid
         :param fun: two argument function which will be used to run calculation.
             First argument is task specific, second is const for whole work.
+            ``global_parameters`` and ``fun`` are serialized once here and sent to workers
+            which cache them, so they need to be picklable.
+        :param cost_fun: two argument function (same arguments as ``fun``) which estimate
+            memory (in bytes) needed for calculation of task. Called in main process
+            only if :py:attr:`memory_budget` is set.
+        :param priority: priority of work, tasks of works with higher priority are calculated first
         :return: work uuid
         """
-        self.calculation_dict[global_parameters.uuid] = global_parameters, fun
-        self.work_task += len(individual_parameters_list)
         if hasattr(global_parameters, "uuid"):
             task_uuid = global_parameters.uuid
         else:
             task_uuid = uuid.uuid4()
-        for el in individual_parameters_list:
-            self.task_queue.put((el, task_uuid))
+        serialized = pickle.dumps((global_parameters, fun), protocol=pickle.HIGHEST_PROTOCOL)
+        with self.locker:
+            self.calculation_dict[task_uuid] = serialized
+            self.pending_tasks[task_uuid] = self.pending_tasks.get(task_uuid, 0) + len(individual_parameters_list)
+            if cost_fun is not None:
+                self.cost_functions[task_uuid] = cost_fun, global_parameters
+            for queue in self.control_queues.values():
+                queue.put((task_uuid, serialized))
+            self.priorities[task_uuid] = priority
+            self.work_task += len(individual_parameters_list)
+            if individual_parameters_list:
+                self.waiting_tasks.setdefault(task_uuid, deque()).extend(
+                    [el, task_uuid, None] for el in individual_parameters_list
+                )
+        self._admit_tasks()
         if self.number_off_available_process > self.number_off_process:
             for _ in range(self.number_off_available_process - self.number_off_process):
                 self._spawn_process()
         self.in_work = True
         return task_uuid
 
+    def _remove_calculation(self, task_uuid: uuid.UUID):
+        """Forget global parameters of work and inform workers about it"""
+        with self.locker:
+            self.pending_tasks.pop(task_uuid, None)
+            self.cost_functions.pop(task_uuid, None)
+            self.priorities.pop(task_uuid, None)
+            if self.calculation_dict.pop(task_uuid, None) is None:
+                return
+            for queue in self.control_queues.values():
+                queue.put((task_uuid, None))
+
     def _spawn_process(self):
         with self.locker:
+            control_queue = multiprocessing.Queue()
+            for task_uuid, calc in self.calculation_dict.items():
+                control_queue.put((task_uuid, calc))
+            for task_uuid in self.canceled_works:
+                control_queue.put((task_uuid, None))
             process = multiprocessing.Process(
-                target=spawn_worker, args=(self.task_queue, self.order_queue, self.result_queue, self.calculation_dict)
+                target=spawn_worker, args=(self.task_queue, self.result_queue, control_queue, self.gui_plugins)
             )
             process.start()
             self.process_list.append(process)
+            self.control_queues[process] = control_queue
             self.number_off_alive_process += 1
             self.number_off_process += 1
 
@@ -141,22 +312,37 @@ class BatchManager:
         if not self.has_work:
             return
         self._change_process_num(process_diff)
+        self._admit_tasks()
 
     def _change_process_num(self, process_diff):
         if process_diff > 0:
             for _ in range(process_diff):
                 self._spawn_process()
         else:
-            for _ in range(-process_diff):
-                logging.debug("[set_number_of_process] process kill")
-                self.order_queue.put(SubprocessOrder.kill)
             with self.locker:
+                for _ in range(min(-process_diff, len(self.process_list) - self.pending_kills)):
+                    logging.debug("[set_number_of_process] process kill")
+                    self.send_order(SubprocessOrder.kill)
+                    self.pending_kills += 1
                 self.number_off_process += process_diff
             self.join_all()
 
+    def send_order(self, order: SubprocessOrder):
+        """
+        Send order to workers. Order is put in ``task_queue`` on which idle workers are blocked,
+        so it wakes up first free worker which executes it.
+
+        :param order: order to be executed by one of workers
+        """
+        self.task_queue.put(order)
+
     def cancel_work(self, global_parameters):
-        with suppress(KeyError):
-            del self.calculation_dict[global_parameters.uuid]
+        with self.locker:
+            self._remove_calculation(global_parameters.uuid)
+            self.canceled_works.add(global_parameters.uuid)
+            # tasks not passed to workers are reported as canceled without sending them
+            waiting = self.waiting_tasks.pop(global_parameters.uuid, ())
+            self.canceled_results.extend((global_parameters.uuid, (-1, [SubprocessOrder.cancel_job])) for _ in waiting)
 
     def join_all(self):
         logging.debug("Join begin %s %s", len(self.process_list), self.number_off_process)
@@ -169,8 +355,12 @@ class BatchManager:
                         p.join()
                         self.number_off_alive_process -= 1
                         to_remove.append(p)
+                self.pending_kills = max(self.pending_kills - len(to_remove), 0)
                 for p in to_remove:
                     self.process_list.remove(p)
+                    queue = self.control_queues.pop(p)
+                    queue.cancel_join_thread()
+                    queue.close()
                 self.number_off_alive_process -= len(to_remove)
                 logging.debug("Process list end %s", self.process_list)
             # FIXME self.number_off_alive_process,  self.number_off_process negative values
@@ -197,84 +387,113 @@ class BatchWorker:
     Worker spawned by :py:class:`BatchManager` instance
 
     :param task_queue: Queue with task data
-    :param order_queue: Queue with additional orders (like kill)
     :param result_queue: Queue to put result
-    :param calculation_dict: to store global parameters of task
+    :param control_queue: Queue with serialized global parameters of works.
+        Element ``(uuid, None)`` means that work is canceled or finished.
+        Global parameters are deserialized once and cached in :py:attr:`calculation_dict`.
     """
 
     def __init__(
         self,
         task_queue: Queue,
-        order_queue: Queue,
         result_queue: Queue,
-        calculation_dict: Dict[uuid.UUID, Tuple[Any, Callable[[Any, Any], Any]]],
+        control_queue: Queue,
     ):
         self.task_queue = task_queue
-        self.order_queue = order_queue
         self.result_queue = result_queue
-        self.calculation_dict = calculation_dict
+        self.control_queue = control_queue
+        self.calculation_dict: Dict[uuid.UUID, Tuple[Any, Callable[[Any, Any], Any]]] = {}
         self.canceled_tasks = set()
+        self.finish = False
 
-    def calculate_task(self, val: Tuple[Any, uuid.UUID]):
+    def _control_message(self, message):
+        logging.debug("Control message: %s", message)
+        if message == SubprocessOrder.kill:
+            self.finish = True
+            return
+        task_uuid, calc = message
+        if calc is None:
+            self.calculation_dict.pop(task_uuid, None)
+            self.canceled_tasks.add(task_uuid)
+        else:
+            self.calculation_dict[task_uuid] = pickle.loads(calc)  # nosec  # noqa: S301
+            self.canceled_tasks.discard(task_uuid)
+
+    def check_control(self):
+        """Consume all pending control messages"""
+        with suppress(Empty):
+            while True:
+                self._control_message(self.control_queue.get_nowait())
+
+    def get_calculation(self, task_uuid: uuid.UUID):
+        """
+        Get global parameters and function for given work.
+        Because global parameters are sent by separated queue, then wait if task arrive before them.
+
+        :return: tuple of global parameters and function or None if work is canceled
+        """
+        self.check_control()
+        while task_uuid not in self.calculation_dict and task_uuid not in self.canceled_tasks:
+            self._control_message(self.control_queue.get())
+        return self.calculation_dict.get(task_uuid)
+
+    def calculate_task(self, val: Tuple[Any, uuid.UUID, int]):
         """
         Calculate single task.
-        ``val`` is tuple with two elements (task_data, uuid).
+        ``val`` is tuple with three elements (task_data, uuid, task_id).
+        ``task_id`` is returned together with result to allow manager release reserved memory.
         function and global parameters are obtained from :py:attr:`.calculation_dict`
         """
-        data, task_uuid = val
-        calc = self.calculation_dict.get(task_uuid)
+        data, task_uuid, task_id = val
+        calc = self.get_calculation(task_uuid)
         if calc is None:
-            self.result_queue.put((task_uuid, (-1, [SubprocessOrder.cancel_job])))
+            self.result_queue.put((task_uuid, (-1, [SubprocessOrder.cancel_job]), task_id))
+            return
         global_data, fun = calc
         try:
             res = fun(data, global_data)
-            self.result_queue.put((task_uuid, res))
+            self.result_queue.put((task_uuid, res, task_id))
         except Exception as e:  # pragma: no cover # pylint: disable=broad-except
             logging.exception("Exception in worker")
-            self.result_queue.put((task_uuid, (-1, [(e, traceback.extract_tb(e.__traceback__))])))
+            self.result_queue.put((task_uuid, (-1, [(e, traceback.extract_tb(e.__traceback__))]), task_id))
 
     def run(self):
-        """Worker main loop"""
+        """
+        Worker main loop.
+        Worker is blocked on task queue until task or order (see :py:meth:`BatchManager.send_order`) arrive.
+        Control messages are consumed before each task.
+        """
         logging.debug("Process started %s", os.getpid())
-        while True:
-            if not self.order_queue.empty():
-                with suppress(Empty):
-                    order = self.order_queue.get_nowait()
-                    logging.debug("Order message: %s", order)
-                    if order == SubprocessOrder.kill:
-                        break
-            if not self.task_queue.empty():
-                try:
-                    task = self.task_queue.get_nowait()
-                    self.calculate_task(task)
-                except Empty:  # pragma: no cover
-                    time.sleep(0.1)
-                    continue
-                except (MemoryError, OSError):  # pragma: no cover
-                    pass
-                except Exception as ex:  # pragma: no cover # pylint: disable=broad-except
-                    logging.warning("Unsupported exception %s", ex)
-            else:
-                time.sleep(0.1)
+        while not self.finish:
+            task = self.task_queue.get()
+            if task is SubprocessOrder.kill:
+                break
+            try:
+                self.calculate_task(task)
+            except (MemoryError, OSError):  # pragma: no cover
+                pass
+            except Exception as ex:  # pragma: no cover # pylint: disable=broad-except
+                logging.warning("Unsupported exception %s", ex)
         logging.info("Process %s ended", os.getpid())
 
 
-def spawn_worker(task_queue: Queue, order_queue: Queue, result_queue: Queue, calculation_dict: Dict[uuid.UUID, Any]):
+def spawn_worker(task_queue: Queue, result_queue: Queue, control_queue: Queue, gui_plugins: bool = True):
     """
     Function for spawning worker. Designed as argument for :py:meth:`multiprocessing.Process`.
 
     :param task_queue: Queue with tasks
-    :param order_queue: Queue with additional orders (like kill)
     :param result_queue: Queue for calculation result
-    :param calculation_dict: dict with global parameters
+    :param control_queue: Queue with orders (like kill) and global parameters of works
+    :param gui_plugins: if register plugins from ``PartSeg`` package
     """
     try:
         register_if_need()
-        with suppress(ImportError):
-            from PartSeg.plugins import register_if_need as register
+        if gui_plugins:
+            with suppress(ImportError):
+                from PartSeg.plugins import register_if_need as register
 
-            register()
-        worker = BatchWorker(task_queue, order_queue, result_queue, calculation_dict)
+                register()
+        worker = BatchWorker(task_queue, result_queue, control_queue)
         worker.run()
     except Exception as e:  # pragma: no cover # pylint: disable=broad-except
         result_queue.put(("-1", (-1, [(e, traceback.extract_tb(e.__traceback__))])))
@@ -363,6 +363,7 @@ class BaseCalculation:
     :ivar CalculationPlan ~.calculation_plan: plan of calculation
     :ivar str uuid: ~.uuid of whole calculation
     :ivar ~.voxel_size: default voxel size (for files which do not contains this information in metadata
+    :ivar ~.cache_dir: directory for cache of intermediate results (segmentation, masks), None disable cache
     """
 
     def __init__(
@@ -374,6 +375,7 @@ class BaseCalculation:
         calculation_plan: "CalculationPlan",
         voxel_size: typing.Sequence[float],
         overwrite_voxel_size: bool = False,
+        cache_dir: typing.Optional[str] = None,
     ):
         self.base_prefix = base_prefix
         self.result_prefix = result_prefix
@@ -383,6 +385,7 @@ class BaseCalculation:
         self.uuid = uuid.uuid4()
         self.voxel_size = voxel_size
         self.overwrite_voxel_size = overwrite_voxel_size
+        self.cache_dir = cache_dir
 
     def __repr__(self):
         return (
@@ -417,6 +420,7 @@ class Calculation(BaseCalculation):
         calculation_plan,
         voxel_size,
         overwrite_voxel_size=False,
+        cache_dir=None,
     ):
         super().__init__(
             base_prefix,
@@ -426,6 +430,7 @@ class Calculation(BaseCalculation):
             calculation_plan,
             voxel_size,
             overwrite_voxel_size,
+            cache_dir,
         )
         self.file_list: typing.List[str] = file_list
 
@@ -439,6 +444,7 @@ class Calculation(BaseCalculation):
             self.calculation_plan,
             self.voxel_size,
             self.overwrite_voxel_size,
+            self.cache_dir,
         )
         base.uuid = self.uuid
         return base
@@ -487,6 +493,11 @@ class FileCalculation:
         """overwrite voxel size"""
         return self.calculation.overwrite_voxel_size
 
+    @property
+    def cache_dir(self):
+        """directory for cache of intermediate results"""
+        return self.calculation.cache_dir
+
     def __repr__(self):
         return f"FileCalculation(file_path={self.file_path}, calculation={self.calculation})"
 
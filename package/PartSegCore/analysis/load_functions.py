@@ -30,8 +30,8 @@ from PartSegCore.io_utils import (
     load_metadata_base,
     load_metadata_part,
     open_tar_file,
+    open_tar_member,
     proxy_callback,
-    tar_to_buff,
 )
 from PartSegCore.json_hooks import partseg_object_hook
 from PartSegCore.mask.io_functions import LoadROIImage
@@ -61,9 +61,7 @@ def _load_history(tar_file):
         history_buff = tar_file.extractfile(tar_file.getmember("history/history.json")).read()
         history_json = load_metadata(history_buff)
         for el in history_json:
-            history_buffer = BytesIO()
-            history_buffer.write(tar_file.extractfile(f"history/arrays_{el['index']}.npz").read())
-            history_buffer.seek(0)
+            history_buffer = BytesIO(tar_file.extractfile(f"history/arrays_{el['index']}.npz").read())
             el_up = update_algorithm_dict(el)
             segmentation_parameters = {"algorithm_name": el_up["algorithm_name"], "values": el_up["values"]}
             history.append(
@@ -80,12 +78,8 @@ def _load_history(tar_file):
 def load_project_from_tar(tar_file, file_path):
     if check_segmentation_type(tar_file) != SegmentationType.analysis:
         raise WrongFileTypeException
-    image_buffer = BytesIO()
-    image_tar = tar_file.extractfile(tar_file.getmember("image.tif"))
-    image_buffer.write(image_tar.read())
-    image_buffer.seek(0)
     reader = GenericImageReader()
-    image = reader.read(image_buffer, ext=".tif")
+    image = reader.read(open_tar_member(tar_file, "image.tif"), ext=".tif")
     image.file_path = file_path
 
     algorithm_str = tar_file.extractfile("algorithm.json").read()
@@ -99,19 +93,20 @@ def load_project_from_tar(tar_file, file_path):
     version = parse_version(metadata.get("project_version_info", "1.0"))
 
     if version == Version("1.0"):
-        seg_dict = np.load(tar_to_buff(tar_file, "segmentation.npz"))
-        mask = seg_dict.get("mask")
-        roi = seg_dict["segmentation"]
+        with np.load(open_tar_member(tar_file, "segmentation.npz")) as seg_dict:
+            mask = seg_dict.get("mask")
+            roi = seg_dict["segmentation"]
     else:
-        roi = tifffile.imread(tar_to_buff(tar_file, "segmentation.tif"))
+        roi = tifffile.imread(open_tar_member(tar_file, "segmentation.tif"))
         if "mask.tif" in tar_file.getnames():
-            mask = tifffile.imread(tar_to_buff(tar_file, "mask.tif"))
+            mask = tifffile.imread(open_tar_member(tar_file, "mask.tif"))
             if np.max(mask) == 1:
                 mask = mask.astype(bool)
         else:
             mask = None
     if "alternative.npz" in tar_file.getnames():
-        alternative = np.load(tar_to_buff(tar_file, "alternative.npz"))
+        with np.load(open_tar_member(tar_file, "alternative.npz")) as alternative_file:
+            alternative = dict(alternative_file)
     else:
         alternative = {}
     history = _load_history(tar_file)
@@ -156,7 +151,7 @@ def load_project(
 class LoadProject(LoadBase):
     @classmethod
     def get_name(cls):
-        return "Project (*.tgz *.tbz2 *.gz *.bz2)"
+        return "Project (*.tgz *.tbz2 *.gz *.bz2 *.tar)"
 
     @classmethod
     def get_short_name(cls):
@@ -173,7 +168,17 @@ class LoadProject(LoadBase):
         return load_project(load_locations[0])
 
 
+def _image_selection(metadata: dict) -> dict:
+    """Extract ``channels``, ``time_range`` and ``z_range`` keys from loader metadata"""
+    return {key: metadata[key] for key in ("channels", "time_range", "z_range") if metadata.get(key) is not None}
+
+
 class LoadStackImage(LoadBase):
+    """
+    Load image. Subset of data could be selected with ``metadata`` keys ``channels`` (list of channels indices),
+    ``time_range`` and ``z_range`` (half open ranges ``(start, stop)``).
+    """
+
     @classmethod
     def get_name(cls):
         return "Image (*.tif *.tiff *.lsm *.czi *.oib *.oif *.obsep)"
@@ -200,6 +205,7 @@ class LoadStackImage(LoadBase):
             load_locations[0],
             callback_function=partial(proxy_callback, range_changed, step_changed),
             default_spacing=tuple(metadata["default_spacing"]),
+            **_image_selection(metadata),
         )
         re_read = all(el[0] == el[1] for el in image.get_ranges())
         if re_read and metadata["recursion_limit"] > 0:
@@ -420,6 +426,11 @@ load_dict = Register(
 
 
 class LoadImageForBatch(LoadBase):
+    """
+    Load image using loader selected base on file extension. ``metadata`` is passed to selected loader,
+    so for images data selection described in :py:class:`LoadStackImage` is supported.
+    """
+
     @classmethod
     def get_short_name(cls):
         return "load_all"
@@ -1,7 +1,7 @@
 import sys
 from abc import ABC
 from enum import Enum
-from typing import Any, ClassVar, Dict, ForwardRef, Iterable, List, Optional, Set, Tuple, Union
+from typing import Any, Callable, ClassVar, Dict, ForwardRef, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
 
 import numpy as np
 from local_migrator import REGISTER, class_to_str, register_class, rename_key
@@ -328,6 +328,62 @@ class MeasurementEntry(BaseModel):
         return self.calculation_tree.get_channel_num(measurement_dict)
 
 
+class ComponentsLabels(NamedTuple):
+    """
+    Voxels of all measured components gathered in one pass over area array.
+    Used by :py:meth:`MeasurementMethodBase.calculate_per_component`.
+
+    :ivar numpy.ndarray indices: flat indices of voxels which belong to any component
+    :ivar numpy.ndarray labels: component number of each voxel from ``indices``
+    :ivar numpy.ndarray components: numbers of components for which measurement is calculated, in result order
+    :ivar tuple shape: shape of area array
+    """
+
+    indices: np.ndarray
+    labels: np.ndarray
+    components: np.ndarray
+    shape: Tuple[int, ...]
+
+    @classmethod
+    def from_arrays(cls, area_array: np.ndarray, mark_array: np.ndarray, components) -> "ComponentsLabels":
+        """
+        :param area_array: array with measured area, non-zero voxels are measured
+        :param mark_array: array with component number for each voxel (could be ``area_array``)
+        :param components: numbers of components to calculate
+        """
+        indices = np.flatnonzero(area_array)
+        labels = mark_array.reshape(-1)[indices].astype(np.intp)
+        return cls(indices, labels, np.asarray(components, dtype=np.intp), area_array.shape)
+
+    def values(self, array: np.ndarray) -> np.ndarray:
+        """values of ``array`` (same shape as area array) for voxels from :py:attr:`indices`"""
+        return array.reshape(-1)[self.indices]
+
+    def _bincount(self, weights=None) -> np.ndarray:
+        if self.components.size == 0:
+            return np.zeros(0)
+        minlength = int(self.components.max()) + 1
+        return np.bincount(self.labels, weights, minlength=minlength)[self.components]
+
+    def count(self) -> np.ndarray:
+        """number of voxels of each component"""
+        return self._bincount().astype(np.intp)
+
+    def sum(self, values: np.ndarray) -> np.ndarray:
+        """sum of ``values`` (returned by :py:meth:`values`) for each component"""
+        return self._bincount(values)
+
+    def apply(self, function: Callable, values: np.ndarray) -> np.ndarray:
+        """
+        Apply labeled reduction from :py:mod:`scipy.ndimage` (for example ``maximum``)
+        to ``values`` (returned by :py:meth:`values`) for each component. Empty components get 0.
+        """
+        if self.indices.size == 0:
+            return np.zeros(self.components.size)
+        res = np.asarray(function(values, self.labels, self.components), dtype=np.float64)
+        return np.where(self.count() > 0, res, 0)
+
+
 class MeasurementMethodBase(AlgorithmDescribeBase, ABC):
     """
     This is base class For all measurement calculation classes
@@ -388,11 +444,34 @@ class MeasurementMethodBase(AlgorithmDescribeBase, ABC):
         :param result_scalar: scalar to get proper units in result
         :param roi_alternative: dict with alternative roi representation (for plugin specific mapping)
         :param roi_annotation: dict with roi annotations (for plugin specific mapping)
+        :param components_info: relation between roi and mask components with overlap sizes
+            (``ComponentsInfo`` from :py:mod:`PartSegCore.analysis.measurement_calculation`)
 
         List incomplete.
         """
         raise NotImplementedError
 
+    @classmethod
+    def calculate_per_component(cls, components_labels: ComponentsLabels, **kwargs) -> Optional[np.ndarray]:
+        """
+        Calculate measurement for all components at once.
+        Arguments are the same as for :py:meth:`calculate_property` on whole (not clipped) arrays.
+
+        :param components_labels: voxels of components gathered in one pass
+        :return: array of values in order of ``components_labels.components``
+            or ``None`` if method calculates components one by one with :py:meth:`calculate_property`.
+        """
+        return None
+
+    @classmethod
+    def get_shared_values(cls) -> Tuple[Any, ...]:
+        """
+        Objects identifying intermediate values which method reads or stores in ``help_dict``
+        (for example other measurement class or helper function).
+        Leaves sharing any of them are not calculated concurrently.
+        """
+        return ()
+
     @classmethod
     def get_starting_leaf(cls) -> Leaf:
         """This leaf is put on default list"""
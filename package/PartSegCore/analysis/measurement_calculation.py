@@ -1,5 +1,8 @@
+import os
 import warnings
+import weakref
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
 from enum import Enum
 from functools import reduce
@@ -26,6 +29,8 @@ import SimpleITK
 from local_migrator import register_class, rename_key
 from mahotas.features import haralick
 from pydantic import Field
+from scipy import ndimage
+from scipy.spatial import ConvexHull, QhullError
 from scipy.spatial.distance import cdist
 from sympy import Rational, symbols
 
@@ -34,6 +39,7 @@ from PartSegCore.algorithm_describe_base import Register, ROIExtractionProfile
 from PartSegCore.analysis.calculate_pipeline import calculate_segmentation_step
 from PartSegCore.analysis.measurement_base import (
     AreaType,
+    ComponentsLabels,
     Leaf,
     MeasurementEntry,
     MeasurementMethodBase,
@@ -84,16 +90,74 @@ class ComponentsInfo(NamedTuple):
     :ivar numpy.ndarray mask_components: list of mask components
     :ivar Dict[int, List[int]] components_translation: mapping
         from roi components to mask components base on intersections
+    :ivar Optional[Dict[int, Dict[int, int]]] components_overlap: number of voxels
+        shared by roi component (outer key) and mask component (inner key)
     """
 
     roi_components: np.ndarray
     mask_components: np.ndarray
     components_translation: Dict[int, List[int]]
+    components_overlap: Optional[Dict[int, Dict[int, int]]] = None
 
     def has_components(self):
         return all(len(x) for x in self.components_translation.values())
 
 
+class MeasurementCache:
+    """
+    Storage for measurement values which could be reused between :py:meth:`MeasurementProfile.calculate` calls,
+    so recalculation of extended profile or other profile on same data calculates only new leaves.
+
+    Values are bound to identity of image, roi and mask objects and to image spacing of last calculation.
+    Cache is cleared when any of them changes, so arrays should not be modified in place.
+    """
+
+    def __init__(self):
+        self._refs: Tuple[Callable[[], Any], ...] = ()
+        self._spacing: Tuple[float, ...] = ()
+        self._values: Dict[tuple, dict] = {}
+
+    @staticmethod
+    def _base_array(array: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """:py:attr:`Image.mask` returns new view on each call, so identity of base array is used"""
+        while isinstance(array, np.ndarray) and isinstance(array.base, np.ndarray):
+            array = array.base
+        return array
+
+    @staticmethod
+    def _ref(obj) -> Callable[[], Any]:
+        if obj is None:
+            return lambda: None
+        return weakref.ref(obj)
+
+    def _is_current(self, objects: tuple) -> bool:
+        return len(objects) == len(self._refs) and all(ref() is obj for ref, obj in zip(self._refs, objects))
+
+    def get_cache_dict(
+        self,
+        image: Image,
+        roi: Union[np.ndarray, ROIInfo],
+        channel_num: Union[int, str],
+        result_units: Units,
+        time: int,
+    ) -> dict:
+        """
+        Get dict for caching measurements leaves values (``help_dict`` of :py:meth:`MeasurementProfile.calculate_tree`)
+        """
+        objects = (image, roi, self._base_array(image.mask))
+        spacing = tuple(image.spacing)
+        if not self._is_current(objects) or spacing != self._spacing:
+            self.clear()
+            self._refs = tuple(self._ref(obj) for obj in objects)
+            self._spacing = spacing
+        return self._values.setdefault((channel_num, result_units, time), {})
+
+    def clear(self):
+        self._refs = ()
+        self._spacing = ()
+        self._values = {}
+
+
 def empty_fun(_a0=None, _a1=None):
     """This function is being used as dummy reporting function."""
 
@@ -406,6 +470,19 @@ class MeasurementProfile(BaseModel):
             kw2["roi_alternative"][name] = array[bounds]
         return kw2
 
+    @staticmethod
+    def _get_components_labels(
+        kw: dict, node: Leaf, method: MeasurementMethodBase, components: np.ndarray
+    ) -> ComponentsLabels:
+        """Gather voxels of all components of area. Result is cached in ``help_dict``"""
+        per_mask_component = node.per_component == PerComponent.Per_Mask_component
+        hash_str = f"{ComponentsLabels.__name__}: {method.area_type(node.area)} & {per_mask_component}"
+        help_dict = kw["help_dict"]
+        if hash_str not in help_dict:
+            mark_array = kw["mask"] if per_mask_component else kw["area_array"]
+            help_dict[hash_str] = ComponentsLabels.from_arrays(kw["area_array"], mark_array, components)
+        return help_dict[hash_str]
+
     def _calculate_leaf_value(
         self, node: Union[Node, Leaf], segmentation_mask_map: ComponentsInfo, kwargs: dict
     ) -> Union[float, np.ndarray]:
@@ -414,16 +491,15 @@ class MeasurementProfile(BaseModel):
 
         if node.per_component == PerComponent.No:
             return method.calculate_property(**kw)
-        # TODO use cache for per component calculate
-        val = []
         if method.area_type(node.area) == AreaType.ROI and node.per_component != PerComponent.Per_Mask_component:
             components = segmentation_mask_map.roi_components
         else:
             components = segmentation_mask_map.mask_components
-        for i in components:
-            kw2 = self._clip_arrays(kw, node, method, i)
-            val.append(method.calculate_property(**kw2))
-        val = np.array(val)
+        val = None
+        if _has_per_component_calculation(method):
+            val = method.calculate_per_component(self._get_components_labels(kw, node, method, components), **kw)
+        if val is None:
+            val = np.array([method.calculate_property(**self._clip_arrays(kw, node, method, i)) for i in components])
         if node.per_component == PerComponent.Mean:
             val = np.mean(val) if val.size else 0
         return val
@@ -516,17 +592,15 @@ class MeasurementProfile(BaseModel):
         mask_components = np.unique(mask)
         if mask_components[0] == 0 or mask_components[0] is None:
             mask_components = mask_components[1:]
-        res = OrderedDict()
         if mask is None:
-            res = {i: [] for i in components}
-        elif np.max(mask) == 1:
+            return ComponentsInfo(components, mask_components, {i: [] for i in components}, {i: {} for i in components})
+        overlap = get_components_overlap(segmentation, mask)
+        overlap = {i: overlap.get(i, {}) for i in components}
+        if np.max(mask) == 1:
             res = {i: [1] for i in components}
         else:
-            for num in components:
-                res[num] = list(np.unique(mask[segmentation == num]))
-                if res[num][0] == 0:
-                    res[num] = res[num][1:]
-        return ComponentsInfo(components, mask_components, res)
+            res = OrderedDict((i, sorted(overlap[i])) for i in components)
+        return ComponentsInfo(components, mask_components, res, overlap)
 
     def get_component_and_area_info(self) -> List[Tuple[PerComponent, AreaType]]:
         """For each measurement check if is per component and in which types"""
@@ -555,6 +629,8 @@ class MeasurementProfile(BaseModel):
         range_changed: Callable[[int, int], Any] = empty_fun,
         step_changed: Callable[[int], Any] = empty_fun,
         time: int = 0,
+        cache: Optional[MeasurementCache] = None,
+        max_workers: Optional[int] = 1,
     ) -> MeasurementResult:
         """
         Calculate measurements on given set of parameters
@@ -566,6 +642,9 @@ class MeasurementProfile(BaseModel):
         :param range_changed: callback function to set information about steps range
         :param step_changed: callback function for set information about steps done
         :param time: which data point should be measured
+        :param cache: cache of values from previous calculations on same data
+        :param max_workers: maximum number of threads used to calculate independent measurements,
+            ``None`` means number of processors. Default 1 is calculation in calling thread only.
         :return: measurements
         """
 
@@ -580,6 +659,8 @@ class MeasurementProfile(BaseModel):
                 result_units=result_units,
                 segmentation_mask_map=segmentation_mask_map,
                 time=time,
+                cache=cache,
+                max_workers=max_workers,
             ),
             start=1,
         ):
@@ -596,6 +677,8 @@ class MeasurementProfile(BaseModel):
         result_units: Units,
         segmentation_mask_map: ComponentsInfo,
         time: int = 0,
+        cache: Optional[MeasurementCache] = None,
+        max_workers: Optional[int] = 1,
     ) -> Generator[MeasurementResultInputType, None, None]:
         """
         Calculate measurements on given set of parameters
@@ -605,6 +688,9 @@ class MeasurementProfile(BaseModel):
         :param result_units: units which should be used to present results.
         :param segmentation_mask_map: information which component of roi belongs to which mask component.
         :param time: which data point should be measured
+        :param cache: cache of values from previous calculations on same data
+        :param max_workers: maximum number of threads used to calculate independent measurements,
+            ``None`` means number of processors. Default 1 is calculation in calling thread only.
         :return: measurements
         """
 
@@ -616,7 +702,7 @@ class MeasurementProfile(BaseModel):
         if self._need_mask and image.mask is None:
             raise ValueError("measurement need mask")
         channel = image.get_channel(channel_num).astype(float)
-        cache_dict = {}
+        cache_dict = {} if cache is None else cache.get_cache_dict(image, roi, channel_num, result_units, time)
         result_scalar = UNIT_SCALE[result_units.value]
         if isinstance(roi, np.ndarray):
             roi = ROIInfo(roi).fit_to_image(image)
@@ -643,6 +729,7 @@ class MeasurementProfile(BaseModel):
             "result_scalar": result_scalar,
             "roi_alternative": roi_alternative,
             "roi_annotation": roi.annotations,
+            "components_info": segmentation_mask_map,
         }
         for num in self.get_channels_num():
             kw[f"channel_{num}"] = get_time(image.get_channel(num))
@@ -651,10 +738,92 @@ class MeasurementProfile(BaseModel):
             mm[kw["segmentation"] > 0] = 0
             kw["mask_without_segmentation"] = mm
 
+        self._calculate_leaves_parallel(segmentation_mask_map, cache_dict, kw, max_workers)
         for entry in self.chosen_fields:
             name = self.name_prefix + entry.name
             yield name, self._calc_single_field(entry, segmentation_mask_map, cache_dict, kw, result_units)
 
+    @staticmethod
+    def _get_shared_keys(node: Leaf) -> List[Any]:
+        """Keys of values which could be shared through ``help_dict`` during calculation of leaf"""
+        method: MeasurementMethodBase = MEASUREMENT_DICT[node.name]
+        keys = [(method, node.area, node.per_component, node.channel)]
+        keys.extend((value, node.area, node.per_component, node.channel) for value in method.get_shared_values())
+        if node.per_component != PerComponent.No and _has_per_component_calculation(method):
+            per_mask_component = node.per_component == PerComponent.Per_Mask_component
+            keys.append((ComponentsLabels, method.area_type(node.area), per_mask_component))
+        return keys
+
+    def _get_leaf_groups(self, help_dict: dict) -> List[List[Leaf]]:
+        """
+        Split not yet calculated leaves of all chosen fields into groups.
+        Leaves from one group share intermediate values
+        (see :py:meth:`.MeasurementMethodBase.get_shared_values`) so need to be calculated one after another.
+        Different groups are independent.
+        """
+        leaves: Dict[str, Leaf] = {}
+        for entry in self.chosen_fields:
+            for node in _iter_leaves(entry.calculation_tree):
+                if node.name not in MEASUREMENT_DICT:
+                    continue
+                hash_str = hash_fun_call_name(
+                    MEASUREMENT_DICT[node.name],
+                    node.parameters,
+                    node.area,
+                    node.per_component,
+                    node.channel,
+                    NO_COMPONENT,
+                )
+                if hash_str not in help_dict:
+                    leaves.setdefault(hash_str, node)
+
+        nodes = list(leaves.values())
+        parent = list(range(len(nodes)))
+
+        def find(index: int) -> int:
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        key_owner: Dict[Any, int] = {}
+        for i, node in enumerate(nodes):
+            for key in self._get_shared_keys(node):
+                if key in key_owner:
+                    parent[find(i)] = find(key_owner[key])
+                else:
+                    key_owner[key] = i
+
+        groups: Dict[int, List[Leaf]] = {}
+        for i, node in enumerate(nodes):
+            groups.setdefault(find(i), []).append(node)
+        return list(groups.values())
+
+    def _calculate_leaves_parallel(
+        self, segmentation_mask_map: ComponentsInfo, help_dict: dict, kwargs: dict, max_workers: Optional[int]
+    ):
+        """
+        Fill ``help_dict`` with values of independent leaves calculated in thread pool.
+        Leaf which calculation fails is not stored, so it is calculated again in calling thread
+        by :py:meth:`_calc_single_field`, which reports or re-raises error in the same way as serial calculation.
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        groups = self._get_leaf_groups(help_dict)
+        max_workers = min(max_workers, len(groups))
+        if max_workers < 2:
+            return
+        kwargs["help_dict"] = help_dict
+
+        def calculate_group(group: List[Leaf]):
+            for node in group:
+                # failed leaf is calculated again in calling thread
+                with suppress(Exception):
+                    self._calculate_leaf(node, segmentation_mask_map, help_dict, kwargs)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(calculate_group, groups))
+
     def _calc_single_field(
         self,
         entry: MeasurementEntry,
@@ -682,6 +851,57 @@ class MeasurementProfile(BaseModel):
             return e.args[0], "", component_and_area
 
 
+def get_components_overlap(segmentation: np.ndarray, mask: np.ndarray) -> Dict[int, Dict[int, int]]:
+    """
+    Count voxels shared by each pair of segmentation and mask components in one pass over arrays.
+
+    :param segmentation: numpy array with segmentation labeled as positive integers
+    :param mask: numpy array with mask labeled as positive integers, same shape as ``segmentation``
+    :return: for each segmentation component mapping from overlapping mask components to number of common voxels
+    """
+    segmentation = segmentation.reshape(-1)
+    mask = mask.reshape(-1)
+    selected = (segmentation > 0) & (mask > 0)
+    mask_values = mask[selected].astype(np.intp)
+    if mask_values.size == 0:
+        return {}
+    segmentation_values = segmentation[selected].astype(np.intp)
+    mask_size = int(mask_values.max()) + 1
+    codes = segmentation_values * mask_size + mask_values
+    max_code = int(segmentation_values.max()) * mask_size + mask_size
+    if max_code <= max(2 * codes.size, 2**20):
+        counts = np.bincount(codes, minlength=max_code)
+        codes = np.flatnonzero(counts)
+        counts = counts[codes]
+    else:
+        codes, counts = np.unique(codes, return_counts=True)
+    res: Dict[int, Dict[int, int]] = {}
+    for roi_num, mask_num, count in zip((codes // mask_size).tolist(), (codes % mask_size).tolist(), counts.tolist()):
+        res.setdefault(roi_num, {})[mask_num] = count
+    return res
+
+
+def _iter_leaves(tree: Union[Node, Leaf]) -> Iterator[Leaf]:
+    if isinstance(tree, Leaf):
+        yield tree
+    else:
+        yield from _iter_leaves(tree.left)
+        yield from _iter_leaves(tree.right)
+
+
+def _has_per_component_calculation(method: MeasurementMethodBase) -> bool:
+    """
+    Check if method implements :py:meth:`~MeasurementMethodBase.calculate_per_component`.
+    Implementation is ignored if subclass overrides only ``calculate_property``.
+    """
+    for klass in method.__mro__:
+        if "calculate_per_component" in vars(klass):
+            return klass is not MeasurementMethodBase
+        if "calculate_property" in vars(klass):
+            return False
+    return False  # pragma: no cover
+
+
 def calculate_main_axis(area_array: np.ndarray, channel: np.ndarray, voxel_size):
     # TODO check if it produces good values
     if len(channel.shape) == 4:
@@ -751,6 +971,12 @@ class Volume(MeasurementMethodBase):
     def calculate_property(cls, area_array, voxel_size, result_scalar, **_):  # pylint: disable=arguments-differ
         return np.count_nonzero(area_array) * pixel_volume(voxel_size, result_scalar)
 
+    @classmethod
+    def calculate_per_component(
+        cls, components_labels, voxel_size, result_scalar, **_
+    ):  # pylint: disable=arguments-differ
+        return components_labels.count() * pixel_volume(voxel_size, result_scalar)
+
     @classmethod
     def get_units(cls, ndim):
         return symbols("{}") ** ndim
@@ -763,6 +989,10 @@ class Voxels(MeasurementMethodBase):
     def calculate_property(cls, area_array, **_):  # pylint: disable=arguments-differ
         return np.count_nonzero(area_array)
 
+    @classmethod
+    def calculate_per_component(cls, components_labels, **_):  # pylint: disable=arguments-differ
+        return components_labels.count()
+
     @classmethod
     def get_units(cls, ndim):
         return symbols("1")
@@ -822,12 +1052,48 @@ def iterative_double_normal(points_positions: np.ndarray):
     return delta, dn
 
 
-class Diameter(MeasurementMethodBase):
+def convex_hull_vertices(points_positions: np.ndarray) -> np.ndarray:
     """
-    Class for calculate diameter of ROI in fast way.
-    From Malandain, G., & Boissonnat, J. (2002). Computing the diameter of a point set,
-    12(6), 489-509. https://doi.org/10.1142/S0218195902001006
+    Reduce set of points to vertices of its convex hull. Farthest pair of points is always a pair of hull vertices.
+    Dimensions in which all points have same coordinate are dropped.
 
+    :param points_positions: points array of size (points_num, number of dimensions)
+    :return: array of size (vertices_num, number of not flat dimensions)
+    """
+    points_positions = points_positions[:, np.ptp(points_positions, axis=0) > 0]
+    ndim = points_positions.shape[1]
+    if ndim == 0:
+        return points_positions[:1]
+    if ndim == 1:
+        return points_positions[[np.argmin(points_positions[:, 0]), np.argmax(points_positions[:, 0])]]
+    if points_positions.shape[0] <= ndim + 1:
+        return points_positions
+    try:
+        hull = ConvexHull(points_positions)
+    except QhullError:
+        # points lay on lower dimensional hyperplane not parallel to axes
+        hull = ConvexHull(points_positions, qhull_options="QJ")
+    return points_positions[hull.vertices]
+
+
+def max_distance_sq(points_positions: np.ndarray, chunk_size: int = 512) -> float:
+    """
+    Exact square of maximum distance between points. Distances are calculated in chunks to limit memory usage.
+
+    :param points_positions: points array of size (points_num, number of dimensions)
+    :param chunk_size: number of points compared in single step
+    """
+    res = 0.0
+    for start in range(0, points_positions.shape[0], chunk_size):
+        dist = cdist(points_positions[start : start + chunk_size], points_positions[start:], "sqeuclidean")
+        res = max(res, float(np.max(dist)))
+    return res
+
+
+class Diameter(MeasurementMethodBase):
+    """
+    Class for calculate diameter (maximum Feret diameter) of ROI.
+    Border voxels are reduced to convex hull vertices, then maximum distance between them is calculated.
     """
 
     text_info = "Diameter", "Diameter of area"
@@ -839,8 +1105,7 @@ class Diameter(MeasurementMethodBase):
             return 0
         for i, val in enumerate((x * result_scalar for x in reversed(voxel_size)), start=1):
             pos[:, -i] *= val
-        diam_sq = iterative_double_normal(pos)[0]
-        return np.sqrt(diam_sq)
+        return np.sqrt(max_distance_sq(convex_hull_vertices(pos)))
 
     @classmethod
     def get_units(cls, ndim):
@@ -880,6 +1145,12 @@ class PixelBrightnessSum(MeasurementMethodBase):
                 raise ValueError(f"channel ({channel.shape}) and mask ({area_array.shape}) do not fit each other")
         return np.sum(channel[area_array > 0]) if np.any(area_array) else 0
 
+    @classmethod
+    def calculate_per_component(cls, components_labels, channel, **_):  # pylint: disable=arguments-differ
+        if components_labels.shape != channel.shape and np.prod(components_labels.shape) != channel.size:
+            raise ValueError(f"channel ({channel.shape}) and mask ({components_labels.shape}) do not fit each other")
+        return components_labels.sum(components_labels.values(channel))
+
     @classmethod
     def get_units(cls, ndim):
         return symbols("Pixel_brightness")
@@ -910,6 +1181,12 @@ class MaximumPixelBrightness(MeasurementMethodBase):
             raise ValueError(f"channel ({channel.shape}) and mask ({area_array.shape}) do not fit each other")
         return np.max(channel[area_array > 0]) if np.any(area_array) else 0
 
+    @classmethod
+    def calculate_per_component(cls, components_labels, channel, **_):  # pylint: disable=arguments-differ
+        if components_labels.shape != channel.shape:
+            raise ValueError(f"channel ({channel.shape}) and mask ({components_labels.shape}) do not fit each other")
+        return components_labels.apply(ndimage.maximum, components_labels.values(channel))
+
     @classmethod
     def get_units(cls, ndim):
         return symbols("Pixel_brightness")
@@ -928,6 +1205,12 @@ class MinimumPixelBrightness(MeasurementMethodBase):
             raise ValueError("channel and mask do not fit each other")
         return np.min(channel[area_array > 0]) if np.any(area_array) else 0
 
+    @classmethod
+    def calculate_per_component(cls, components_labels, channel, **_):  # pylint: disable=arguments-differ
+        if components_labels.shape != channel.shape:
+            raise ValueError("channel and mask do not fit each other")
+        return components_labels.apply(ndimage.minimum, components_labels.values(channel))
+
     @classmethod
     def get_units(cls, ndim):
         return symbols("Pixel_brightness")
@@ -946,6 +1229,14 @@ class MeanPixelBrightness(MeasurementMethodBase):
             raise ValueError("channel and mask do not fit each other")
         return np.mean(channel[area_array > 0]) if np.any(area_array) else 0
 
+    @classmethod
+    def calculate_per_component(cls, components_labels, channel, **_):  # pylint: disable=arguments-differ
+        if components_labels.shape != channel.shape:
+            raise ValueError("channel and mask do not fit each other")
+        count = components_labels.count()
+        brightness_sum = components_labels.sum(components_labels.values(channel))
+        return np.divide(brightness_sum, count, out=np.zeros(count.shape), where=count > 0)
+
     @classmethod
     def get_units(cls, ndim):
         return symbols("Pixel_brightness")
@@ -964,6 +1255,12 @@ class MedianPixelBrightness(MeasurementMethodBase):
             raise ValueError("channel and mask do not fit each other")
         return np.median(channel[area_array > 0]) if np.any(area_array) else 0
 
+    @classmethod
+    def calculate_per_component(cls, components_labels, channel, **_):  # pylint: disable=arguments-differ
+        if components_labels.shape != channel.shape:
+            raise ValueError("channel and mask do not fit each other")
+        return components_labels.apply(ndimage.median, components_labels.values(channel))
+
     @classmethod
     def get_units(cls, ndim):
         return symbols("Pixel_brightness")
@@ -985,6 +1282,12 @@ class StandardDeviationOfPixelBrightness(MeasurementMethodBase):
             raise ValueError("channel and mask do not fit each other")
         return np.std(channel[area_array > 0]) if np.any(area_array) else 0
 
+    @classmethod
+    def calculate_per_component(cls, components_labels, channel, **_):  # pylint: disable=arguments-differ
+        if components_labels.shape != channel.shape:
+            raise ValueError("channel and mask do not fit each other")
+        return components_labels.apply(ndimage.standard_deviation, components_labels.values(channel))
+
     @classmethod
     def get_units(cls, ndim):
         return symbols("Pixel_brightness")
@@ -1009,6 +1312,28 @@ class Moment(MeasurementMethodBase):
             return 0
         return af.calculate_density_momentum(img, voxel_size)
 
+    @classmethod
+    def calculate_per_component(cls, components_labels, channel, voxel_size, **_):  # pylint: disable=arguments-differ
+        if channel.ndim == 4:
+            if channel.shape[0] != 1:
+                raise ValueError("This measurements do not support time data")
+            return None
+        if components_labels.components.size == 0:
+            return None
+        labels = components_labels.labels
+        values = components_labels.values(channel)
+        minlength = int(components_labels.components.max()) + 1
+        mass = np.bincount(labels, values, minlength=minlength)
+        res = np.zeros(mass.shape)
+        coordinates = np.unravel_index(components_labels.indices, channel.shape)
+        # same as af.calculate_density_momentum: spacing is aligned to last axes
+        for coord, spacing in zip(reversed(coordinates), reversed(voxel_size)):
+            position = coord * spacing
+            center = np.bincount(labels, values * position, minlength=minlength)
+            np.divide(center, mass, out=center, where=mass != 0)
+            res += np.bincount(labels, values * (position - center[labels]) ** 2, minlength=minlength)
+        return res[components_labels.components]
+
     @classmethod
     def get_units(cls, ndim):
         return symbols("{}") ** 2 * symbols("Pixel_brightness")
@@ -1029,6 +1354,10 @@ class FirstPrincipalAxisLength(MeasurementMethodBase):
     def get_units(cls, ndim):
         return symbols("{}")
 
+    @classmethod
+    def get_shared_values(cls):
+        return (calculate_main_axis,)
+
     @classmethod
     def need_channel(cls):
         return True
@@ -1045,6 +1374,10 @@ class SecondPrincipalAxisLength(MeasurementMethodBase):
     def get_units(cls, ndim):
         return symbols("{}")
 
+    @classmethod
+    def get_shared_values(cls):
+        return (calculate_main_axis,)
+
     @classmethod
     def need_channel(cls):
         return True
@@ -1061,6 +1394,10 @@ class ThirdPrincipalAxisLength(MeasurementMethodBase):
     def get_units(cls, ndim):
         return symbols("{}")
 
+    @classmethod
+    def get_shared_values(cls):
+        return (calculate_main_axis,)
+
     @classmethod
     def need_channel(cls):
         return True
@@ -1100,6 +1437,10 @@ class Compactness(MeasurementMethodBase):
     def get_units(cls, ndim):
         return Surface.get_units(ndim) / Volume.get_units(ndim)
 
+    @classmethod
+    def get_shared_values(cls):
+        return Surface, Volume
+
 
 class Sphericity(MeasurementMethodBase):
     text_info = "Sphericity", "volume/(4/3 * π * radius **3) for 3d data and volume/(π * radius **2) for 2d data"
@@ -1139,6 +1480,10 @@ class Sphericity(MeasurementMethodBase):
     def get_units(cls, ndim):
         return Volume.get_units(ndim) / Diameter.get_units(ndim) ** ndim
 
+    @classmethod
+    def get_shared_values(cls):
+        return Volume, Diameter
+
 
 class Surface(MeasurementMethodBase):
     text_info = "Surface", "Calculating surface of current segmentation"
@@ -1368,6 +1713,10 @@ class DistanceROIROI(DistanceMaskROI):
     def need_full_data():
         return True
 
+    @classmethod
+    def get_shared_values(cls):
+        return (calculate_segmentation_step,)
+
 
 class ROINeighbourhoodROIParameters(BaseModel):
     profile: ROIExtractionProfile = Field(
@@ -1441,6 +1790,10 @@ class ROINeighbourhoodROI(DistanceMaskROI):
     def need_full_data():
         return True
 
+    @classmethod
+    def get_shared_values(cls):
+        return (calculate_segmentation_step,)
+
 
 class SplitOnPartParameters(MaskDistanceSplit.__argument_class__):
     part_selection: int = Field(2, title="Which part (from border)", ge=1, le=1024)
@@ -1595,6 +1948,10 @@ class ComponentBoundingBox(MeasurementMethodBase):
     def calculate_property(bounds_info, _component_num, **kwargs):  # pylint: disable=arguments-differ
         return str(bounds_info[_component_num])
 
+    @classmethod
+    def calculate_per_component(cls, components_labels, bounds_info, **_):  # pylint: disable=arguments-differ
+        return np.array([str(bounds_info[i]) for i in components_labels.components])
+
     @classmethod
     def get_starting_leaf(cls):
         return super().get_starting_leaf().replace_(area=AreaType.ROI, per_component=PerComponent.Yes)
@@ -37,19 +37,40 @@ def save_project(
     mask: typing.Optional[np.ndarray],
     history: typing.List[HistoryElement],
     algorithm_parameters: dict,
+    compression: typing.Optional[str] = "zstd",
+    compression_level: typing.Optional[int] = None,
 ):
+    """
+    Save project as tar archive.
+
+    :param compression: tifffile name of codec used for TIFF pages of image, ROI and mask,
+        for example ``"zstd"`` or ``"lzw"``. Used only for uncompressed archives (``.tar`` extension),
+        because compressing already compressed data only costs time. Members of such archive
+        could be read independently, without decompressing the others.
+        Archives with ``.tgz``, ``.gz``, ``.tbz2`` or ``.bz2`` extension are gzip or bz2 compressed
+        as a whole, like in previous versions, and this parameter is ignored.
+        If ``None`` and extension is not ``.tar``, the archive is gzip compressed.
+    :param compression_level: level of codec, ignored for codecs without levels
+    """
     # TODO add support for binary objects
-    ext = os.path.splitext(file_path)[1]
-    tar_mod = "w:bz2" if ext.lower() in [".bz2", ".tbz2"] else "w:gz"
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in (".bz2", ".tbz2"):
+        tar_mod, compression = "w:bz2", None
+    elif ext in (".gz", ".tgz") or (compression is None and ext != ".tar"):
+        tar_mod, compression = "w:gz", None
+    else:
+        tar_mod = "w"
+    compression_kwargs = ImageWriter.compression_kwargs(compression, compression_level)
     with tarfile.open(file_path, tar_mod) as tar:
         segmentation_buff = BytesIO()
         # noinspection PyTypeChecker
-        tifffile.imwrite(segmentation_buff, roi_info.roi)
+        tifffile.imwrite(segmentation_buff, roi_info.roi, **compression_kwargs)
         segmentation_tar = get_tarinfo("segmentation.tif", segmentation_buff)
         tar.addfile(segmentation_tar, fileobj=segmentation_buff)
         if roi_info.alternative:
             alternative_buff = BytesIO()
-            np.savez(alternative_buff, **roi_info.alternative)
+            savez = np.savez if tar_mod.startswith("w:") else np.savez_compressed
+            savez(alternative_buff, **roi_info.alternative)
             alternative_tar = get_tarinfo("alternative.npz", alternative_buff)
             tar.addfile(alternative_tar, fileobj=alternative_buff)
         if mask is not None:
@@ -57,11 +78,11 @@ def save_project(
                 mask = mask.astype(np.uint8)
             segmentation_buff = BytesIO()
             # noinspection PyTypeChecker
-            tifffile.imwrite(segmentation_buff, mask)
+            tifffile.imwrite(segmentation_buff, mask, **compression_kwargs)
             segmentation_tar = get_tarinfo("mask.tif", segmentation_buff)
             tar.addfile(segmentation_tar, fileobj=segmentation_buff)
         image_buff = BytesIO()
-        ImageWriter.save(image, image_buff, compression=None)
+        ImageWriter.save(image, image_buff, compression=compression, compression_level=compression_level)
         tar_image = get_tarinfo("image.tif", image_buff)
         tar.addfile(tarinfo=tar_image, fileobj=image_buff)
         para_str = json.dumps(algorithm_parameters, cls=PartSegEncoder)
@@ -160,7 +181,7 @@ def save_cmap(
 class SaveProject(SaveBase):
     @classmethod
     def get_name(cls):
-        return "Project (*.tgz *.tbz2 *.gz *.bz2)"
+        return "Project (*.tgz *.tbz2 *.gz *.bz2 *.tar)"
 
     @classmethod
     def get_short_name(cls):
@@ -168,7 +189,26 @@ class SaveProject(SaveBase):
 
     @classmethod
     def get_fields(cls):
-        return []
+        return [
+            AlgorithmProperty(
+                "compression",
+                "Compression",
+                "zstd",
+                possible_values=["zstd", "lzw", "adobe_deflate", "archive"],
+                help_text="Compression of TIFF pages in *.tar project. Faster for save and load,\n"
+                "allows reading parts of project without decompressing whole archive.\n"
+                "Projects with other extensions are compressed as whole archive (gzip or bz2),\n"
+                "archive - do not compress TIFF pages",
+            ),
+            AlgorithmProperty(
+                "compression_level",
+                "Compression level",
+                0,
+                options_range=(0, 22),
+                help_text="Level of TIFF codec, 0 means codec default. Ignored for lzw,\n"
+                "limited to 9 for adobe_deflate",
+            ),
+        ]
 
     @classmethod
     def save(
@@ -179,6 +219,8 @@ class SaveProject(SaveBase):
         range_changed=None,
         step_changed=None,
     ):
+        parameters = parameters if isinstance(parameters, dict) else {}
+        compression = parameters.get("compression", "zstd")
         save_project(
             save_location,
             project_info.image,
@@ -186,6 +228,8 @@ class SaveProject(SaveBase):
             project_info.mask,
             project_info.history,
             project_info.algorithm_parameters,
+            compression=None if compression == "archive" else compression,
+            compression_level=parameters.get("compression_level", 0) or None,
         )
 
 
@@ -1,4 +1,5 @@
-from PartSegCore.color_image.base_colors import default_colormap_dict, default_label_dict
+from PartSegCore.color_image import base_colors
+from PartSegCore.color_image.base_colors import default_label_dict
 from PartSegCore_compiled_backend.color_image_cython import add_labels, calculate_borders, color_grayscale, resolution
 
 __all__ = (
@@ -9,3 +10,9 @@ __all__ = (
     "default_label_dict",
     "resolution",
 )
+
+
+def __getattr__(name):
+    if name == "default_colormap_dict":
+        return base_colors.default_colormap_dict
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,5 @@
 import typing
 
-from napari.utils.colormaps.colormap import Colormap
-from napari.utils.colormaps.colormap_utils import AVAILABLE_COLORMAPS
 from pydantic import Field
 
 from PartSegCore.color_image.color_data import sitk_labels
@@ -56,15 +54,29 @@ class Color(BaseModel):
 
 starting_colors = ["red", "green", "blue", "magenta", "inferno", "magma"]
 
-default_colormap_dict = {name: AVAILABLE_COLORMAPS[name] for name in starting_colors}
-default_colormap_dict.update(AVAILABLE_COLORMAPS)
-default_colormap_dict.update(
-    {
-        f"{k}_reversed": Colormap(v.colors[::-1], controls=1 - v.controls[::-1])
-        for k, v in AVAILABLE_COLORMAPS.items()
-        if not k.endswith("_k")
-    }
-)
+
+def _create_default_colormap_dict() -> dict:
+    from napari.utils.colormaps.colormap import Colormap
+    from napari.utils.colormaps.colormap_utils import AVAILABLE_COLORMAPS
+
+    colormap_dict = {name: AVAILABLE_COLORMAPS[name] for name in starting_colors}
+    colormap_dict.update(AVAILABLE_COLORMAPS)
+    colormap_dict.update(
+        {
+            f"{k}_reversed": Colormap(v.colors[::-1], controls=1 - v.controls[::-1])
+            for k, v in AVAILABLE_COLORMAPS.items()
+            if not k.endswith("_k")
+        }
+    )
+    return colormap_dict
+
+
+def __getattr__(name):
+    # napari colormaps are created on first use, so napari is not imported in headless usage (like batch cli)
+    if name == "default_colormap_dict":
+        globals()[name] = _create_default_colormap_dict()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 default_label_dict = {"default": sitk_labels}
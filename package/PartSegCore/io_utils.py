@@ -1,5 +1,8 @@
+import bz2
+import gzip
 import io
 import json
+import lzma
 import os
 import re
 import typing
@@ -327,6 +330,29 @@ def tar_to_buff(tar_file, member_name) -> BytesIO:
     return buffer
 
 
+def is_random_access_tar(tar_file: TarFile) -> bool:
+    """Check if members of archive could be read without decompressing whole stream before them"""
+    fileobj = tar_file.fileobj
+    if isinstance(fileobj, (gzip.GzipFile, bz2.BZ2File, lzma.LZMAFile)):
+        return False
+    seekable = getattr(fileobj, "seekable", None)
+    return seekable is not None and seekable()
+
+
+def open_tar_member(tar_file: TarFile, member_name: str) -> typing.BinaryIO:
+    """
+    Open member of archive for reading.
+
+    For uncompressed archives returned file reads directly from archive, so only requested bytes are read.
+    For gzip or bz2 compressed archives the member is copied to memory (see :py:func:`tar_to_buff`),
+    because each backward seek in compressed stream restarts decompression.
+    The file has to be read before the archive is closed.
+    """
+    if is_random_access_tar(tar_file):
+        return tar_file.extractfile(tar_file.getmember(member_name))
+    return tar_to_buff(tar_file, member_name)
+
+
 class SaveScreenshot(SaveBase):
     @classmethod
     def get_short_name(cls):
@@ -41,11 +41,6 @@ from PartSegCore.utils import BaseModel
 from PartSegImage import BaseImageWriter, GenericImageReader, Image, IMAGEJImageWriter, ImageWriter, TiffImageReader
 from PartSegImage.image import FRAME_THICKNESS, reduce_array
 
-try:
-    from napari_builtins.io import napari_write_points
-except ImportError:
-    from napari.plugins._builtins import napari_write_points
-
 if sys.version_info[:3] != (3, 9, 7):
     from PartSegCore.project_info import ProjectInfoBase
 else:  # pragma: no cover
@@ -604,9 +599,7 @@ def save_components(
             lower_bound = np.min(np.nonzero(components_mark), axis=1)
             for j in index_to_frame_points:
                 lower_bound[j] -= FRAME_THICKNESS
-            napari_write_points(
-                os.path.join(dir_path, f"{file_name}_component{i}.csv"), filtered_points - lower_bound, {}
-            )
+            _write_points(os.path.join(dir_path, f"{file_name}_component{i}.csv"), filtered_points - lower_bound, {})
 
         writer_class.save(im, os.path.join(dir_path, f"{file_name}_component{i}.tif"))
         step_changed(2 * i + 1)
@@ -614,6 +607,16 @@ def save_components(
         step_changed(2 * i + 2)
 
 
+def _write_points(path: str, data: np.ndarray, meta: dict):
+    # napari is imported here, so it is not loaded in headless usage (like batch cli)
+    try:
+        from napari_builtins.io import napari_write_points
+    except ImportError:  # pragma: no cover
+        from napari.plugins._builtins import napari_write_points
+
+    napari_write_points(path, data, meta)
+
+
 class SaveComponents(SaveBase):
     """
     Save selected components in separated files.
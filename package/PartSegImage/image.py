@@ -1,8 +1,13 @@
+import mmap
+import os
 import re
+import tempfile
 import typing
 import warnings
-from collections.abc import Iterable
+import weakref
+from collections.abc import Iterable, MutableSequence
 from contextlib import suppress
+from copy import copy
 from typing import Union
 
 import numpy as np
@@ -64,6 +69,134 @@ def reduce_array(
     return translate[array]
 
 
+def _remove_file(path: str):
+    with suppress(OSError):
+        os.remove(path)
+
+
+_PERSISTENT_MEMMAP_FILES: typing.Set[str] = set()
+"""Files created by :py:meth:`Image.to_memmap` with explicit directory. Only they are pickled as reference"""
+
+
+class _MemmapView(typing.NamedTuple):
+    """
+    Picklable reference to array which is a view of memory mapped file.
+    Used to pass memory mapped channels between processes without copying data.
+    Only files from :py:data:`_PERSISTENT_MEMMAP_FILES` are referenced, because other files
+    (temporary or read by user) could be removed or changed before image is unpickled.
+    """
+
+    filename: str
+    mode: str
+    offset: int
+    shape: typing.Tuple[int, ...]
+    dtype: str
+    strides: typing.Tuple[int, ...]
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> typing.Optional["_MemmapView"]:
+        """Create reference if array is view of memory mapped file, otherwise return None"""
+        base = array
+        while isinstance(base, np.ndarray) and not isinstance(base.base, mmap.mmap):
+            base = base.base
+        if not isinstance(base, np.memmap) or base.filename not in _PERSISTENT_MEMMAP_FILES:
+            return None
+        delta = array.__array_interface__["data"][0] - base.__array_interface__["data"][0]
+        # data modification should not be visible in other processes, like after copy of data
+        mode = "r" if base.mode == "r" else "c"
+        return cls(base.filename, mode, base.offset + delta, array.shape, array.dtype.str, array.strides)
+
+    def open(self) -> np.ndarray:
+        buffer = np.memmap(self.filename, dtype=np.uint8, mode=self.mode)
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=buffer, offset=self.offset, strides=self.strides)
+
+
+class _LazyRanges:
+    """
+    Brightness ranges of channels calculated on first use.
+    Shared by image and images created from it with the same data, so ranges are calculated once
+    and parent image object is not kept alive by derived images.
+    """
+
+    def __init__(self, arrays: typing.Sequence[np.ndarray]):
+        self._arrays: typing.Optional[typing.Sequence[np.ndarray]] = arrays
+        self.value: typing.Optional[typing.List[typing.Tuple[float, float]]] = None
+
+    def get(self) -> typing.List[typing.Tuple[float, float]]:
+        if self.value is None:
+            self.value = [(np.min(c), np.max(c)) for c in self._arrays]
+            self._arrays = None
+        return self.value
+
+
+class _MaskedChannels(MutableSequence):
+    """
+    Channels of image cut with ROI. Channel is copied, zeroed outside ROI and framed on first access,
+    so channels which are never read are never copied.
+    Any modification of sequence makes all channels concrete first.
+
+    :param arrays: views of parent channels limited to ROI bounding box
+    :param roi: ROI limited to bounding box
+    :param index_to_frame: indices of axes to which frame is added
+    :param frame: frame thickness
+    """
+
+    def __init__(self, arrays: typing.List[np.ndarray], roi: np.ndarray, index_to_frame: typing.List[int], frame: int):
+        self._arrays = list(arrays)
+        self._masked: typing.List[typing.Optional[np.ndarray]] = [None] * len(self._arrays)
+        self._roi = roi
+        self._index_to_frame = index_to_frame
+        self._frame = frame
+        shape = list(roi.shape)
+        for index in index_to_frame:
+            shape[index] += 2 * frame
+        self.shape = tuple(shape)
+
+    def _get(self, index: int) -> np.ndarray:
+        if self._masked[index] is None:
+            array = np.zeros(self.shape, dtype=self._arrays[index].dtype)
+            pos = [slice(None)] * array.ndim
+            for i in self._index_to_frame:
+                pos[i] = slice(self._frame, self.shape[i] - self._frame)
+            np.copyto(array[tuple(pos)], self._arrays[index], where=self._roi != 0)
+            self._masked[index] = array
+            self._arrays[index] = None
+        return self._masked[index]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._get(i) for i in range(*item.indices(len(self)))]
+        return self._get(range(len(self))[item])
+
+    def __len__(self) -> int:
+        return len(self._arrays)
+
+    def _make_concrete(self):
+        for i in range(len(self)):
+            self._get(i)
+
+    def __setitem__(self, item, value):
+        self._make_concrete()
+        self._masked[item] = value
+        self._arrays = [None] * len(self._masked)
+
+    def __delitem__(self, item):
+        self._make_concrete()
+        del self._masked[item]
+        self._arrays = [None] * len(self._masked)
+
+    def insert(self, index, value):
+        self._make_concrete()
+        self._masked.insert(index, value)
+        self._arrays = [None] * len(self._masked)
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+
 class Image:
     """
     Base class for Images used in PartSeg
@@ -144,16 +277,88 @@ class Image:
             self.default_coloring = [np.array(x) for x in default_coloring]
 
         self._channel_names = self._prepare_channel_names(channel_names, self.channels)
-        if ranges is None:
-            self.ranges = list(
-                zip((np.min(c) for c in self._channel_arrays), (np.max(c) for c in self._channel_arrays))
-            )
-        else:
-            self.ranges = ranges
+        # ranges are calculated on first use, so creating image does not need pass over data
+        self._ranges = None if ranges is None else list(ranges)
+        self._ranges_source: typing.Optional[_LazyRanges] = None
         self._mask_array = self._prepare_mask(mask, data, axes_order)
         if self._mask_array is not None:
             self._mask_array = self.fit_mask_to_image(self._mask_array)
 
+    @property
+    def ranges(self) -> typing.List[typing.Tuple[float, float]]:
+        """
+        Brightness ranges of channels. If not provided on creation then they are calculated
+        as minimum and maximum of channel data on first access (for cut images of parent image data).
+        """
+        if self._ranges is None:
+            self._ranges = self._get_ranges_source().get()
+            self._ranges_source = None
+        return self._ranges
+
+    def _get_ranges_source(self) -> _LazyRanges:
+        """Lazy ranges of current data, which could be shared with images created from this image"""
+        if self._ranges_source is None:
+            self._ranges_source = _LazyRanges(self._channel_arrays)
+        return self._ranges_source
+
+    @ranges.setter
+    def ranges(self, value: typing.List[typing.Tuple[float, float]]):
+        self._ranges = list(value)
+        self._ranges_source = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._ranges is None and self._ranges_source is not None:
+            # do not pickle data of parent image
+            state["_ranges"] = self._ranges_source.value
+        state["_ranges_source"] = None
+        state["_channel_arrays"] = [_MemmapView.from_array(x) or x for x in self._channel_arrays]
+        return state
+
+    def __setstate__(self, state):
+        state["_channel_arrays"] = [x.open() if isinstance(x, _MemmapView) else x for x in state["_channel_arrays"]]
+        self.__dict__.update(state)
+
+    def to_memmap(self, directory: typing.Union[str, os.PathLike, None] = None) -> "Image":
+        """
+        Create copy of image with channels data stored in memory mapped ``.npy`` files (one per channel).
+        Data are read from disc on access, so image could be bigger than available memory.
+        If ``directory`` is provided then channels are pickled as reference to file,
+        so processes which receive image share the same pages instead of data copy.
+        Files in such directory need to be kept until all pickled images are loaded.
+
+        :param directory: directory for files. If None then temporary files are created
+            and removed when data are released. Images with temporary files are pickled with data.
+        :return: image with memory mapped channels
+        """
+        channel_arrays = []
+        for array in self._channel_arrays:
+            fd, path = tempfile.mkstemp(suffix=".npy", prefix="channel_", dir=directory)
+            os.close(fd)
+            mapped = np.lib.format.open_memmap(path, mode="w+", dtype=array.dtype, shape=array.shape)
+            mapped[...] = array
+            mapped.flush()
+            if directory is None:
+                weakref.finalize(mapped, _remove_file, path)
+            else:
+                _PERSISTENT_MEMMAP_FILES.add(mapped.filename)
+            channel_arrays.append(mapped)
+        image = self._copy_metadata()
+        image._channel_arrays = channel_arrays
+        # shared ranges source keeps in memory data alive
+        image._ranges_source = None
+        return image
+
+    def _copy_metadata(self) -> "Image":
+        """Shallow copy of image which does not share mutable metadata (like channel names) with this image"""
+        image = copy(self)
+        image._channel_names = list(self._channel_names)
+        if self.default_coloring is not None:
+            image.default_coloring = [np.array(x) for x in self.default_coloring]
+        if self._ranges is not None:
+            image._ranges = list(self._ranges)
+        return image
+
     @classmethod
     def _prepare_mask(cls, mask, data, axes_order) -> typing.Optional[np.ndarray]:
         if mask is None:
@@ -194,7 +399,7 @@ class Image:
         if axes_order.startswith("C"):
             if isinstance(data, list):
                 dtype = np.result_type(*data)
-                return [cls.reorder_axes(x, axes_order[1:]).astype(dtype) for x in data]
+                return [cls.reorder_axes(x, axes_order[1:]).astype(dtype, copy=False) for x in data]
             return [cls.reorder_axes(x, axes_order[1:]) for x in data]
 
         if not isinstance(data, np.ndarray):
@@ -253,7 +458,21 @@ class Image:
             )
             channel_names = self.channel_names
 
-        return self.substitute(data=data, ranges=self.ranges + image.ranges, channel_names=channel_names)
+        if axis == "C" and (self._ranges is None or image._ranges is None):
+            # calculate on first use from merged data
+            ranges = None
+        else:
+            ranges = self.ranges + image.ranges
+        return self.__class__(
+            data=data,
+            image_spacing=self._image_spacing,
+            file_path=self.file_path,
+            mask=self._mask_array,
+            default_coloring=self.default_coloring,
+            ranges=ranges,
+            channel_names=channel_names,
+            axes_order=self.axis_order,
+        )
 
     @property
     def channel_names(self) -> typing.List[str]:
@@ -335,14 +554,15 @@ class Image:
         channel_names=None,
     ) -> "Image":
         """Create copy of image with substitution of not None elements"""
-        data = self._channel_arrays if data is None else data
+        if ranges is None:
+            ranges = self._ranges if data is None else self.ranges
+        data = list(self._channel_arrays) if data is None else data
         image_spacing = self._image_spacing if image_spacing is None else image_spacing
         file_path = self.file_path if file_path is None else file_path
         mask = self._mask_array if mask is _DEF else mask
         default_coloring = self.default_coloring if default_coloring is None else default_coloring
-        ranges = self.ranges if ranges is None else ranges
         channel_names = self.channel_names if channel_names is None else channel_names
-        return self.__class__(
+        image = self.__class__(
             data=data,
             image_spacing=image_spacing,
             file_path=file_path,
@@ -352,6 +572,10 @@ class Image:
             channel_names=channel_names,
             axes_order=self.axis_order,
         )
+        if ranges is None:
+            # same data, so ranges could be shared with this image
+            image._ranges_source = self._get_ranges_source()
+        return image
 
     def set_mask(self, mask: typing.Optional[np.ndarray], axes: typing.Optional[str] = None):
         """
@@ -409,7 +633,10 @@ class Image:
         then relabel and change type to minimal
         which fit all information
         """
-        array = self.fit_array_to_image(array)
+        return self._reduce_mask(self.fit_array_to_image(array))
+
+    @staticmethod
+    def _reduce_mask(array: np.ndarray) -> np.ndarray:
         if np.max(array) == 1:
             return array.astype(np.uint8)
         unique = np.unique(array)
@@ -670,21 +897,14 @@ class Image:
         cut_area = self.fit_array_to_image(cut_area)
         new_cut = tuple(self._roi_to_slices(cut_area))
         catted_cut_area = cut_area[new_cut]
-        new_image = [np.copy(x[new_cut]) for x in self._channel_arrays]
-        for el in new_image:
-            el[catted_cut_area == 0] = 0
+        important_axis = "XY" if self.is_2d else "XYZ"
+        index_to_frame = self.calc_index_to_frame(self.array_axis_order, important_axis)
+        new_image = _MaskedChannels([x[new_cut] for x in self._channel_arrays], catted_cut_area, index_to_frame, frame)
         if replace_mask:
             new_mask = catted_cut_area
         elif self._mask_array is not None:
-            new_mask = self._mask_array[new_cut]
-            new_mask[catted_cut_area == 0] = 0
-        important_axis = "XY" if self.is_2d else "XYZ"
-        new_image = [
-            self._frame_array(x, self.calc_index_to_frame(self.array_axis_order, important_axis), frame)
-            for x in new_image
-        ]
-
-        new_mask = self._frame_array(new_mask, self.calc_index_to_frame(self.array_axis_order, important_axis), frame)
+            new_mask = np.where(catted_cut_area == 0, 0, self._mask_array[new_cut])
+        new_mask = self._frame_array(new_mask, index_to_frame, frame)
         return new_image, new_mask
 
     def cut_image(
@@ -695,7 +915,11 @@ class Image:
         zero_out_cut_area: bool = True,
     ) -> "Image":
         """
-        Create new image base on mask or list of slices
+        Create new image base on mask or list of slices.
+        If data are cut with slices (or ROI with ``zero_out_cut_area=False``) then channels and mask
+        of new image are views of this image arrays, so in place modification of data of one image
+        is visible in the other. Metadata (like channel names) are not shared.
+
         :param bool replace_mask: if cut area is represented by mask array,
         then in result image the mask is set base on cut_area if cur_area is np.ndarray
         :param typing.Union[np.ndarray, typing.Iterable[slice]] cut_area: area to cut. Defined with slices or mask
@@ -714,16 +938,27 @@ class Image:
         else:
             new_image, new_mask = self._cut_image_slices(cut_area, frame)
 
-        return self.__class__(
-            data=self._image_data_normalize(new_image),
-            image_spacing=self._image_spacing,
-            file_path=None,
-            mask=new_mask,
-            default_coloring=self.default_coloring,
-            ranges=self.ranges,
-            channel_names=self.channel_names,
-            axes_order=self.axis_order,
-        )
+        return self._image_from_cut(new_image, new_mask)
+
+    def _image_from_cut(
+        self, channel_arrays: typing.Sequence[np.ndarray], mask: typing.Optional[np.ndarray]
+    ) -> "Image":
+        """
+        Create image from channels (in :py:attr:`array_axis_order`) without copying data,
+        so cut image channels may be views of parent image channels.
+        """
+        image = self._copy_metadata()
+        image._channel_arrays = channel_arrays
+        image.file_path = None
+        if self._ranges is None:
+            image._ranges_source = self._get_ranges_source()
+        image._shift = (0,) * len(self._image_spacing)
+        image.name = ""
+        if mask is not None:
+            shape = channel_arrays.shape if isinstance(channel_arrays, _MaskedChannels) else channel_arrays[0].shape
+            mask = self._reduce_mask(self._fit_array_to_image(shape, mask))
+        image._mask_array = mask
+        return image
 
     def get_imagej_colors(self):
         # TODO review
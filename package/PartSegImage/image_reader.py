@@ -1,7 +1,8 @@
 import os.path
 import typing
 from abc import abstractmethod
-from contextlib import suppress
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, suppress
 from io import BytesIO
 from pathlib import Path
 from threading import Lock
@@ -21,6 +22,9 @@ if typing.TYPE_CHECKING:
     from xml.etree.ElementTree import Element  # nosec
 
 
+_PAGE_AXES_MAPPING = {"S": "C", "I": "Z", "Q": "Z"}
+
+
 def _empty(_, __):
     """Empty function for callback"""
 
@@ -49,9 +53,13 @@ class BaseImageReader:
         """
         return cls.image_class.axis_order
 
-    def __init__(self, callback_function=None):
+    def __init__(self, callback_function=None, lazy: bool = False):
         self.default_spacing = 10**-6, 10**-6, 10**-6
         self.spacing = self.default_spacing
+        self.lazy = lazy
+        self.channels: typing.Optional[typing.List[int]] = None
+        self.time_range: typing.Optional[typing.Tuple[int, int]] = None
+        self.z_range: typing.Optional[typing.Tuple[int, int]] = None
         if callback_function is None:
             self.callback_function = _empty
         else:
@@ -66,6 +74,175 @@ class BaseImageReader:
             raise ValueError(f"wrong spacing {spacing}")  # pragma: no cover
         self.default_spacing = spacing
 
+    def set_selection(
+        self,
+        channels: typing.Optional[typing.Sequence[int]] = None,
+        time_range: typing.Optional[typing.Tuple[int, int]] = None,
+        z_range: typing.Optional[typing.Tuple[int, int]] = None,
+    ):
+        """
+        Limit data which will be read. ``None`` means that whole axis is read.
+
+        :param channels: indices of channels to read
+        :param time_range: half open range ``(start, stop)`` of time points to read
+        :param z_range: half open range ``(start, stop)`` of z-slices to read
+        """
+        self.channels = None if channels is None else [int(x) for x in channels]
+        self.time_range = None if time_range is None else tuple(time_range)
+        self.z_range = None if z_range is None else tuple(z_range)
+
+    @property
+    def has_selection(self) -> bool:
+        return self.channels is not None or self.time_range is not None or self.z_range is not None
+
+    def _select_data(self, array: np.ndarray, skip: str = "") -> typing.Union[np.ndarray, typing.List[np.ndarray]]:
+        """
+        Apply selection set by :py:meth:`set_selection` to array in :py:meth:`return_order`.
+        If channel is first axis then list of channel views is returned, so (memory mapped) data are not copied.
+
+        :param array: array to select from
+        :param skip: axes on which selection was already applied during reading
+        """
+        order = self.return_order()
+        pos: typing.List[typing.Union[slice, int]] = [slice(None) for _ in range(array.ndim)]
+        for letter, range_ in (("T", self.time_range), ("Z", self.z_range)):
+            if range_ is not None and letter in order and letter not in skip:
+                pos[order.index(letter)] = slice(*range_)
+        array = array[tuple(pos)]
+        if self.channels is None or "C" not in order or "C" in skip:
+            return array
+        c_pos = order.index("C")
+        if c_pos == 0:
+            return [array[i] for i in self.channels]
+        return np.take(array, self.channels, axis=c_pos)
+
+    def _select_mask(self, mask: np.ndarray) -> np.ndarray:
+        """Apply time and z selection to mask in :py:meth:`return_order` without channel axis"""
+        order = self.return_order().replace("C", "")
+        pos: typing.List[typing.Union[slice, int]] = [slice(None) for _ in range(mask.ndim)]
+        for letter, range_ in (("T", self.time_range), ("Z", self.z_range)):
+            if range_ is not None and letter in order:
+                pos[order.index(letter)] = slice(*range_)
+        return mask[tuple(pos)]
+
+    def _select_channel_metadata(self, values):
+        """Limit per channel metadata (names, colors, ranges) to selected channels"""
+        if values is None or self.channels is None:
+            return values
+        if any(i >= len(values) for i in self.channels):
+            return None
+        return [values[i] for i in self.channels]
+
+    @classmethod
+    def _map_axes(
+        cls, axes: str, shape: typing.Sequence[int], drop: str = ""
+    ) -> typing.Optional[typing.List[typing.Optional[str]]]:
+        """
+        Map file axes on :py:meth:`return_order` axes. Axes of size one without mapping are mapped on None.
+
+        :return: list of axes letters or None if there is no unique mapping
+        """
+        order = cls.return_order()
+        targets: typing.List[typing.Optional[str]] = []
+        for letter, size in zip(axes, shape):
+            target = letter if letter in order else _PAGE_AXES_MAPPING.get(letter)
+            if target is None or target not in order:
+                if size > 1 and letter not in drop:
+                    return None
+                target = None
+            elif target in targets:
+                if size > 1:
+                    prev = targets.index(target)
+                    if shape[prev] > 1:
+                        return None
+                    targets[prev] = None
+                else:
+                    target = None
+            targets.append(target)
+        return targets
+
+    def _create_output(
+        self, axes: str, shape: typing.Sequence[int], dtype, drop: str = ""
+    ) -> typing.Optional[typing.Tuple[np.ndarray, np.ndarray, typing.List[typing.Optional[np.ndarray]]]]:
+        """
+        Allocate array in :py:meth:`return_order` for data with given file axes (with selection applied),
+        to fill it chunk by chunk with :py:meth:`_chunk_index`.
+
+        :param axes: axes of data in file
+        :param shape: shape of data in file
+        :param dtype: type of data
+        :param drop: axes from which only first element should be read
+        :return: output array, its view in file axes order and selected indices for each file axis
+            (None if whole axis is read). None if axes of file cannot be mapped on :py:meth:`return_order`
+        """
+        order = self.return_order()
+        targets = self._map_axes(axes, shape, drop)
+        if targets is None:
+            return None
+        selection = {"C": self.channels, "T": self.time_range, "Z": self.z_range}
+        out_shape = [1] * len(order)
+        indices: typing.List[typing.Optional[np.ndarray]] = []
+        for target, size in zip(targets, shape):
+            if target is None:
+                indices.append(None)
+                continue
+            index = None
+            if target == "C" and self.channels is not None:
+                if any(not -size <= x < size for x in self.channels):
+                    raise IndexError(f"Channel index out of range. File has {size} channels")
+                index = np.array(self.channels, dtype=np.intp) % size
+            elif selection.get(target) is not None:
+                index = np.arange(size)[slice(*selection[target])]
+            indices.append(index)
+            out_shape[order.index(target)] = size if index is None else index.size
+        if any(x not in targets and selection.get(x) is not None and not range(1)[slice(*selection[x])] for x in order):
+            # selection outside of single element axis, result is empty
+            return None
+        out = np.zeros(out_shape, dtype=dtype)
+        used = [x for x in targets if x is not None]
+        view = out[tuple(slice(None) if x in used else 0 for x in order)]
+        used_order = [x for x in order if x in used]
+        view = np.moveaxis(view, [used_order.index(x) for x in used], list(range(len(used))))
+        view = np.expand_dims(view, [i for i, x in enumerate(targets) if x is None])
+        return out, view, indices
+
+    @staticmethod
+    def _chunk_index(
+        indices: typing.List[typing.Optional[np.ndarray]],
+        start: typing.Sequence[int],
+        chunk_shape: typing.Sequence[int],
+        out_shape: typing.Sequence[int],
+    ) -> typing.Optional[typing.Tuple[tuple, tuple]]:
+        """
+        Calculate where chunk of data starting at ``start`` should be placed in output view
+        created by :py:meth:`_create_output`.
+
+        :return: index in output view and index in chunk, None if chunk does not contain selected data
+        """
+        out_index: typing.List[typing.Union[slice, np.ndarray]] = []
+        chunk_index: typing.List[typing.Union[slice, np.ndarray]] = []
+        for selected, begin, size, total in zip(indices, start, chunk_shape, out_shape):
+            if selected is None:
+                stop = min(begin + size, total)
+                if stop <= begin:
+                    return None
+                out_index.append(slice(begin, stop))
+                chunk_index.append(slice(0, stop - begin))
+                continue
+            mask = (selected >= begin) & (selected < begin + size)
+            if not mask.any():
+                return None
+            out_index.append(np.nonzero(mask)[0])
+            chunk_index.append(selected[mask] - begin)
+        advanced = [i for i, x in enumerate(out_index) if isinstance(x, np.ndarray)]
+        for j, i in enumerate(advanced):
+            # open mesh, like np.ix_, to select cartesian product of indices
+            shape = [1] * len(advanced)
+            shape[j] = -1
+            out_index[i] = out_index[i].reshape(shape)
+            chunk_index[i] = chunk_index[i].reshape(shape)
+        return tuple(out_index), tuple(chunk_index)
+
     @abstractmethod
     def read(self, image_path: typing.Union[str, Path], mask_path=None, ext=None) -> Image:
         """
@@ -87,6 +264,10 @@ class BaseImageReader:
         mask_path=None,
         callback_function: typing.Optional[typing.Callable] = None,
         default_spacing: typing.Optional[typing.Tuple[float, float, float]] = None,
+        lazy: bool = False,
+        channels: typing.Optional[typing.Sequence[int]] = None,
+        time_range: typing.Optional[typing.Tuple[int, int]] = None,
+        z_range: typing.Optional[typing.Tuple[int, int]] = None,
     ) -> Image:
         """
         read image file with optional mask file
@@ -96,14 +277,35 @@ class BaseImageReader:
         :param callback_function: function for provide information about progress in reading file (for progressbar)
         :param default_spacing: used if file do not contains information about spacing
             (or metadata format is not supported)
+        :param lazy: if possible, do not read pixel data to memory but map them from file.
+            Data are read on first access. Readers without support for lazy reading ignore this flag.
+        :param channels: indices of channels to read, all if None
+        :param time_range: half open range ``(start, stop)`` of time points to read, all if None
+        :param z_range: half open range ``(start, stop)`` of z-slices to read, all if None
         :return: image
         """
         # TODO add generic description of callback function
-        instance = cls(callback_function)
+        instance = cls(callback_function, lazy=lazy)
         if default_spacing is not None:
             instance.set_default_spacing(default_spacing)
+        instance.set_selection(channels, time_range, z_range)
         return instance.read(image_path, mask_path)
 
+    @classmethod
+    def estimate_image_size(cls, image_path: typing.Union[str, Path]) -> int:
+        """
+        Estimate size (in bytes) of image data after reading without reading pixel data.
+        Base implementation returns size of file.
+
+        :param image_path: path to image
+        :return: number of bytes
+        """
+        return os.path.getsize(image_path)
+
+    @staticmethod
+    def _data_size(shape: typing.Sequence[int], dtype) -> int:
+        return int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+
     @staticmethod
     def _reduce_obsolete_dummy_axes(array, axes) -> typing.Tuple[np.ndarray, str]:
         """
@@ -148,7 +350,8 @@ class BaseImageReader:
             while i < len(axes_li):
                 name = axes_li[i]
                 if name not in final_mapping_dict and array.shape[i] == 1:
-                    array = array.take(0, i)
+                    # indexing instead of take to get view of (possibly memory mapped) array
+                    array = array[(slice(None),) * i + (0,)]
                     axes_li.pop(i)
                 else:
                     i += 1
@@ -188,6 +391,10 @@ class BaseImageReaderBuffer(BaseImageReader):
         mask_path=None,
         callback_function: typing.Optional[typing.Callable] = None,
         default_spacing: typing.Optional[typing.Tuple[float, float, float]] = None,
+        lazy: bool = False,
+        channels: typing.Optional[typing.Sequence[int]] = None,
+        time_range: typing.Optional[typing.Tuple[int, int]] = None,
+        z_range: typing.Optional[typing.Tuple[int, int]] = None,
     ) -> Image:
         """
         read image file with optional mask file
@@ -197,12 +404,18 @@ class BaseImageReaderBuffer(BaseImageReader):
         :param callback_function: function for provide information about progress in reading file (for progressbar)
         :param default_spacing: used if file do not contains information about spacing
             (or metadata format is not supported)
+        :param lazy: if possible, do not read pixel data to memory but map them from file.
+            Data are read on first access. Readers without support for lazy reading ignore this flag.
+        :param channels: indices of channels to read, all if None
+        :param time_range: half open range ``(start, stop)`` of time points to read, all if None
+        :param z_range: half open range ``(start, stop)`` of z-slices to read, all if None
         :return: image
         """
         # TODO add generic description of callback function
-        instance = cls(callback_function)
+        instance = cls(callback_function, lazy=lazy)
         if default_spacing is not None:
             instance.set_default_spacing(default_spacing)
+        instance.set_selection(channels, time_range, z_range)
         return instance.read(image_path, mask_path)
 
 
@@ -217,16 +430,39 @@ class GenericImageReader(BaseImageReaderBuffer):
                 ext = ".tif"
         ext = ext.lower()
         if ext == ".czi":
-            return CziImageReader.read_image(image_path, mask_path, self.callback_function, self.default_spacing)
+            return self._read_with(CziImageReader, image_path, mask_path)
         if ext in [".oif", ".oib"]:
             if isinstance(image_path, BytesIO):
                 raise NotImplementedError("Oif format is not supported for BytesIO")
-            return OifImagReader.read_image(image_path, mask_path, self.callback_function, self.default_spacing)
+            return self._read_with(OifImagReader, image_path, mask_path)
         if ext == ".obsep":
             if isinstance(image_path, BytesIO):
                 raise NotImplementedError("Obsep format is not supported for BytesIO")
-            return ObsepImageReader.read_image(image_path, mask_path, self.callback_function, self.default_spacing)
-        return TiffImageReader.read_image(image_path, mask_path, self.callback_function, self.default_spacing)
+            return self._read_with(ObsepImageReader, image_path, mask_path)
+        return self._read_with(TiffImageReader, image_path, mask_path)
+
+    def _read_with(self, reader_class: typing.Type[BaseImageReader], image_path, mask_path) -> Image:
+        return reader_class.read_image(
+            image_path,
+            mask_path,
+            self.callback_function,
+            self.default_spacing,
+            lazy=self.lazy,
+            channels=self.channels,
+            time_range=self.time_range,
+            z_range=self.z_range,
+        )
+
+    @classmethod
+    def estimate_image_size(cls, image_path: typing.Union[str, Path]) -> int:
+        ext = os.path.splitext(image_path)[1].lower()
+        if ext == ".czi":
+            return CziImageReader.estimate_image_size(image_path)
+        if ext in [".oif", ".oib"]:
+            return OifImagReader.estimate_image_size(image_path)
+        if ext == ".obsep":
+            return ObsepImageReader.estimate_image_size(image_path)
+        return TiffImageReader.estimate_image_size(image_path)
 
 
 class OifImagReader(BaseImageReader):
@@ -234,9 +470,8 @@ class OifImagReader(BaseImageReader):
         with OifFile(image_path) as image_file:
             tiffs = tifffile.natural_sorted(image_file.glob("*.tif"))
             with tifffile.TiffFile(image_file.open_file(tiffs[0]), name=tiffs[0]) as tif_file:
-                axes = image_file.series[0].axes + tif_file.series[0].axes
-            image_data = image_file.asarray()
-            image_data = self.update_array_shape(image_data, axes)
+                page_series = tif_file.series[0]
+            image_data = self._read_data(image_file, page_series.axes, page_series.shape, page_series.dtype)
             with suppress(KeyError):
                 self._read_scale_parameter(image_file)
                 # TODO add mask reading
@@ -244,6 +479,29 @@ class OifImagReader(BaseImageReader):
             image_data, self.spacing, file_path=os.path.abspath(image_path), axes_order=self.return_order()
         )
 
+    def _read_data(self, image_file: OifFile, page_axes: str, page_shape: typing.Tuple[int, ...], dtype) -> np.ndarray:
+        """
+        Read TIFF files of first series one by one directly into array in :py:meth:`return_order`.
+        Files outside selection are not read.
+        """
+        series = image_file.series[0]
+        axes = series.axes + page_axes
+        output = self._create_output(axes, series.shape + page_shape, dtype)
+        if output is None:
+            return self._select_data(self.update_array_shape(image_file.asarray(), axes))
+        out, view, indices = output
+        chunk_shape = (1,) * len(series.shape) + page_shape
+        for index, file_name in zip(series.indices, series):
+            position = self._chunk_index(indices, tuple(index) + (0,) * len(page_shape), chunk_shape, view.shape)
+            if position is not None:
+                view[position[0]] = image_file.asarray(file_name).reshape(chunk_shape)[position[1]]
+        return out
+
+    @classmethod
+    def estimate_image_size(cls, image_path: typing.Union[str, Path]) -> int:
+        with OifFile(image_path) as image_file:
+            return cls._data_size(image_file.shape, image_file.dtype)
+
     def _read_scale_parameter(self, image_file):
         flat_parm = image_file.mainfile["Reference Image Parameter"]
         x_scale = flat_parm["HeightConvertValue"] * name_to_scalar[flat_parm["HeightUnit"]]
@@ -269,10 +527,9 @@ class CziImageReader(BaseImageReaderBuffer):
     """
 
     def read(self, image_path: typing.Union[str, BytesIO, Path], mask_path=None, ext=None) -> Image:
-        image_file = CziFile(image_path)
-        image_data = image_file.asarray()
-        image_data = self.update_array_shape(image_data, image_file.axes)
-        metadata = image_file.metadata(False)
+        with CziFile(image_path) as image_file:
+            image_data = self._read_data(image_file)
+            metadata = image_file.metadata(False)
         with suppress(KeyError):
             scaling = metadata["ImageDocument"]["Metadata"]["Scaling"]["Items"]["Distance"]
             scale_info = {el["Id"]: el["Value"] for el in scaling}
@@ -286,6 +543,42 @@ class CziImageReader(BaseImageReaderBuffer):
             image_path = ""
         return self.image_class(image_data, self.spacing, file_path=image_path, axes_order=self.return_order())
 
+    def _read_data(self, image_file: CziFile) -> np.ndarray:
+        """
+        Decode subblocks directly into array allocated in :py:meth:`return_order`.
+        Whole file is decoded by :py:meth:`CziFile.asarray` in threads into view of this array.
+        If selection is set then only subblocks with selected data are decoded.
+        """
+        output = self._create_output(image_file.axes, image_file.shape, image_file.dtype, drop="0")
+        if output is None:
+            return self._select_data(self.update_array_shape(self._read_all(image_file), image_file.axes))
+        out, view, indices = output
+        if all(x is None for x in indices):
+            if view.shape != tuple(image_file.shape):
+                # only first sample of multi sample data is used
+                return self.update_array_shape(self._read_all(image_file), image_file.axes)
+            self._read_all(image_file, out=view)
+            return out
+        start = image_file.start
+        for entry in image_file.filtered_subblock_directory:
+            begin = [i - j for i, j in zip(entry.start, start)]
+            if self._chunk_index(indices, begin, entry.shape, view.shape) is None:
+                continue
+            tile = entry.data_segment().data(resize=True, order=0)
+            position = self._chunk_index(indices, begin, tile.shape, view.shape)
+            if position is not None:
+                view[position[0]] = tile[position[1]]
+        return out
+
+    @staticmethod
+    def _read_all(image_file: CziFile, out: typing.Optional[np.ndarray] = None) -> np.ndarray:
+        return image_file.asarray(out=out, max_workers=max(1, (os.cpu_count() or 1) // 2))
+
+    @classmethod
+    def estimate_image_size(cls, image_path: typing.Union[str, Path]) -> int:
+        with CziFile(image_path) as image_file:
+            return cls._data_size(image_file.shape, image_file.dtype)
+
     @classmethod
     def update_array_shape(cls, array: np.ndarray, axes: str):
         if "B" in axes:
@@ -304,15 +597,15 @@ class CziImageReader(BaseImageReaderBuffer):
 
 
 class ObsepImageReader(BaseImageReader):
-    def _search_for_files(
-        self,
+    @staticmethod
+    def _search_for_paths(
         directory: Path,
         channels: typing.List["Element"],
         suffix: str = "",
         required: bool = False,
-    ) -> typing.List[Image]:
+    ) -> typing.List[Path]:
         possible_extensions = [".tiff", ".tif", ".TIFF", ".TIF"]
-        channel_list = []
+        path_list = []
         for channel in channels:
             try:
                 name = next(iter(channel)).attrib["val"] + suffix
@@ -326,22 +619,118 @@ class ObsepImageReader(BaseImageReader):
                 if required:
                     raise ValueError(f"Not found file for key {name}")
                 continue
-            channel_list.append(TiffImageReader.read_image(directory / name, default_spacing=self.default_spacing))
-        return channel_list
+            path_list.append(directory / name)
+        return path_list
 
-    def read(self, image_path: typing.Union[str, Path], mask_path=None, ext=None) -> Image:
-        directory = Path(os.path.dirname(image_path))
-        xml_doc = ElementTree.parse(image_path).getroot()
+    def _channel_reader(self, max_workers: typing.Optional[int] = None) -> "TiffImageReader":
+        reader = TiffImageReader(lazy=self.lazy, max_workers=max_workers)
+        reader.set_default_spacing(self.default_spacing)
+        reader.set_selection(time_range=self.time_range, z_range=self.z_range)
+        return reader
+
+    def _merge_channel_files(self, paths: typing.List[Path]) -> Image:
+        """
+        Read each channel file as separate image and merge them.
+        Used for lazy reading, where channels are views of memory mapped files,
+        so merge does not copy data.
+        """
+        if self.channels is not None:
+            paths = [paths[i] for i in self.channels]
+        image = self._channel_reader().read(paths[0])
+        for path in paths[1:]:
+            image = image.merge(self._channel_reader().read(path), "C")
+        return image
+
+    def _channel_metadata(self, files: typing.List[tifffile.TiffFile]) -> typing.Tuple[tuple, dict]:
+        """
+        Collect metadata of channel files. Spacing is read from first file.
+        Per channel metadata are used only if each file provides them for single channel.
+        """
+        readers = []
+        for image_file in files:
+            reader = self._channel_reader()
+            reader._read_metadata(image_file)
+            readers.append(reader)
+        metadata = {}
+        for name in ("channel_names", "colors"):
+            values = [getattr(x, name) for x in readers]
+            if all(x is not None and len(x) == 1 for x in values):
+                metadata[name] = self._select_channel_metadata([x[0] for x in values])
+        return tuple(readers[0].spacing), metadata
+
+    def _read_channel_files(self, paths: typing.List[Path]) -> Image:
+        """
+        Read channel files into single array allocated with :py:meth:`_create_output`.
+        Each file is decoded by separate thread directly into its channel.
+        Decompression in tifffile releases GIL, so reading time is close to the time
+        of reading the largest file. Threads are split between files to not oversubscribe processor.
+        """
+        if self.lazy:
+            return self._merge_channel_files(paths)
+        with ExitStack() as stack:
+            files = [stack.enter_context(tifffile.TiffFile(path)) for path in paths]
+            series = files[0].series[0]
+            if any(x.series[0].shape != series.shape or x.series[0].axes != series.axes for x in files[1:]):
+                raise ValueError("Channel files of obsep image have different shapes")
+            dtype = np.result_type(*(x.series[0].dtype for x in files))
+            output = self._create_output("C" + series.axes, (len(files), *series.shape), dtype)
+            if output is None:
+                return self._merge_channel_files(paths)
+            out, view, indices = output
+            to_read = sorted(set(range(len(files)) if indices[0] is None else indices[0].tolist()))
+            cpu_count = os.cpu_count() or 1
+            per_file_workers = max(1, cpu_count // len(to_read))
+
+            def _read_file(num):
+                data = files[num].asarray(series=0, maxworkers=per_file_workers)[np.newaxis]
+                position = self._chunk_index(indices, (num,) + (0,) * (data.ndim - 1), data.shape, view.shape)
+                if position is not None:
+                    view[position[0]] = data[position[1]]
+
+            workers = min(len(to_read), cpu_count)
+            if workers < 2:
+                for num in to_read:
+                    _read_file(num)
+            else:
+                with ThreadPoolExecutor(workers) as executor:
+                    list(executor.map(_read_file, to_read))
+            spacing, metadata = self._channel_metadata(files)
+        return self.image_class(
+            out,
+            spacing,
+            default_coloring=metadata.get("colors"),
+            channel_names=metadata.get("channel_names"),
+            file_path=str(paths[0]),
+            axes_order=self.return_order(),
+        )
+
+    @staticmethod
+    def _read_channels(xml_doc) -> typing.List["Element"]:
         channels = xml_doc.findall("net/node/node/attribute[@name='image type']")
         if not channels:
             raise ValueError("Information about channel images not found")  # pragma: no cover
-        channel_list = [
-            *self._search_for_files(directory, channels, required=True),
-            *self._search_for_files(directory, channels, "_deconv"),
+        return channels
+
+    @classmethod
+    def estimate_image_size(cls, image_path: typing.Union[str, Path]) -> int:
+        directory = Path(os.path.dirname(image_path))
+        channels = cls._read_channels(ElementTree.parse(image_path).getroot())
+        paths = [
+            *cls._search_for_paths(directory, channels, required=True),
+            *cls._search_for_paths(directory, channels, "_deconv"),
         ]
-        image = channel_list[0]
-        for el in channel_list[1:]:
-            image = image.merge(el, "C")
+        return sum(TiffImageReader.estimate_image_size(path) for path in paths)
+
+    def read(self, image_path: typing.Union[str, Path], mask_path=None, ext=None) -> Image:
+        directory = Path(os.path.dirname(image_path))
+        xml_doc = ElementTree.parse(image_path).getroot()
+        channels = self._read_channels(xml_doc)
+        paths = [
+            *self._search_for_paths(directory, channels, required=True),
+            *self._search_for_paths(directory, channels, "_deconv"),
+        ]
+        # only selected channel files are read
+        image = self._read_channel_files(paths)
 
         z_spacing = (
             float(xml_doc.find("net/node/attribute[@name='step width']/double").attrib["val"]) * name_to_scalar["um"]
@@ -356,18 +745,28 @@ class TiffImageReader(BaseImageReaderBuffer):
     """
     TIFF/LSM files reader. Base reading with :py:meth:`BaseImageReader.read_image`
 
+    :param max_workers: maximum number of threads used by tifffile to decode pages concurrently,
+        None means tifffile default
+
     image_file: tifffile.TiffFile
     mask_file: tifffile.TiffFile
     """
 
-    def __init__(self, callback_function=None):
-        super().__init__(callback_function)
+    def __init__(self, callback_function=None, lazy: bool = False, max_workers: typing.Optional[int] = None):
+        super().__init__(callback_function, lazy=lazy)
+        self.max_workers = max_workers
         self.colors = None
         self.channel_names = None
         self.ranges = None
         self.shift = (0, 0, 0)
         self.name = ""
 
+    @classmethod
+    def estimate_image_size(cls, image_path: typing.Union[str, BytesIO, Path]) -> int:
+        with tifffile.TiffFile(image_path) as image_file:
+            series = image_file.series[0]
+            return cls._data_size(series.shape, series.dtype)
+
     def read(self, image_path: typing.Union[str, BytesIO, Path], mask_path=None, ext=None) -> Image:
         """
         Read tiff image from tiff_file
@@ -378,15 +777,7 @@ class TiffImageReader(BaseImageReaderBuffer):
 
             axes = image_file.series[0].axes
 
-            if image_file.is_lsm:
-                self.read_lsm_metadata(image_file)
-            elif image_file.is_imagej:
-                self.read_imagej_metadata(image_file)
-            elif image_file.is_ome:
-                self.read_ome_metadata(image_file)
-            else:
-                x_spacing, y_spacing = self.read_resolution_from_tags(image_file)
-                self.spacing = self.default_spacing[0], y_spacing, x_spacing
+            self._read_metadata(image_file)
             mutex = Lock()
             count_pages = [0]
 
@@ -407,18 +798,22 @@ class TiffImageReader(BaseImageReaderBuffer):
                         pos: typing.List[typing.Union[slice, int]] = [slice(None) for _ in range(mask_data.ndim)]
                         pos[self.return_order().index("C")] = 0
                         mask_data = mask_data[tuple(pos)]
+                    mask_data = self._select_mask(mask_data)
 
             else:
                 mask_data = None
                 if total_pages_num > 1:
                     self.callback_function("max", total_pages_num)
 
-            image_file.report_func = report_func
-            try:
-                image_data = image_file.asarray()
-            except ValueError as e:  # pragma: no cover
-                raise TiffFileException(*e.args) from e
-            image_data = self.update_array_shape(image_data, axes)
+            image_data = self._memmap_data(image_path, image_file) if self.lazy else None
+            selected = ""
+            if image_data is None:
+                image_file.report_func = report_func
+                try:
+                    image_data, selected = self._read_selected_pages(image_file)
+                except ValueError as e:  # pragma: no cover
+                    raise TiffFileException(*e.args) from e
+            image_data = self._select_data(self.update_array_shape(image_data, axes), skip=selected)
 
         if not isinstance(image_path, (str, Path)):
             image_path = ""
@@ -426,15 +821,92 @@ class TiffImageReader(BaseImageReaderBuffer):
             image_data,
             self.spacing,
             mask=mask_data,
-            default_coloring=self.colors,
-            channel_names=self.channel_names,
-            ranges=self.ranges,
+            default_coloring=self._select_channel_metadata(self.colors),
+            channel_names=self._select_channel_metadata(self.channel_names),
+            ranges=self._select_channel_metadata(self.ranges),
             file_path=os.path.abspath(image_path),
             axes_order=self.return_order(),
             shift=self.shift,
             name=self.name,
         )
 
+    def _read_metadata(self, image_file: tifffile.TiffFile):
+        """Read spacing and channel metadata from file"""
+        if image_file.is_lsm:
+            self.read_lsm_metadata(image_file)
+        elif image_file.is_imagej:
+            self.read_imagej_metadata(image_file)
+        elif image_file.is_ome:
+            self.read_ome_metadata(image_file)
+        else:
+            x_spacing, y_spacing = self.read_resolution_from_tags(image_file)
+            self.spacing = self.default_spacing[0], y_spacing, x_spacing
+
+    def _read_selected_pages(self, image_file: tifffile.TiffFile) -> typing.Tuple[np.ndarray, str]:
+        """
+        Read data of first series. If selection is set then decode only pages
+        which belong to selected channels, time points and z-slices.
+        Selection could be pushed down only for axes which are split between pages.
+
+        :return: data with axes of series and letters of axes (in image axes names) on which selection was applied
+        """
+        series = image_file.series[0]
+        shape = series.shape
+        lead = None
+        if self.has_selection:
+            page_size = int(np.prod(series.keyframe.shape))
+            lead = next(
+                (
+                    i
+                    for i in range(1, len(shape) + 1)
+                    if int(np.prod(shape[:i])) == len(series.pages) and int(np.prod(shape[i:])) == page_size
+                ),
+                None,
+            )
+        if lead is None:
+            return image_file.asarray(maxworkers=self.max_workers), ""
+        selection = {"C": self.channels, "T": self.time_range, "Z": self.z_range}
+        lead_axes = [_PAGE_AXES_MAPPING.get(x, x) for x in series.axes[:lead]]
+        if len(set(lead_axes)) != lead:
+            return image_file.asarray(maxworkers=self.max_workers), ""
+        index_list = []
+        selected = ""
+        for letter, size in zip(lead_axes, shape[:lead]):
+            if selection.get(letter) is None:
+                index_list.append(np.arange(size))
+                continue
+            selected += letter
+            if letter == "C":
+                if any(not -size <= x < size for x in self.channels):
+                    raise IndexError(f"Channel index out of range. File has {size} channels")
+                index_list.append(np.array(self.channels) % size)
+            else:
+                index_list.append(np.arange(size)[slice(*selection[letter])])
+        if not selected or any(x.size == 0 for x in index_list):
+            return image_file.asarray(maxworkers=self.max_workers), ""
+        pages = np.ravel_multi_index(np.meshgrid(*index_list, indexing="ij"), shape[:lead]).ravel()
+        data = image_file.asarray(key=pages.tolist(), series=0, maxworkers=self.max_workers)
+        return np.reshape(data, tuple(x.size for x in index_list) + tuple(shape[lead:])), selected
+
+    @staticmethod
+    def _memmap_data(image_path, image_file: tifffile.TiffFile) -> typing.Optional[np.ndarray]:
+        """
+        Map image data from file without reading them. Data are read by operating system
+        on access, so only used part of image (channel, time point) is loaded to memory.
+        Mapping is copy on write, so modification of array do not change file.
+
+        :return: mapped array or None if data are compressed, not contiguous or image is read from buffer
+        """
+        if not isinstance(image_path, (str, Path)):
+            return None
+        series = image_file.series[0]
+        if series.dataoffset is None or not series.dtype.isnative:
+            return None
+        try:
+            return tifffile.memmap(image_path, series=0, mode="c")
+        except ValueError:  # pragma: no cover
+            return None
+
     @staticmethod
     def verify_mask(mask_file, image_file):
         """
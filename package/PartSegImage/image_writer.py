@@ -1,14 +1,71 @@
+import inspect
 import typing
 from abc import ABC, abstractmethod
+from functools import partial
 from io import BytesIO
 from itertools import product
 from pathlib import Path
 
 import numpy as np
-from tifffile import imwrite
+from tifffile import TiffWriter, imwrite
 
 from PartSegImage.image import Image, minimal_dtype
 
+CODECS_WITHOUT_LEVEL = {"LZW", "PACKBITS", "CCITTRLE", "CCITT_T4", "CCITT_T6"}
+CODEC_LEVEL_RANGE = {
+    "ZSTD": (1, 22),
+    "ADOBE_DEFLATE": (0, 9),
+    "DEFLATE": (0, 9),
+    "LZMA": (0, 9),
+    "BROTLI": (0, 11),
+}
+# tifffile older than 2022.7.28 accept codec level only as ``compression=(codec, level)`` tuple
+_COMPRESSIONARGS_SUPPORTED = "compressionargs" in inspect.signature(TiffWriter.write).parameters
+
+
+def _block_mean(plane: np.ndarray, step: int) -> np.ndarray:
+    """mean of ``step`` x ``step`` blocks of plane. Blocks on bottom and right border could be smaller"""
+    index_y = np.arange(0, plane.shape[0], step)
+    index_x = np.arange(0, plane.shape[1], step)
+    sums = np.add.reduceat(np.add.reduceat(plane, index_y, axis=0, dtype=np.float64), index_x, axis=1)
+    counts = np.outer(np.diff(index_y, append=plane.shape[0]), np.diff(index_x, append=plane.shape[1]))
+    res = sums / counts
+    if np.issubdtype(plane.dtype, np.integer):
+        res = np.rint(res)
+    return res.astype(plane.dtype)
+
+
+def _block_mode(plane: np.ndarray, step: int) -> np.ndarray:
+    """
+    most common value of ``step`` x ``step`` blocks of plane. Blocks on bottom and right border could be smaller.
+    If there are multiple most common values, the smallest one is selected.
+    """
+    width = -(-plane.shape[1] // step)
+    block = ((np.arange(plane.shape[0]) // step)[:, np.newaxis] * width + np.arange(plane.shape[1]) // step).ravel()
+    values = plane.ravel()
+    order = np.lexsort((values, block))
+    block, values = block[order], values[order]
+    start = np.flatnonzero(np.r_[True, (block[1:] != block[:-1]) | (values[1:] != values[:-1])])
+    length = np.diff(np.r_[start, block.size])
+    run_block, run_value = block[start], values[start]
+    best = np.lexsort((run_value, -length, run_block))
+    first = best[np.r_[True, run_block[best][1:] != run_block[best][:-1]]]
+    return run_value[first].reshape(-1, width)
+
+
+def _downsample_plane(plane: np.ndarray, step: int, labels: bool = False) -> np.ndarray:
+    """
+    Downsample plane by ``step`` in both axes.
+
+    :param plane: 2d array
+    :param step: size of block reduced to single pixel
+    :param labels: if True then plane contains labels and most common value of block is used,
+        otherwise mean of block.
+    """
+    if step == 1:
+        return plane
+    return _block_mode(plane, step) if labels else _block_mean(plane, step)
+
 
 class BaseImageWriter(ABC):
     @classmethod
@@ -62,30 +119,72 @@ class ImageWriter(BaseImageWriter):
         return metadata
 
     @classmethod
-    def save(cls, image: Image, save_path: typing.Union[str, BytesIO, Path], compression="ADOBE_DEFLATE"):
+    def save(
+        cls,
+        image: Image,
+        save_path: typing.Union[str, BytesIO, Path],
+        compression="ADOBE_DEFLATE",
+        compression_level: typing.Optional[int] = None,
+        pyramid_levels: int = 0,
+        tile: typing.Tuple[int, int] = (256, 256),
+    ):
         """
         Save image as tiff to path or buffer
 
         :param image: image for save
         :param save_path: save location
+        :param compression: tifffile name of codec used for each page, for example
+            ``"zstd"``, ``"lzw"``, ``"adobe_deflate"`` or ``None`` for no compression
+        :param compression_level: codec level, ignored for codecs without levels
+        :param pyramid_levels: number of downsampled resolution levels stored as SubIFDs of each plane.
+            If positive, image is saved as tiled pyramidal OME-TIFF. Each level halves the y, x size,
+            each level is calculated from full resolution data, pixel of level ``L`` is mean
+            of ``2**L`` x ``2**L`` block.
+        :param tile: tile shape (multiple of 16) used for pyramidal output
         """
-        data = image.get_image_for_save()
-
         metadata = cls.prepare_metadata(image, image.channels)
 
         metadata["Channel"] = {
             "Name": image.channel_names,
             "axes": "TZYXC",
         }
-        cls._save(data, save_path, metadata, compression)
+        if pyramid_levels > 0:
+            shape = (image.times, image.layers, image.channels, *image.plane_shape)
+            cls._save_pyramid(
+                partial(cls._image_planes, image),
+                shape,
+                image.dtype,
+                save_path,
+                metadata,
+                cls.compression_kwargs(compression, compression_level),
+                pyramid_levels,
+                tile,
+            )
+            return
+        data = image.get_image_for_save()
+        cls._save(data, save_path, metadata, compression, compression_level)
 
     @classmethod
-    def save_mask(cls, image: Image, save_path: typing.Union[str, Path], compression="ADOBE_DEFLATE"):
+    def save_mask(
+        cls,
+        image: Image,
+        save_path: typing.Union[str, Path],
+        compression="ADOBE_DEFLATE",
+        compression_level: typing.Optional[int] = None,
+        pyramid_levels: int = 0,
+        tile: typing.Tuple[int, int] = (256, 256),
+    ):
         """
         Save mask connected to image as tiff to path or buffer
 
         :param image: mast is obtain with :py:meth:`.Image.get_mask_for_save`
         :param save_path: save location
+        :param compression: tifffile name of codec, see :py:meth:`save`
+        :param compression_level: codec level, ignored for codecs without levels
+        :param pyramid_levels: number of downsampled resolution levels, see :py:meth:`save`.
+            Each level is calculated from full resolution data, pixel of level ``L`` is most common label
+            of ``2**L`` x ``2**L`` block.
+        :param tile: tile shape (multiple of 16) used for pyramidal output
         """
         mask = image.get_mask_for_save()
         if mask is None:
@@ -97,19 +196,111 @@ class ImageWriter(BaseImageWriter):
             "Name": "Mask",
             "axes": "TZYX",
         }
-        cls._save(mask, save_path, metadata, compression)
+        if pyramid_levels > 0:
+            cls._save_pyramid(
+                partial(cls._array_planes, mask),
+                mask.shape,
+                mask.dtype,
+                save_path,
+                metadata,
+                cls.compression_kwargs(compression, compression_level),
+                pyramid_levels,
+                tile,
+            )
+            return
+        cls._save(mask, save_path, metadata, compression, compression_level)
 
     @staticmethod
-    def _save(data: np.ndarray, save_path, metadata=None, compression="ADOBE_DEFLATE"):
-        # TODO change to ome TIFF
+    def compression_kwargs(compression, compression_level: typing.Optional[int] = None) -> typing.Dict[str, typing.Any]:
+        """
+        Prepare ``compression`` and ``compressionargs`` arguments of tifffile write functions.
+        For tifffile without ``compressionargs`` support level is passed in ``(codec, level)`` tuple.
+
+        :param compression: tifffile name of codec or ``None``
+        :param compression_level: codec level, ignored for codecs without levels.
+            Level outside of range supported by codec (see :py:data:`CODEC_LEVEL_RANGE`) is clamped to this range.
+        """
+        if not compression or str(compression).upper() == "NONE":
+            return {"compression": None}
+        name = str(compression).upper()
+        if compression_level is None or name in CODECS_WITHOUT_LEVEL:
+            return {"compression": compression}
+        if name in CODEC_LEVEL_RANGE:
+            min_level, max_level = CODEC_LEVEL_RANGE[name]
+            compression_level = min(max(compression_level, min_level), max_level)
+        if not _COMPRESSIONARGS_SUPPORTED:
+            return {"compression": (compression, compression_level)}
+        return {"compression": compression, "compressionargs": {"level": compression_level}}
+
+    @staticmethod
+    def _image_planes(image: Image, step: int) -> typing.Iterator[np.ndarray]:
+        """yield image planes in TZC order, downsampled by ``step`` with block mean"""
+        for t, z, c in product(range(image.times), range(image.layers), range(image.channels)):
+            yield _downsample_plane(image.get_data_by_axis(T=t, Z=z, C=c), step)
+
+    @staticmethod
+    def _array_planes(labels: np.ndarray, step: int) -> typing.Iterator[np.ndarray]:
+        """yield planes of labels array (last two axes are y, x), downsampled by ``step`` with block mode"""
+        for index in product(*(range(x) for x in labels.shape[:-2])):
+            yield _downsample_plane(labels[index], step, labels=True)
+
+    @staticmethod
+    def _iter_tiles(planes: typing.Iterable[np.ndarray], tile: typing.Tuple[int, int]) -> typing.Iterator[np.ndarray]:
+        for plane in planes:
+            for y, x in product(range(0, plane.shape[0], tile[0]), range(0, plane.shape[1], tile[1])):
+                yield plane[y : y + tile[0], x : x + tile[1]]
+
+    @classmethod
+    def _save_pyramid(
+        cls,
+        planes: typing.Callable[[int], typing.Iterable[np.ndarray]],
+        shape: typing.Tuple[int, ...],
+        dtype: np.dtype,
+        save_path,
+        metadata,
+        compression_kwargs: typing.Dict[str, typing.Any],
+        levels: int,
+        tile: typing.Tuple[int, int],
+    ):
+        """
+        Write tiled OME-TIFF with ``levels`` downsampled SubIFDs.
+        Full resolution tiles are taken from views returned by ``planes(1)`` so no full size copy of data is created.
+        Downsampled levels are calculated plane by plane.
+        """
+        # same threshold as tifffile.imwrite uses for switching to BigTIFF
+        bigtiff = int(np.prod(shape)) * np.dtype(dtype).itemsize > 2**32 - 2**25
+        with TiffWriter(save_path, ome=True, bigtiff=bigtiff) as tif:
+            for level in range(levels + 1):
+                step = 2**level
+                level_shape = (*shape[:-2], -(-shape[-2] // step), -(-shape[-1] // step))
+                kwargs = {"subifds": levels, "software": "PartSeg", "metadata": metadata} if level == 0 else {}
+                tif.write(
+                    cls._iter_tiles(planes(step), tile),
+                    shape=level_shape,
+                    dtype=dtype,
+                    tile=tile,
+                    subfiletype=int(level > 0),
+                    **compression_kwargs,
+                    **kwargs,
+                )
+
+    @classmethod
+    def _save(
+        cls,
+        data: np.ndarray,
+        save_path,
+        metadata=None,
+        compression="ADOBE_DEFLATE",
+        compression_level: typing.Optional[int] = None,
+    ):
         imwrite(
             save_path,
             data,
             ome=True,
             software="PartSeg",
             metadata=metadata,
-            compression=compression,
-        )  # , compress=6,
+            **cls.compression_kwargs(compression, compression_level),
+        )
 
 
 class IMAGEJImageWriter(BaseImageWriter):
@@ -222,6 +222,37 @@ def test_measurement_create(make_napari_viewer, qtbot, bundle_test_dir):
     measurement.measurement_widget.append_measurement_result()
 
 
+def test_measurement_data_reuse(make_napari_viewer, bundle_test_dir):
+    from PartSeg.plugins.napari_widgets.measurement_widget import Measurement
+
+    data = np.zeros((10, 10), dtype=np.uint8)
+    data[2:5, 2:-2] = 1
+    data[5:-2, 2:-2] = 2
+
+    viewer = make_napari_viewer()
+    viewer.add_labels(data, name="label")
+    viewer.add_image(data, name="image")
+    measurement = Measurement(viewer)
+    viewer.window.add_dock_widget(measurement)
+    measurement.reset_choices()
+    measurement_data = measurement.settings.load_metadata(str(bundle_test_dir / "napari_measurements_profile.json"))
+    profile = measurement_data["test"]
+    widget = measurement.measurement_widget
+    image, roi_info = widget._get_measurement_data(profile)
+    image1, roi_info1 = widget._get_measurement_data(profile)
+    assert image1 is image
+    assert roi_info1 is roi_info
+    viewer.layers["label"].events.paint(value=[])
+    image2, roi_info2 = widget._get_measurement_data(profile)
+    assert image2 is not image
+    assert roi_info2 is not roi_info
+    viewer.layers["label"].data = data.copy()
+    image3 = widget._get_measurement_data(profile)[0]
+    assert image3 is not image2
+    viewer.layers["image"].scale = (2, 1)
+    assert widget._get_measurement_data(profile)[0] is not image3
+
+
 def test_update_properties():
     data = np.zeros((10, 10), dtype=np.uint8)
     data[2:5, 2:-2] = 1
@@ -1,11 +1,17 @@
 # pylint: disable=no-self-use
 import json
 import os
+import pickle
 import shutil
+import subprocess  # nosec
 import sys
+import threading
 import time
+import uuid
+from copy import copy
 from glob import glob
 from itertools import dropwhile
+from queue import Queue
 from typing import Callable
 
 import numpy as np
@@ -15,15 +21,27 @@ import tifffile
 
 from PartSegCore.algorithm_describe_base import ROIExtractionProfile
 from PartSegCore.analysis import AnalysisAlgorithmSelection
-from PartSegCore.analysis.batch_processing import batch_backend
+from PartSegCore.analysis.batch_processing import batch_backend, batch_cli
 from PartSegCore.analysis.batch_processing.batch_backend import (
+    MEMORY_ESTIMATION_FACTOR,
+    CalculationJournal,
     CalculationManager,
     CalculationProcess,
+    DataWriter,
+    FileData,
+    FileType,
     ResponseData,
+    ResultCache,
+    ResultSpool,
     SheetData,
+    dataframe_to_arrow,
     do_calculation,
+    estimate_calculation_memory,
+    load_columnar_result,
 )
+from PartSegCore.analysis.batch_processing.parallel_backend import BatchManager, BatchWorker, SubprocessOrder
 from PartSegCore.analysis.calculation_plan import (
+    BaseCalculation,
     Calculation,
     CalculationPlan,
     CalculationTree,
@@ -787,6 +805,234 @@ class TestCalculationProcess:
         assert len(res) == 1
         assert isinstance(res[0], ResponseData)
 
+    @pytest.mark.usefixtures("_prepare_spacing_data")
+    @pytest.mark.usefixtures("_register_dummy_spacing")
+    def test_resume_calculation(self, tmp_path, calculation_plan_dummy_spacing):
+        file_path1 = str(tmp_path / "test1.tiff")
+        file_path2 = str(tmp_path / "test2.tiff")
+        calc = Calculation(
+            [file_path1, file_path2],
+            base_prefix=str(tmp_path),
+            result_prefix=str(tmp_path),
+            measurement_file_path=str(tmp_path / "test3.xlsx"),
+            sheet_name="Sheet1",
+            calculation_plan=calculation_plan_dummy_spacing,
+            voxel_size=(3, 2, 1),
+            overwrite_voxel_size=True,
+        )
+        journal = CalculationJournal(calc)
+        res = CalculationProcess().do_calculation(FileCalculation(file_path1, calc))
+        journal.add(file_path1, res)
+        journal.add(file_path2, [(ValueError("test"), [])])
+        calc2 = copy(calc)
+        calc2.uuid = uuid.uuid4()
+        assert CalculationJournal(calc2).file_path == journal.file_path
+        assert list(CalculationJournal(calc2).load()) == [file_path1]
+
+        manager = CalculationManager(resume=True)
+        manager.add_calculation(calc2)
+        assert manager.batch_manager.work_task == 1
+        wait_for_calculation(manager)
+        df = pd.read_excel(tmp_path / "test3.xlsx", index_col=0, header=[0, 1], engine=ENGINE)
+        assert df.shape == (2, 2)
+        assert not os.path.exists(journal.file_path)
+
+    @pytest.mark.usefixtures("_prepare_spacing_data")
+    @pytest.mark.usefixtures("_register_dummy_spacing")
+    def test_resume_calculation_all_restored(self, tmp_path, calculation_plan_dummy_spacing, monkeypatch):
+        file_path1 = str(tmp_path / "test1.tiff")
+        calc = Calculation(
+            [file_path1],
+            base_prefix=str(tmp_path),
+            result_prefix=str(tmp_path),
+            measurement_file_path=str(tmp_path / "test3.xlsx"),
+            sheet_name="Sheet1",
+            calculation_plan=calculation_plan_dummy_spacing,
+            voxel_size=(3, 2, 1),
+            overwrite_voxel_size=True,
+        )
+        journal = CalculationJournal(calc)
+        journal.add(file_path1, CalculationProcess().do_calculation(FileCalculation(file_path1, calc)))
+        manager = CalculationManager(resume=True)
+        error = (ValueError("write error"), [])
+        monkeypatch.setattr(manager.writer, "calculation_finished", lambda calculation, cleanup=None: [error])
+        manager.add_calculation(calc)
+        assert manager.batch_manager.work_task == 0
+        res = manager.get_results()
+        assert res.errors == [("", error)]
+        assert res.global_counter == 1
+        manager.writer.finish()
+
+    @pytest.mark.usefixtures("_prepare_spacing_data")
+    @pytest.mark.usefixtures("_register_dummy_spacing")
+    def test_memory_budget(self, tmp_path, calculation_plan_dummy_spacing):
+        file_path1 = str(tmp_path / "test1.tiff")
+        file_path2 = str(tmp_path / "test2.tiff")
+        calc = Calculation(
+            [file_path1, file_path2],
+            base_prefix=str(tmp_path),
+            result_prefix=str(tmp_path),
+            measurement_file_path=str(tmp_path / "test3.xlsx"),
+            sheet_name="Sheet1",
+            calculation_plan=calculation_plan_dummy_spacing,
+            voxel_size=(3, 2, 1),
+            overwrite_voxel_size=True,
+        )
+        assert estimate_calculation_memory((0, file_path1), calc) == 400 * MEMORY_ESTIMATION_FACTOR
+        manager = CalculationManager(resume=False)
+        manager.set_number_of_workers(2)
+        manager.set_memory_budget(500 * MEMORY_ESTIMATION_FACTOR)
+        manager.add_calculation(calc, priority=1)
+        assert manager.batch_manager.waiting_tasks_count == 1
+        assert manager.batch_manager.priorities[calc.uuid] == 1
+        manager.set_priority(calc, 2)
+        assert manager.batch_manager.priorities[calc.uuid] == 2
+        wait_for_calculation(manager)
+        df = pd.read_excel(tmp_path / "test3.xlsx", index_col=0, header=[0, 1], engine=ENGINE)
+        assert df.shape == (2, 2)
+        assert manager.journal_dict == {}
+        assert not glob(str(tmp_path / f"*{CalculationJournal.suffix}"))
+
+
+def test_result_cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    (tmp_path / "file.txt").write_bytes(b"test")
+    file_hash = ResultCache.file_hash(str(tmp_path / "file.txt"))
+    assert file_hash == ResultCache.file_hash(str(tmp_path / "file.txt"))
+    key = ResultCache.key(file_hash, MaskProperty.simple_mask())
+    assert key != ResultCache.key(file_hash, MaskProperty.simple_mask().copy(update={"dilate_radius": 2}))
+    assert cache.load(key) is None
+    cache.save(key, np.ones(5))
+    assert np.all(cache.load(key) == 1)
+    with open(cache._path(key), "wb") as f_p:
+        f_p.write(b"broken")
+    assert cache.load(key) is None
+
+
+class TestCalculationCache:
+    @staticmethod
+    def _count_segmentation(monkeypatch):
+        count = [0]
+        run_segmentation = CalculationProcess._run_segmentation
+
+        def _run_segmentation(self, operation):
+            count[0] += 1
+            return run_segmentation(self, operation)
+
+        monkeypatch.setattr(CalculationProcess, "_run_segmentation", _run_segmentation)
+        return count
+
+    @pytest.mark.usefixtures("_prepare_spacing_data")
+    @pytest.mark.usefixtures("_register_dummy_extraction")
+    def test_cache_segmentation(self, tmp_path, monkeypatch, simple_measurement_list):
+        count = self._count_segmentation(monkeypatch)
+        mask_create = MaskCreate(name="", mask_property=MaskProperty.simple_mask())
+        segmentation = ROIExtractionProfile(name="test", algorithm=DummyExtraction.get_name(), values=DummyParams())
+        tree = CalculationTree(
+            RootType.Image,
+            [
+                CalculationTree(
+                    segmentation,
+                    [
+                        CalculationTree(simple_measurement_list, []),
+                        CalculationTree(mask_create, [CalculationTree(segmentation, [])]),
+                    ],
+                )
+            ],
+        )
+        calc = BaseCalculation(
+            base_prefix=str(tmp_path),
+            result_prefix=str(tmp_path),
+            measurement_file_path=str(tmp_path / "test3.xlsx"),
+            sheet_name="Sheet1",
+            calculation_plan=CalculationPlan(tree=tree, name="test"),
+            voxel_size=(1, 1, 1),
+            cache_dir=str(tmp_path / "cache"),
+        )
+        file_path = str(tmp_path / "test1.tiff")
+        res1 = CalculationProcess().do_calculation(FileCalculation(file_path, calc))
+        assert isinstance(res1[0], ResponseData)
+        assert count[0] == 2
+        res2 = CalculationProcess().do_calculation(FileCalculation(file_path, calc))
+        assert count[0] == 2
+        assert res1[0].values[0].to_dataframe().equals(res2[0].values[0].to_dataframe())
+
+        # change of mask parameters invalidate only nodes below
+        tree.children[0].children[1].operation = MaskCreate(
+            name="", mask_property=MaskProperty.simple_mask().copy(update={"dilate_radius": 1})
+        )
+        CalculationProcess().do_calculation(FileCalculation(file_path, calc))
+        assert count[0] == 3
+
+        # other file
+        CalculationProcess().do_calculation(FileCalculation(str(tmp_path / "test2.tiff"), calc))
+        assert count[0] == 5
+
+        calc.cache_dir = None
+        CalculationProcess().do_calculation(FileCalculation(file_path, calc))
+        assert count[0] == 7
+
+
+class TestBatchCli:
+    @pytest.mark.usefixtures("_prepare_spacing_data")
+    @pytest.mark.usefixtures("_register_dummy_spacing")
+    def test_run(self, tmp_path, calculation_plan_dummy_spacing, capsys):
+        plan_path = tmp_path / "plan.json"
+        with plan_path.open("w") as f_p:
+            json.dump({calculation_plan_dummy_spacing.name: calculation_plan_dummy_spacing}, f_p, cls=PartSegEncoder)
+        argv = [str(plan_path), str(tmp_path / "*.tiff"), "-o", str(tmp_path / "result.xlsx"), "-j", "2"]
+        assert batch_cli.main([*argv, "--voxel-size", "3e9", "2e9", "1e9", "--overwrite-voxel-size"]) == 0
+        out = capsys.readouterr().out
+        assert "Progress: 2/2" in out
+        df = pd.read_excel(tmp_path / "result.xlsx", index_col=0, header=[0, 1], engine=ENGINE)
+        assert df.shape == (2, 2)
+
+        assert batch_cli.main([*argv, "--sheet-name", "Sheet2"]) == 1
+        out = capsys.readouterr().out
+        assert len([x for x in out.splitlines() if x.startswith("Error: ")]) == 2
+
+    def test_load_plan(self, tmp_path, calculation_plan_dummy, calculation_plan):
+        plan_path = tmp_path / "plan.json"
+        with plan_path.open("w") as f_p:
+            json.dump({"test": calculation_plan_dummy, "test2": calculation_plan}, f_p, cls=PartSegEncoder)
+        with pytest.raises(ValueError, match="multiple calculation plans"):
+            batch_cli.load_plan(str(plan_path))
+        with pytest.raises(ValueError, match="not found"):
+            batch_cli.load_plan(str(plan_path), "test3")
+        assert batch_cli.load_plan(str(plan_path), "test2").name == calculation_plan.name
+
+    def test_collect_files(self, tmp_path):
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        for name in ["a/1.tif", "a/b/2.tif", "3.tif", "a/4.txt"]:
+            (tmp_path / name).touch()
+        assert batch_cli.collect_files([str(tmp_path / "**" / "*.tif"), str(tmp_path / "3.tif")]) == [
+            str(tmp_path / "3.tif"),
+            str(tmp_path / "a" / "1.tif"),
+            str(tmp_path / "a" / "b" / "2.tif"),
+        ]
+
+    def test_default_workers(self):
+        assert batch_cli.create_parser().parse_args(["plan.json", "*.tif", "-o", "res.xlsx"]).workers == 1
+
+    def test_no_napari_import(self, tmp_path, calculation_plan):
+        plan_path = tmp_path / "plan.json"
+        with plan_path.open("w") as f_p:
+            json.dump({"test": calculation_plan}, f_p, cls=PartSegEncoder)
+        code = (
+            "import sys\n"
+            "from PartSegCore.analysis.batch_processing import batch_cli\n"
+            f"batch_cli.load_plan({str(plan_path)!r})\n"
+            "assert not [x for x in sys.modules if x.split('.')[0] in {'napari', 'napari_builtins', 'qtpy'}]\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True, timeout=300)  # noqa: S603
+
+    def test_no_files(self, tmp_path, calculation_plan_dummy, capsys):
+        plan_path = tmp_path / "plan.json"
+        with plan_path.open("w") as f_p:
+            json.dump({"test": calculation_plan_dummy}, f_p, cls=PartSegEncoder)
+        assert batch_cli.main([str(plan_path), str(tmp_path / "*.tif"), "-o", str(tmp_path / "res.xlsx")]) == 2
+        assert "No files found" in capsys.readouterr().err
+
 
 class MockCalculationProcess(CalculationProcess):
     def do_calculation(self, calculation: FileCalculation):
@@ -818,6 +1064,457 @@ class TestSheetData:
         assert sheet_data.get_data_to_write()[0] == "test_name"
         assert "wait_rows=0" in repr(sheet_data)
 
+    def test_get_new_data(self):
+        cols = [("aa", "nm"), ("bb", "nm")]
+        sheet_data = SheetData("test_name", cols)
+        sheet_data.add_data(["bb", 1, 2], 1)
+        sheet_data.add_data(["aa", 3, 4], 0)
+        data_frame = sheet_data.get_new_data()
+        assert list(data_frame[("name", "units")]) == ["aa", "bb"]
+        assert "wait_rows=0" in repr(sheet_data)
+        assert sheet_data.get_new_data().shape == (0, 3)
+
+
+def test_result_spool(tmp_path):
+    spool = ResultSpool(str(tmp_path / "spool"))
+    columns = pd.MultiIndex.from_tuples([("name", "units"), ("aa", "nm")])
+    assert spool.collect([("uuid1", "sheet", columns)])[0][1].shape == (0, 2)
+    spool.append([("uuid1", "sheet", pd.DataFrame([["a", 1]], columns=columns))])
+    spool.append(
+        [
+            ("uuid1", "sheet", pd.DataFrame([["b", 2], ["c", 3]], columns=columns)),
+            ("uuid2", "sheet", pd.DataFrame([["d", 4]], columns=columns)),
+        ]
+    )
+    (name, data_frame), (name2, data_frame2) = spool.collect([("uuid1", "sheet", columns), ("uuid2", "sheet", columns)])
+    assert name == name2 == "sheet"
+    assert list(data_frame.index) == [0, 1, 2]
+    assert list(data_frame[("aa", "nm")]) == [1, 2, 3]
+    assert data_frame2.shape == (1, 2)
+    spool.remove()
+    assert not os.path.exists(spool.file_path)
+    spool.remove()
+
+
+@pytest.mark.usefixtures("_prepare_mask_project_data")
+@pytest.mark.usefixtures("_register_dummy_extraction")
+@pytest.mark.parametrize("file_name", ["test.xlsx", "test.csv"])
+def test_data_writer_incremental(tmp_path, calculation_plan_dummy, file_name):
+    file_path = str(tmp_path / "test.seg")
+    calc = Calculation(
+        [file_path] * 3,
+        base_prefix=str(tmp_path),
+        result_prefix=str(tmp_path),
+        measurement_file_path=str(tmp_path / file_name),
+        sheet_name="Sheet1",
+        calculation_plan=calculation_plan_dummy,
+        voxel_size=(1, 1, 1),
+    )
+    res = CalculationProcess().do_calculation(FileCalculation(file_path, calc))
+    writer = DataWriter()
+    writer.add_data_part(calc)
+    file_data = writer.file_dict[calc.measurement_file_path]
+    file_data.write_threshold = 2
+    for ind in range(3):
+        for el in res:
+            if isinstance(el, ResponseData):
+                assert not writer.add_result(el, calc, ind=ind)
+            else:
+                writer.add_calculation_error(calc, file_path, el[0])
+    assert not writer.calculation_finished(calc)
+    writer.finish()
+    file_data.write_thread.join()
+    assert not os.path.exists(file_data.spool.file_path)
+    if file_name == "test.csv":
+        df = pd.read_csv(tmp_path / "test_Sheet1.csv", index_col=0, header=[0, 1])
+        assert df.shape == (9, 2)
+        assert list(df.index) == list(range(9))
+        return
+    df = pd.read_excel(tmp_path / file_name, index_col=0, header=[0, 1], engine=ENGINE)
+    assert df.shape == (9, 2)
+    df2 = pd.read_excel(tmp_path / file_name, sheet_name="Errors", index_col=0, engine=ENGINE)
+    assert df2.shape == (3, 2)
+
+
+@pytest.mark.usefixtures("_prepare_mask_project_data")
+@pytest.mark.usefixtures("_register_dummy_extraction")
+def test_data_writer_checkpoint(tmp_path, calculation_plan_dummy):
+    file_path = str(tmp_path / "test.seg")
+    calc = Calculation(
+        [file_path] * 6,
+        base_prefix=str(tmp_path),
+        result_prefix=str(tmp_path),
+        measurement_file_path=str(tmp_path / "test.xlsx"),
+        sheet_name="Sheet1",
+        calculation_plan=calculation_plan_dummy,
+        voxel_size=(1, 1, 1),
+    )
+    res = [
+        el
+        for el in CalculationProcess().do_calculation(FileCalculation(file_path, calc))
+        if isinstance(el, ResponseData)
+    ]
+    writer = DataWriter()
+    writer.add_data_part(calc)
+    file_data = writer.file_dict[calc.measurement_file_path]
+    file_data.write_threshold = 1
+    file_data.checkpoint_count = 1
+    for ind in range(3):
+        writer.add_result(res[0], calc, ind=ind)
+    while not file_data.finished():
+        time.sleep(0.1)
+    df = pd.read_excel(tmp_path / "test.xlsx", index_col=0, header=[0, 1], engine=ENGINE)
+    assert df.shape == (2, 2)
+    assert file_data.checkpoint_count == 4
+    assert not os.path.exists(tmp_path / "test.partial.xlsx")
+    writer.finish()
+    file_data.write_thread.join()
+
+
+def test_text_append_keep_index(tmp_path):
+    file_data = FileData.__new__(FileData)
+    file_data.file_type = FileType.text_file
+    file_data.file_path = str(tmp_path / "test.csv")
+    file_data._text_rows = {"sheet": 5}
+    columns = pd.MultiIndex.from_tuples([("name", "units"), ("aa", "nm")])
+    data_frame = pd.DataFrame([["a", 1], ["b", 2]], columns=columns)
+    file_data._append_data([("uuid1", "sheet", data_frame)])
+    assert list(data_frame.index) == [0, 1]
+    assert file_data._text_rows["sheet"] == 7
+
+
+@pytest.mark.usefixtures("_prepare_mask_project_data")
+@pytest.mark.usefixtures("_register_dummy_extraction")
+@pytest.mark.parametrize("ext", [".parquet", ".feather"])
+def test_data_writer_columnar(tmp_path, calculation_plan_dummy, ext):
+    pytest.importorskip("pyarrow")
+    file_path = str(tmp_path / "test.seg")
+    calc = Calculation(
+        [file_path],
+        base_prefix=str(tmp_path),
+        result_prefix=str(tmp_path),
+        measurement_file_path=str(tmp_path / f"test{ext}"),
+        sheet_name="Sheet1",
+        calculation_plan=calculation_plan_dummy,
+        voxel_size=(1, 1, 1),
+    )
+    res = CalculationProcess().do_calculation(FileCalculation(file_path, calc))
+    writer = DataWriter()
+    writer.add_data_part(calc)
+    for el in res:
+        if isinstance(el, ResponseData):
+            writer.add_result(el, calc, ind=0)
+        else:
+            writer.add_calculation_error(calc, file_path, el[0])
+    assert not writer.calculation_finished(calc)
+    writer.finish()
+    writer.file_dict[calc.measurement_file_path].write_thread.join()
+    df = load_columnar_result(str(tmp_path / f"test_Sheet1{ext}"))
+    assert df.shape == (3, 2)
+    assert df.columns[0] == ("name", "units")
+    assert df.columns[1][0] == "Segmentation Volume"
+    assert df.columns[1][1].endswith("m**3")
+    assert df[df.columns[1]].dtype == np.float64
+    errors = load_columnar_result(str(tmp_path / f"test_Errors{ext}"))
+    assert errors.shape == (1, 2)
+
+
+@pytest.mark.parametrize("ext", [".parquet", ".feather"])
+def test_calculation_manager_columnar_without_pyarrow(tmp_path, monkeypatch, ext):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    calc = Calculation(
+        [],
+        base_prefix=str(tmp_path),
+        result_prefix=str(tmp_path),
+        measurement_file_path=str(tmp_path / f"test{ext}"),
+        sheet_name="Sheet1",
+        calculation_plan=CalculationPlan(name="test"),
+        voxel_size=(1, 1, 1),
+    )
+    manager = CalculationManager()
+    with pytest.raises(ImportError, match="pyarrow"):
+        manager.add_calculation(calc)
+    assert not manager.calculation_dict
+
+
+def test_dataframe_to_arrow():
+    pytest.importorskip("pyarrow")
+    columns = pd.MultiIndex.from_tuples([("name", "units"), ("Volume", "µm**3"), ("Count", "")])
+    table = dataframe_to_arrow(pd.DataFrame([["a", 1.5, 2]], columns=columns), [])
+    assert table.column_names == ["name (units)", "Volume (µm**3)", "Count"]
+    assert table.schema.field("Volume (µm**3)").metadata[b"partseg_units"] == "µm**3".encode()
+
+
+def test_calculation_journal(tmp_path):
+    calc = Calculation(
+        [],
+        base_prefix=str(tmp_path),
+        result_prefix=str(tmp_path),
+        measurement_file_path=str(tmp_path / "test.xlsx"),
+        sheet_name="Sheet1",
+        calculation_plan=CalculationPlan(name="test"),
+        voxel_size=(1, 1, 1),
+    )
+    journal = CalculationJournal(calc)
+    assert journal.load() == {}
+    journal.add("file1.tif", [ResponseData("file1.tif", [])])
+    journal.add("file2.tif", [ResponseData("file2.tif", []), (ValueError("aa"), [])])
+    journal.add("file3.tif", [])
+    with open(journal.file_path, "ab") as f_p:
+        f_p.write(b"broken")
+    assert journal.load() == {"file1.tif": [ResponseData("file1.tif", [])]}
+    calc.voxel_size = (2, 1, 1)
+    assert CalculationJournal(calc).file_path != journal.file_path
+    assert CalculationJournal(calc).load() == {}
+    journal.remove()
+    assert not os.path.exists(journal.file_path)
+
+
+def test_calculation_journal_file_changed(tmp_path):
+    file_path = tmp_path / "file1.tif"
+    file_path.write_bytes(b"data")
+    calc = Calculation(
+        [str(file_path)],
+        base_prefix=str(tmp_path),
+        result_prefix=str(tmp_path),
+        measurement_file_path=str(tmp_path / "test.xlsx"),
+        sheet_name="Sheet1",
+        calculation_plan=CalculationPlan(name="test"),
+        voxel_size=(1, 1, 1),
+    )
+    journal = CalculationJournal(calc)
+    journal.add(str(file_path), [ResponseData(str(file_path), [])])
+    assert list(journal.load()) == [str(file_path)]
+    file_path.write_bytes(b"new data")
+    assert journal.load() == {}
+    file_path.unlink()
+    assert journal.load() == {}
+
+
+class GlobalParameters:
+    def __init__(self, shift):
+        self.shift = shift
+        self.uuid = uuid.uuid4()
+
+
+def _add_shift(value, global_parameters):
+    return value + global_parameters.shift
+
+
+def _sleep_shift(value, global_parameters):
+    time.sleep(0.05)
+    return value + global_parameters.shift
+
+
+def _task_cost(value, global_parameters):
+    return 6
+
+
+def _wrong_cost(value, global_parameters):
+    raise OSError("file not found")
+
+
+def _process_tasks(manager: BatchManager, count: int):
+    """Simulate worker in main process and return order of processed tasks"""
+    order = []
+    for _ in range(count):
+        el, task_uuid, task_id = manager.task_queue.get(timeout=5)
+        order.append(task_uuid)
+        manager.result_queue.put((task_uuid, el, task_id))
+        for _ in range(int(5 / 0.01)):
+            if manager.get_result():
+                break
+            time.sleep(0.01)
+    return order
+
+
+def _wait_for_results(manager: BatchManager, count: int):
+    res = []
+    for _ in range(int(60 / 0.01)):
+        res.extend(manager.get_result())
+        if len(res) == count:
+            return res
+        time.sleep(0.01)
+    manager.kill_jobs()  # pragma: no cover
+    pytest.fail("jobs hanged")  # pragma: no cover
+
+
+class TestBatchManager:
+    def test_calculation(self):
+        manager = BatchManager()
+        manager.set_number_of_process(2)
+        params = GlobalParameters(10)
+        manager.add_work(list(range(20)), params, _add_shift)
+        res = _wait_for_results(manager, 20)
+        assert sorted(x[1] for x in res) == list(range(10, 30))
+        assert all(x[0] == params.uuid for x in res)
+        for _ in range(int(10 / 0.01)):
+            manager.join_all()
+            if manager.finished:
+                break
+            time.sleep(0.01)
+        assert manager.finished
+
+    def test_idle_workers_wake_up(self):
+        manager = BatchManager()
+        manager.set_number_of_process(2)
+        params = GlobalParameters(1)
+        manager.add_work([1], params, _add_shift)
+        assert _wait_for_results(manager, 1)[0][1] == 2
+        # workers are idle and blocked on task queue, kill order should wake them
+        for _ in range(int(10 / 0.01)):
+            manager.join_all()
+            if manager.finished:
+                break
+            time.sleep(0.01)
+        assert manager.finished
+
+    def test_cancel_work(self):
+        manager = BatchManager()
+        params1 = GlobalParameters(10)
+        params2 = GlobalParameters(20)
+        manager.add_work(list(range(5)), params1, _sleep_shift)
+        manager.add_work(list(range(5)), params2, _sleep_shift)
+        manager.cancel_work(params2)
+        res = _wait_for_results(manager, 10)
+        assert sorted(x[1] for x in res if x[0] == params1.uuid) == list(range(10, 15))
+        assert all(x[1] == (-1, [SubprocessOrder.cancel_job]) for x in res if x[0] == params2.uuid)
+        assert not manager.calculation_dict
+        assert not manager.has_work
+
+    def test_cancel_work_new_process(self):
+        manager = BatchManager()
+        manager.set_number_of_process(1)
+        params = GlobalParameters(10)
+        manager.add_work(list(range(2)), params, _sleep_shift)
+        manager.cancel_work(params)
+        # tasks of canceled work could be taken by new workers
+        manager.set_number_of_process(3)
+        assert params.uuid in manager.canceled_works
+        res = _wait_for_results(manager, 2)
+        assert all(x == (params.uuid, (-1, [SubprocessOrder.cancel_job])) for x in res)
+        assert not manager.canceled_works
+        assert not manager.has_work
+
+    def test_change_number_of_process(self):
+        manager = BatchManager()
+        manager.set_number_of_process(3)
+        params = GlobalParameters(10)
+        manager.add_work(list(range(30)), params, _sleep_shift)
+        assert len(manager.process_list) == 3
+        manager.set_number_of_process(1)
+        assert manager.pending_kills == 2
+        res = _wait_for_results(manager, 30)
+        assert sorted(x[1] for x in res) == list(range(10, 40))
+
+    def test_not_picklable_work(self):
+        manager = BatchManager()
+        with pytest.raises((pickle.PicklingError, AttributeError)):
+            manager.add_work([1], GlobalParameters(1), lambda x, y: x)
+        assert not manager.process_list
+
+    def test_memory_budget(self):
+        manager = BatchManager()
+        manager.set_number_of_process(2)
+        manager.set_memory_budget(10)
+        params = GlobalParameters(10)
+        manager.add_work(list(range(4)), params, _sleep_shift, cost_fun=_task_cost)
+        # second task do not fit in budget
+        assert manager.waiting_tasks_count == 3
+        assert manager.memory_in_use == 6
+        res = _wait_for_results(manager, 4)
+        assert sorted(x[1] for x in res) == list(range(10, 14))
+        assert manager.memory_in_use == 0
+        assert not manager.waiting_tasks
+
+    def test_memory_budget_too_small(self):
+        manager = BatchManager()
+        manager.set_memory_budget(1)
+        params = GlobalParameters(10)
+        manager.add_work(list(range(2)), params, _add_shift, cost_fun=_task_cost)
+        assert manager.waiting_tasks_count == 1
+        res = _wait_for_results(manager, 2)
+        assert sorted(x[1] for x in res) == [10, 11]
+
+    def test_memory_budget_cost_error(self):
+        manager = BatchManager()
+        manager.set_memory_budget(10)
+        params = GlobalParameters(10)
+        manager.add_work([1, 2], params, _add_shift, cost_fun=_wrong_cost)
+        assert not manager.waiting_tasks
+        assert sorted(x[1] for x in _wait_for_results(manager, 2)) == [11, 12]
+
+    def test_priority(self, monkeypatch):
+        manager = BatchManager()
+        monkeypatch.setattr(manager, "_spawn_process", lambda: None)
+        params1, params2, params3 = GlobalParameters(0), GlobalParameters(10), GlobalParameters(20)
+        manager.add_work(list(range(5)), params1, _add_shift)
+        manager.add_work(list(range(2)), params2, _add_shift)
+        manager.add_work(list(range(2)), params3, _add_shift, priority=1)
+        assert manager.waiting_tasks_count == 7
+        order = _process_tasks(manager, 9)
+        uuid1, uuid2, uuid3 = params1.uuid, params2.uuid, params3.uuid
+        assert order == [uuid1, uuid1, uuid3, uuid3, uuid1, uuid2, uuid1, uuid2, uuid1]
+        assert not manager.has_work
+
+    def test_set_priority(self, monkeypatch):
+        manager = BatchManager()
+        monkeypatch.setattr(manager, "_spawn_process", lambda: None)
+        params1, params2 = GlobalParameters(0), GlobalParameters(10)
+        manager.add_work(list(range(4)), params1, _add_shift)
+        manager.add_work(list(range(2)), params2, _add_shift, priority=-1)
+        assert _process_tasks(manager, 3) == [params1.uuid] * 3
+        manager.set_priority(params2.uuid, 1)
+        assert _process_tasks(manager, 3) == [params1.uuid, params2.uuid, params2.uuid]
+
+    def test_cancel_waiting_work(self, monkeypatch):
+        manager = BatchManager()
+        monkeypatch.setattr(manager, "_spawn_process", lambda: None)
+        params1, params2 = GlobalParameters(0), GlobalParameters(10)
+        manager.add_work(list(range(2)), params1, _add_shift)
+        manager.add_work(list(range(3)), params2, _add_shift)
+        manager.cancel_work(params2)
+        assert manager.get_result() == [(params2.uuid, (-1, [SubprocessOrder.cancel_job]))] * 3
+        assert _process_tasks(manager, 2) == [params1.uuid] * 2
+        assert not manager.has_work
+
+    def test_worker_cache_calculation(self):
+        params = GlobalParameters(10)
+        control_queue = Queue()
+        result_queue = Queue()
+        control_queue.put((params.uuid, pickle.dumps((params, _add_shift))))
+        worker = BatchWorker(Queue(), result_queue, control_queue)
+        worker.calculate_task((1, params.uuid, 0))
+        calc = worker.calculation_dict[params.uuid]
+        worker.calculate_task((2, params.uuid, 1))
+        assert worker.calculation_dict[params.uuid] is calc
+        assert result_queue.get_nowait() == (params.uuid, 11, 0)
+        assert result_queue.get_nowait() == (params.uuid, 12, 1)
+        control_queue.put((params.uuid, None))
+        worker.calculate_task((3, params.uuid, 2))
+        assert result_queue.get_nowait() == (params.uuid, (-1, [SubprocessOrder.cancel_job]), 2)
+        control_queue.put(SubprocessOrder.kill)
+        worker.check_control()
+        assert worker.finish
+
+    def test_worker_kill_order(self):
+        params = GlobalParameters(10)
+        task_queue = Queue()
+        result_queue = Queue()
+        control_queue = Queue()
+        control_queue.put((params.uuid, pickle.dumps((params, _add_shift))))
+        task_queue.put((1, params.uuid, 0))
+        task_queue.put(SubprocessOrder.kill)
+        task_queue.put((2, params.uuid, 1))
+        worker = BatchWorker(task_queue, result_queue, control_queue)
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert result_queue.get_nowait() == (params.uuid, 11, 0)
+        assert result_queue.empty()
+        assert task_queue.get_nowait() == (2, params.uuid, 1)
+
 
 def test_calculation_plan_serialize(calculation_plan_long):
     text = json.dumps(calculation_plan_long, cls=PartSegEncoder, indent=2)
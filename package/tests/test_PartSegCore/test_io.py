@@ -37,9 +37,12 @@ from PartSegCore.io_utils import (
     SaveScreenshot,
     find_problematic_entries,
     find_problematic_leafs,
+    get_tarinfo,
     load_metadata_base,
     load_metadata_part,
     open_tar_file,
+    open_tar_member,
+    tar_to_buff,
 )
 from PartSegCore.json_hooks import PartSegEncoder, partseg_object_hook
 from PartSegCore.mask.history_utils import create_history_element_from_segmentation_tuple
@@ -64,7 +67,7 @@ from PartSegCore.segmentation.noise_filtering import DimensionType
 from PartSegCore.segmentation.segmentation_algorithm import ThresholdAlgorithm
 from PartSegCore.segmentation.threshold import RangeThresholdSelection
 from PartSegCore.utils import ProfileDict, check_loaded_dict
-from PartSegImage import Image
+from PartSegImage import Image, ImageWriter
 
 
 @pytest.fixture(scope="module")
@@ -635,6 +638,36 @@ class TestSaveFunctions:
         LoadProject.load([os.path.join(tmpdir, "test1.tgz")])
         # TODO add more
 
+    @pytest.mark.parametrize("compression", ["zstd", "lzw", "adobe_deflate"])
+    @pytest.mark.parametrize("level", [5, 22])
+    def test_save_project_tiff_compression(self, tmp_path, analysis_project, compression, level):
+        parameters = {"compression": compression, "compression_level": level}
+        SaveProject.save(tmp_path / "test1.tar", analysis_project, parameters)
+        # "r:" mode accepts only uncompressed archives
+        with tarfile.open(tmp_path / "test1.tar", "r:") as tar:
+            image_buff = BytesIO(tar.extractfile("image.tif").read())
+        with tifffile.TiffFile(image_buff) as tiff:
+            assert tiff.pages[0].compression.name == compression.upper()
+        load_data = LoadProject.load([str(tmp_path / "test1.tar")])
+        assert np.array_equal(load_data.image.get_data(), analysis_project.image.get_data())
+        assert np.array_equal(load_data.roi_info.roi, analysis_project.roi_info.roi)
+
+    @pytest.mark.parametrize(
+        ("ext", "mode"), [(".tgz", "r:gz"), (".gz", "r:gz"), (".tbz2", "r:bz2"), (".bz2", "r:bz2")]
+    )
+    def test_save_project_archive_compression(self, tmp_path, analysis_project, ext, mode):
+        SaveProject.save(tmp_path / f"test1{ext}", analysis_project, {"compression": "zstd"})
+        with tarfile.open(tmp_path / f"test1{ext}", mode) as tar:
+            image_buff = open_tar_member(tar, "image.tif")
+            assert isinstance(image_buff, BytesIO)
+            with tifffile.TiffFile(image_buff) as tiff:
+                assert tiff.pages[0].compression.name == "NONE"
+            roi = tifffile.imread(tar_to_buff(tar, "segmentation.tif"))
+        assert np.array_equal(roi, analysis_project.roi_info.roi)
+        load_data = LoadProject.load([str(tmp_path / f"test1{ext}")])
+        assert np.array_equal(load_data.image.get_data(), analysis_project.image.get_data())
+        assert np.array_equal(load_data.roi_info.roi, analysis_project.roi_info.roi)
+
     def test_save_tiff(self, tmpdir, analysis_project):
         SaveAsTiff.save(os.path.join(tmpdir, "test1.tiff"), analysis_project)
         array = tifffile.imread(os.path.join(tmpdir, "test1.tiff"))
@@ -664,7 +697,7 @@ class TestSaveFunctions:
             (SaveAsTiff, [".tiff", ".tif"]),
             (SaveCmap, [".cmap"]),
             (SaveXYZ, [".xyz", ".txt"]),
-            (SaveProject, [".tgz", ".tbz2", ".gz", ".bz2"]),
+            (SaveProject, [".tgz", ".tbz2", ".gz", ".bz2", ".tar"]),
             (SaveROIAsNumpy, [".npy"]),
         ],
     )
@@ -799,6 +832,15 @@ def test_load_image_for_batch(data_test_dir):
     assert proj.mask is None
 
 
+def test_load_image_for_batch_selection(tmp_path):
+    data = np.arange(2 * 3 * 4 * 10 * 20, dtype=np.uint16).reshape((2, 3, 4, 10, 20))
+    ImageWriter.save(Image(data, (1, 1, 1), axes_order="CTZYX"), tmp_path / "image.tif")
+    metadata = {"default_spacing": (1, 1, 1), "channels": [1], "time_range": (1, 2), "z_range": (0, 2)}
+    proj = LoadImageForBatch.load([str(tmp_path / "image.tif")], metadata=metadata)
+    assert proj.image.channels == 1
+    assert np.array_equal(proj.image.get_channel(0), data[1, 1:2, 0:2])
+
+
 def test_save_base_extension_parse_no_ext():
     class Save(SaveBase):
         @classmethod
@@ -864,6 +906,30 @@ def test_open_tar_file_with_invalid_type(tmp_path):
         open_tar_file(123)
 
 
+@pytest.mark.parametrize(("mode", "random_access"), [("w", True), ("w:gz", False), ("w:bz2", False)])
+def test_open_tar_member(tmp_path, mode, random_access):
+    tar_file_path = tmp_path / "test.tar"
+    with tarfile.open(tar_file_path, mode) as tar_file:
+        for name, value in [("a.txt", b"first"), ("b.txt", b"second")]:
+            buffer = BytesIO(value)
+            tar_file.addfile(get_tarinfo(name, buffer), buffer)
+    with tarfile.open(tar_file_path) as tar_file:
+        member = open_tar_member(tar_file, "b.txt")
+        assert isinstance(member, BytesIO) != random_access
+        assert member.read() == b"second"
+        member.seek(2)
+        assert member.read(3) == b"con"
+
+
+def test_load_project_random_access(tmp_path, analysis_project):
+    SaveProject.save(tmp_path / "test1.tar", analysis_project)
+    with tarfile.open(tmp_path / "test1.tar") as tar_file:
+        assert not isinstance(open_tar_member(tar_file, "image.tif"), BytesIO)
+    load_data = LoadProject.load([str(tmp_path / "test1.tar")])
+    assert np.array_equal(load_data.image.get_data(), analysis_project.image.get_data())
+    assert np.array_equal(load_data.roi_info.roi, analysis_project.roi_info.roi)
+
+
 def test_save_mask_as_tiff(tmp_path, analysis_segmentation2):
     file_path = tmp_path / "test.tiff"
     file_path2 = tmp_path / "test2.tiff"
@@ -10,15 +10,25 @@ from unittest.mock import MagicMock
 
 import numpy as np
 import pytest
+from scipy import ndimage
 from sympy import symbols
 
 from PartSegCore.algorithm_describe_base import ROIExtractionProfile
-from PartSegCore.analysis import load_metadata
-from PartSegCore.analysis.measurement_base import AreaType, Leaf, MeasurementEntry, Node, PerComponent
+from PartSegCore.analysis import load_metadata, measurement_calculation
+from PartSegCore.analysis.measurement_base import (
+    AreaType,
+    ComponentsLabels,
+    Leaf,
+    MeasurementEntry,
+    Node,
+    PerComponent,
+)
 from PartSegCore.analysis.measurement_calculation import (
     HARALIC_FEATURES,
     MEASUREMENT_DICT,
     ColocalizationMeasurement,
+    Compactness,
+    ComponentBoundingBox,
     ComponentsInfo,
     ComponentsNumber,
     CorrelationEnum,
@@ -30,6 +40,7 @@ from PartSegCore.analysis.measurement_calculation import (
     Haralick,
     MaximumPixelBrightness,
     MeanPixelBrightness,
+    MeasurementCache,
     MeasurementProfile,
     MeasurementResult,
     MedianPixelBrightness,
@@ -48,6 +59,8 @@ from PartSegCore.analysis.measurement_calculation import (
     ThirdPrincipalAxisLength,
     Volume,
     Voxels,
+    calc_diam,
+    get_border,
 )
 from PartSegCore.autofit import density_mass_center
 from PartSegCore.roi_info import ROIInfo
@@ -208,6 +221,31 @@ class TestDiameter:
         mask = image.get_channel(0)[0] > 80
         assert Diameter.calculate_property(mask, image.spacing, 1) == 0
 
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_irregular(self, seed):
+        rand = np.random.default_rng(seed)
+        mask = ndimage.gaussian_filter(rand.random((15, 30, 30)), 2) > 0.5
+        voxel_size = (3, 1, 1.5)
+        assert isclose(
+            Diameter.calculate_property(mask, voxel_size, 1), calc_diam(get_border(mask), voxel_size), rel_tol=1e-12
+        )
+
+    def test_single_point(self):
+        mask = np.zeros((5, 5, 5), dtype=np.uint8)
+        mask[2, 2, 2] = 1
+        assert Diameter.calculate_property(mask, (1, 1, 1), 1) == 0
+
+    def test_line(self):
+        mask = np.zeros((5, 5, 20), dtype=np.uint8)
+        mask[2, 2, 3:15] = 1
+        assert Diameter.calculate_property(mask, (1, 1, 2), 1) == 22
+
+    def test_diagonal_plane(self):
+        mask = np.zeros((10, 10, 10), dtype=np.uint8)
+        for i in range(10):
+            mask[i, i, 2:8] = 1
+        assert isclose(Diameter.calculate_property(mask, (1, 1, 1), 1), np.sqrt(2 * 9**2 + 5**2))
+
 
 class TestPixelBrightnessSum:
     def test_parameters(self):
@@ -1945,6 +1983,59 @@ class TestStatisticProfile:
         )
 
 
+class TestSegmentationToMaskComponent:
+    def test_mapping(self):
+        mask = np.zeros((10, 20, 20), dtype=np.uint8)
+        mask[:, :10] = 1
+        mask[:, 10:] = 3
+        roi = np.zeros(mask.shape, dtype=np.uint16)
+        roi[2:4, 2:5, 2:5] = 1
+        roi[2:4, 8:12, 2:5] = 2
+        roi[5:8, 15:18, 15:18] = 300
+        info = MeasurementProfile.get_segmentation_to_mask_component(roi, mask)
+        assert list(info.roi_components) == [1, 2, 300]
+        assert list(info.mask_components) == [1, 3]
+        assert info.components_translation == {1: [1], 2: [1, 3], 300: [3]}
+        assert info.components_overlap == {1: {1: 18}, 2: {1: 12, 3: 12}, 300: {3: 27}}
+
+    def test_same_as_per_component(self):
+        rand = np.random.default_rng(0)
+        mask = rand.integers(0, 20, size=(5, 30, 30))
+        roi = rand.integers(0, 500, size=mask.shape)
+        info = MeasurementProfile.get_segmentation_to_mask_component(roi, mask)
+        for num in info.roi_components:
+            mask_components, counts = np.unique(mask[(roi == num) & (mask > 0)], return_counts=True)
+            assert info.components_translation[num] == list(mask_components)
+            assert info.components_overlap[num] == dict(zip(mask_components, counts))
+
+    def test_roi_outside_mask(self):
+        mask = np.zeros((10, 10), dtype=np.uint8)
+        mask[:5] = 2
+        roi = np.zeros(mask.shape, dtype=np.uint8)
+        roi[1:3, 1:3] = 1
+        roi[7:9, 7:9] = 2
+        info = MeasurementProfile.get_segmentation_to_mask_component(roi, mask)
+        assert info.components_translation == {1: [2], 2: []}
+        assert info.components_overlap == {1: {2: 4}, 2: {}}
+
+    def test_no_mask(self):
+        roi = np.zeros((10, 10), dtype=np.uint8)
+        roi[1:3, 1:3] = 1
+        info = MeasurementProfile.get_segmentation_to_mask_component(roi, None)
+        assert info.components_translation == {1: []}
+        assert info.components_overlap == {1: {}}
+        assert list(info.mask_components) == []
+
+    def test_binary_mask(self):
+        mask = np.zeros((10, 10), dtype=np.uint8)
+        mask[:5] = 1
+        roi = np.zeros(mask.shape, dtype=np.uint8)
+        roi[3:7, 1:3] = 1
+        info = MeasurementProfile.get_segmentation_to_mask_component(roi, mask)
+        assert info.components_translation == {1: [1]}
+        assert info.components_overlap == {1: {1: 4}}
+
+
 # noinspection DuplicatedCode
 class TestMeasurementResult:
     def test_simple(self):
@@ -2342,6 +2433,285 @@ def test_per_component(method, area):
     assert isclose(result["Measurement per component"][0][0], result["Measurement"][0])
 
 
+@pytest.mark.parametrize(
+    "method",
+    [
+        Volume,
+        Voxels,
+        PixelBrightnessSum,
+        MaximumPixelBrightness,
+        MinimumPixelBrightness,
+        MeanPixelBrightness,
+        MedianPixelBrightness,
+        StandardDeviationOfPixelBrightness,
+        Moment,
+        ComponentBoundingBox,
+    ],
+)
+@pytest.mark.parametrize(
+    ("area", "per_component"),
+    [
+        (AreaType.ROI, PerComponent.Yes),
+        (AreaType.ROI, PerComponent.Mean),
+        (AreaType.ROI, PerComponent.Per_Mask_component),
+        (AreaType.Mask, PerComponent.Yes),
+        (AreaType.Mask_without_ROI, PerComponent.Yes),
+    ],
+)
+def test_per_component_vectorized(method, area, per_component, monkeypatch):
+    rand = np.random.default_rng(42)
+    data = rand.integers(0, 1000, size=(12, 40, 40)).astype(np.uint16)
+    mask = np.zeros(data.shape, dtype=np.uint8)
+    mask[1:-1, 2:20, 2:-2] = 1
+    mask[1:-1, 22:-2, 2:-2] = 2
+    roi = np.zeros(data.shape, dtype=np.uint8)
+    roi[2:5, 4:10, 4:10] = 1
+    roi[6:10, 5:15, 20:30] = 2
+    roi[3:7, 25:35, 5:12] = 4
+    roi[5, 25, 30] = 5
+    image = Image(data, image_spacing=(3 * 10**-7, 10**-7, 10**-7), axes_order="ZYX")
+    image.set_mask(mask, axes="ZYX")
+    leaf = method.get_starting_leaf().replace_(area=area, per_component=per_component)
+    profile = MeasurementProfile(
+        name="statistic", chosen_fields=[MeasurementEntry(name="Measurement", calculation_tree=leaf)]
+    )
+    result = profile.calculate(image, 0, roi, result_units=Units.nm)["Measurement"][0]
+    monkeypatch.setattr(measurement_calculation, "_has_per_component_calculation", lambda _method: False)
+    expected = profile.calculate(image, 0, roi, result_units=Units.nm)["Measurement"][0]
+    if method is ComponentBoundingBox:
+        assert result == expected
+    else:
+        assert np.allclose(result, expected, rtol=1e-9, atol=0)
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        PixelBrightnessSum,
+        MaximumPixelBrightness,
+        MinimumPixelBrightness,
+        MeanPixelBrightness,
+        MedianPixelBrightness,
+        StandardDeviationOfPixelBrightness,
+    ],
+)
+def test_per_component_wrong_channel_shape(method):
+    area_array = np.zeros((5, 10, 10), dtype=np.uint8)
+    area_array[1:3, 2:5, 2:5] = 1
+    components_labels = ComponentsLabels.from_arrays(area_array, area_array, [1])
+    with pytest.raises(ValueError, match="do not fit each other"):
+        method.calculate_per_component(components_labels, channel=np.zeros((5, 10, 11)))
+    with pytest.raises(ValueError, match="do not fit each other"):
+        method.calculate_property(area_array, channel=np.zeros((5, 10, 11)))
+
+
+def test_moment_per_component_time_data():
+    area_array = np.zeros((5, 10, 10), dtype=np.uint8)
+    area_array[1:3, 2:5, 2:5] = 1
+    components_labels = ComponentsLabels.from_arrays(area_array, area_array, [1])
+    with pytest.raises(ValueError, match="time data"):
+        Moment.calculate_per_component(components_labels, channel=np.zeros((2, 5, 10, 10)), voxel_size=(1, 1, 1))
+
+
+class TestMeasurementCache:
+    @staticmethod
+    def _profile(*methods):
+        return MeasurementProfile(
+            name="statistic",
+            chosen_fields=[
+                MeasurementEntry(
+                    name=method.__name__,
+                    calculation_tree=method.get_starting_leaf().replace_(
+                        area=AreaType.ROI, per_component=PerComponent.No
+                    ),
+                )
+                for method in methods
+            ],
+        )
+
+    @staticmethod
+    def _count_calls(monkeypatch, *methods):
+        calls = {method.__name__: 0 for method in methods}
+
+        def wrap(method):
+            fun = method.calculate_property
+
+            def _calculate(**kwargs):
+                calls[method.__name__] += 1
+                return fun(**kwargs)
+
+            monkeypatch.setattr(method, "calculate_property", _calculate)
+
+        for method in methods:
+            wrap(method)
+        return calls
+
+    def test_reuse(self, monkeypatch):
+        image = get_cube_image()
+        roi = (image.get_channel(0) > 40).astype(np.uint8)
+        calls = self._count_calls(monkeypatch, Volume, Diameter)
+        cache = MeasurementCache()
+        res1 = self._profile(Volume).calculate(image, 0, roi, Units.nm, cache=cache)
+        res2 = self._profile(Volume, Diameter).calculate(image, 0, roi, Units.nm, cache=cache)
+        assert calls == {"Volume": 1, "Diameter": 1}
+        assert res1["Volume"] == res2["Volume"]
+        self._profile(Volume, Diameter).calculate(image, 0, roi, Units.µm, cache=cache)
+        assert calls == {"Volume": 2, "Diameter": 2}
+
+    def test_invalidate(self, monkeypatch):
+        image = get_cube_image()
+        roi = (image.get_channel(0) > 40).astype(np.uint8)
+        calls = self._count_calls(monkeypatch, Volume)
+        cache = MeasurementCache()
+        profile = self._profile(Volume)
+        profile.calculate(image, 0, roi, Units.nm, cache=cache)
+        profile.calculate(image, 0, roi.copy(), Units.nm, cache=cache)
+        assert calls["Volume"] == 2
+        image.set_mask(roi)
+        profile.calculate(image, 0, roi, Units.nm, cache=cache)
+        profile.calculate(image, 0, roi, Units.nm, cache=cache)
+        assert calls["Volume"] == 3
+        image.set_mask(roi)
+        profile.calculate(image, 0, roi, Units.nm, cache=cache)
+        assert calls["Volume"] == 4
+        cache.clear()
+        profile.calculate(image, 0, roi, Units.nm, cache=cache)
+        assert calls["Volume"] == 5
+
+    def test_spacing_change(self):
+        image = get_cube_image()
+        roi = (image.get_channel(0) > 40).astype(np.uint8)
+        cache = MeasurementCache()
+        profile = self._profile(Volume)
+        volume = profile.calculate(image, 0, roi, Units.nm, cache=cache)["Volume"][0]
+        spacing = image.spacing
+        image.set_spacing((spacing[0] * 2, *spacing[1:]))
+        assert profile.calculate(image, 0, roi, Units.nm, cache=cache)["Volume"][0] == 2 * volume
+        assert profile.calculate(image, 0, roi, Units.nm)["Volume"][0] == 2 * volume
+
+
+class TestParallelCalculation:
+    @staticmethod
+    def _leaf(method, area=AreaType.ROI, per_component=PerComponent.No):
+        return method.get_starting_leaf().replace_(
+            area=area, per_component=per_component, parameters=method.get_default_values()
+        )
+
+    def test_same_as_serial(self):
+        data = np.zeros((10, 20, 20, 2), dtype=np.uint8)
+        data[1:-1, 3:-3, 3:-3] = 2
+        data[1:-1, 4:-4, 4:-4] = 3
+        data[1:-1, 6, 6] = 5
+        data[2:5, 12:15, 12:15, 1] = 7
+        roi = (data[..., 0] > 2).astype(np.uint8)
+        roi[1:-1, 4:-4, 10:-4] *= 2
+        mask = (data[..., 0] > 0).astype(np.uint8)
+        image = Image(data, image_spacing=(10**-6,) * 3, axes_order="ZYXC")
+        image.set_mask(mask, axes="ZYX")
+        chosen_fields = [
+            MeasurementEntry(
+                name=f"{method.__name__} {area} {per_component}",
+                calculation_tree=self._leaf(method, area, per_component),
+            )
+            for method in MEASUREMENT_DICT.values()
+            if method.get_starting_leaf().per_component is None
+            for area in (AreaType.ROI, AreaType.Mask)
+            for per_component in (PerComponent.No, PerComponent.Yes)
+        ]
+        chosen_fields.append(
+            MeasurementEntry(
+                name="Compactness by Volume",
+                calculation_tree=Node(left=self._leaf(Compactness), op="/", right=self._leaf(Volume)),
+            )
+        )
+        profile = MeasurementProfile(name="statistic", chosen_fields=chosen_fields)
+        serial = profile.calculate(image, 0, roi, result_units=Units.nm, max_workers=1)
+        parallel = profile.calculate(image, 0, roi, result_units=Units.nm, max_workers=4)
+        assert list(parallel.keys()) == list(serial.keys())
+        for name in serial:
+            np.testing.assert_equal(parallel[name], serial[name], err_msg=name)
+
+    def test_leaf_groups(self):
+        fields = [
+            Compactness,
+            Volume,
+            Surface,
+            MeanPixelBrightness,
+            FirstPrincipalAxisLength,
+            SecondPrincipalAxisLength,
+        ]
+        profile = MeasurementProfile(
+            name="statistic",
+            chosen_fields=[
+                MeasurementEntry(name=method.__name__, calculation_tree=self._leaf(method)) for method in fields
+            ]
+            + [
+                MeasurementEntry(
+                    name="Volume per component",
+                    calculation_tree=self._leaf(Volume, per_component=PerComponent.Yes),
+                ),
+                MeasurementEntry(
+                    name="Mean per component",
+                    calculation_tree=self._leaf(MeanPixelBrightness, per_component=PerComponent.Yes),
+                ),
+            ],
+        )
+        groups = [{(node.name, node.per_component) for node in group} for group in profile._get_leaf_groups({})]
+        assert len(groups) == 4
+        assert {
+            (Compactness.get_name(), PerComponent.No),
+            (Volume.get_name(), PerComponent.No),
+            (Surface.get_name(), PerComponent.No),
+        } in groups
+        assert {(MeanPixelBrightness.get_name(), PerComponent.No)} in groups
+        assert {
+            (FirstPrincipalAxisLength.get_name(), PerComponent.No),
+            (SecondPrincipalAxisLength.get_name(), PerComponent.No),
+        } in groups
+        assert {
+            (Volume.get_name(), PerComponent.Yes),
+            (MeanPixelBrightness.get_name(), PerComponent.Yes),
+        } in groups
+
+    def test_worker_exception(self, monkeypatch):
+        def _raise(*_args, **_kwargs):
+            raise RuntimeError("worker error")
+
+        image = get_cube_image()
+        roi = (image.get_channel(0) > 40).astype(np.uint8)
+        profile = MeasurementProfile(
+            name="statistic",
+            chosen_fields=[
+                MeasurementEntry(name=method.__name__, calculation_tree=self._leaf(method))
+                for method in (Volume, MeanPixelBrightness)
+            ],
+        )
+        monkeypatch.setattr(MeanPixelBrightness, "calculate_property", staticmethod(_raise))
+        with pytest.raises(RuntimeError, match="worker error"):
+            profile.calculate(image, 0, roi, result_units=Units.nm, max_workers=2)
+
+    def test_failed_leaf_same_as_serial(self, monkeypatch):
+        def _raise(*_args, **_kwargs):
+            raise ZeroDivisionError
+
+        image = get_cube_image()
+        roi = (image.get_channel(0) > 40).astype(np.uint8)
+        profile = MeasurementProfile(
+            name="statistic",
+            chosen_fields=[
+                MeasurementEntry(name=method.__name__, calculation_tree=self._leaf(method))
+                for method in (Volume, MeanPixelBrightness, Surface)
+            ],
+        )
+        monkeypatch.setattr(MeanPixelBrightness, "calculate_property", staticmethod(_raise))
+        serial = profile.calculate(image, 0, roi, result_units=Units.nm, max_workers=1)
+        parallel = profile.calculate(image, 0, roi, result_units=Units.nm, max_workers=3)
+        assert serial["MeanPixelBrightness"][0] == "Div by zero"
+        assert list(parallel.keys()) == list(serial.keys())
+        for name in serial:
+            assert parallel[name] == serial[name]
+
+
 @pytest.mark.parametrize("method", CorrelationEnum.__members__.values())
 @pytest.mark.parametrize("randomize", [True, False])
 def test_colocalization(method, randomize):
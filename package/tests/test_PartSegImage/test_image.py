@@ -1,5 +1,8 @@
 # pylint: disable=no-self-use
+import gc
 import os
+import pickle  # nosec
+import weakref
 
 import numpy as np
 import pytest
@@ -358,6 +361,79 @@ class TestImageBase:
         shape[image.stack_pos] += 2 * FRAME_THICKNESS
         assert res.shape == tuple(shape)
 
+    @staticmethod
+    def _to_zyx(image, array):
+        positions = [image.array_axis_order.index(x) for x in "ZYX"]
+        return np.squeeze(np.moveaxis(array, positions, [-3, -2, -1]))
+
+    def test_cut_image_view(self):
+        if "C" not in self.image_class.axis_order:
+            pytest.skip("No channel axis")
+        data = np.arange(1 * 10 * 20 * 30 * 3, dtype=np.uint16).reshape((1, 10, 20, 30, 3))
+        image = self.image_class(data, (1, 1, 1), "", axes_order="TZYXC")
+        res = image.cut_image(self._cut_slices(image), frame=0)
+        assert all(np.shares_memory(x, y) for x, y in zip(res._channel_arrays, image._channel_arrays))
+        assert np.array_equal(self._to_zyx(res, res.get_channel(0)), data[0, 1:2, 2:5, 3:9, 0].squeeze())
+
+    def test_cut_image_roi_lazy(self):
+        if "C" not in self.image_class.axis_order:
+            pytest.skip("No channel axis")
+        data = np.arange(1 * 10 * 20 * 30 * 3, dtype=np.uint16).reshape((1, 10, 20, 30, 3))
+        image = self.image_class(data, (1, 1, 1), "", axes_order="TZYXC")
+        roi = np.zeros((1, 10, 20, 30), np.uint8)
+        roi[0, 2:4, 3:7, 4:9] = 1
+        roi[0, 3, 4, 5] = 0
+        image.set_mask(roi * 2 + 1, "TZYX")
+        res = image.cut_image(image.reorder_axes(roi, "TZYX"), frame=1)
+        assert res._channel_arrays._masked == [None] * 3
+        channel = res.get_channel(1)
+        assert res._channel_arrays._masked[0] is None
+        expected = np.zeros((4, 6, 7), np.uint16)
+        expected[1:-1, 1:-1, 1:-1] = data[0, 2:4, 3:7, 4:9, 1] * roi[0, 2:4, 3:7, 4:9]
+        assert np.array_equal(self._to_zyx(res, channel), expected)
+        assert np.array_equal(self._to_zyx(res, res.mask)[1:-1, 1:-1, 1:-1], roi[0, 2:4, 3:7, 4:9])
+        assert np.all(image.mask > 0)
+        if self.image_class.axis_order.startswith("C"):
+            assert np.array_equal(res.get_data(), res.substitute().get_data())
+
+    def test_cut_image_metadata_not_shared(self):
+        if "C" not in self.image_class.axis_order:
+            pytest.skip("No channel axis")
+        data = np.zeros((1, 10, 20, 30, 3), np.uint8)
+        image = self.image_class(
+            data, (1, 1, 1), "", axes_order="TZYXC", channel_names=["a", "b", "c"], default_coloring=["red"] * 3
+        )
+        res = image.cut_image(self._cut_slices(image), frame=0)
+        res._channel_names[0] = "d"
+        res.default_coloring[0][...] = 0
+        assert image.channel_names == ["a", "b", "c"]
+        assert image.default_coloring[0] == "red"
+        ref = weakref.ref(image)
+        del image
+        gc.collect()
+        assert ref() is None
+        assert res.get_ranges() == [(0, 0)] * 3
+
+    def test_cut_image_roi_modify_channels(self):
+        if "C" not in self.image_class.axis_order:
+            pytest.skip("No channel axis")
+        data = np.arange(1 * 10 * 20 * 30 * 3, dtype=np.uint16).reshape((1, 10, 20, 30, 3))
+        image = self.image_class(data, (1, 1, 1), "", axes_order="TZYXC")
+        roi = np.zeros((1, 10, 20, 30), np.uint8)
+        roi[0, 2:4, 3:7, 4:9] = 1
+        res = image.cut_image(image.reorder_axes(roi, "TZYX"), frame=1)
+        channels = res._channel_arrays
+        channel_0 = channels[0]
+        channels[1] = np.zeros_like(channel_0)
+        assert all(x is not None for x in channels._masked)
+        assert channels[0] is channel_0
+        assert not np.any(res.get_channel(1))
+        del channels[2]
+        assert len(channels) == 2
+        channels.append(channel_0)
+        assert channels[2] is channel_0
+        assert list(channels) == [channel_0, channels[1], channel_0]
+
     def test_get_ranges(self):
         data = np.zeros((1, 10, 20, 30, 3), np.uint8)
         data[..., :10, 0] = 2
@@ -367,6 +443,36 @@ class TestImageBase:
         assert len(image.get_ranges()) == 3
         assert image.get_ranges() == [(0, 2), (0, 20), (0, 9)]
 
+    def test_ranges_lazy(self, monkeypatch):
+        if "C" not in self.image_class.axis_order:
+            pytest.skip("No channel axis")
+        data = np.zeros((1, 10, 20, 30, 3), np.uint8)
+        data[..., :10, 0] = 2
+        data[..., :10, 1] = 20
+        data[..., 5, 10, 10, 2] = 9
+        calls = []
+        np_max = np.max
+
+        def _max(array, *args, **kwargs):
+            calls.append(array.size)
+            return np_max(array, *args, **kwargs)
+
+        monkeypatch.setattr(np, "max", _max)
+        image = self.image_class(data, (1, 1, 1), "", axes_order="TZYXC")
+        cut = image.cut_image(self._cut_slices(image), frame=0)
+        substituted = cut.substitute() if self.image_class.axis_order.startswith("C") else cut
+        assert calls == []
+        assert substituted.get_ranges() == [(0, 2), (0, 20), (0, 9)]
+        assert len(calls) == 3
+        assert cut.get_ranges() == [(0, 2), (0, 20), (0, 9)]
+        assert image.get_ranges() == [(0, 2), (0, 20), (0, 9)]
+        assert len(calls) == 3
+        image = self.image_class(data, (1, 1, 1), "", axes_order="TZYXC", ranges=[(0, 1)] * 3)
+        assert image.cut_image(self._cut_slices(image), frame=0).get_ranges() == [(0, 1)] * 3
+        image.ranges = [(0, 5)] * 3
+        assert image.get_ranges() == [(0, 5)] * 3
+        assert len(calls) == 3
+
     def test_get_um_spacing(self):
         image = self.image_class(
             np.zeros((1, 10, 20, 30, 3), np.uint8), (10**-6, 10**-6, 10**-6), "", axes_order="TZYXC"
@@ -397,6 +503,63 @@ class TestImageBase:
         assert len(read_image.get_ranges()) == 3
         assert read_image.get_ranges() == [(0, 2), (0, 20), (0, 9)]
 
+    @staticmethod
+    def _cut_slices(image):
+        cut = {"Z": slice(1, 2), "Y": slice(2, 5), "X": slice(3, 9)}
+        return [cut.get(x, slice(None)) for x in image.array_axis_order]
+
+    def test_to_memmap(self, tmp_path):
+        if "C" not in self.image_class.axis_order:
+            pytest.skip("No channel axis")
+        data = np.arange(2 * 3 * 10 * 20, dtype=np.uint16).reshape((2, 3, 10, 20))
+        image = self.image_class(data, (1, 1, 1), axes_order="CZYX")
+        image_mapped = image.to_memmap(tmp_path)
+        assert len(list(tmp_path.iterdir())) == image.channels
+        assert all(isinstance(x, np.memmap) for x in image_mapped._channel_arrays)
+        assert np.array_equal(image_mapped.get_data(), image.get_data())
+        assert image_mapped.get_ranges() == image.get_ranges()
+        assert image_mapped.channel_names == image.channel_names
+        cut = image_mapped.cut_image(self._cut_slices(image), frame=0)
+        assert np.array_equal(cut.get_data(), image.cut_image(self._cut_slices(image), frame=0).get_data())
+        if self.image_class.axis_order.startswith("C"):
+            assert all(np.shares_memory(x, y) for x, y in zip(cut._channel_arrays, image_mapped._channel_arrays))
+
+    def test_to_memmap_temporary(self):
+        image = self.image_class(np.ones((10, 20), dtype=np.uint8), (1, 1), axes_order="YX")
+        image_mapped = image.to_memmap()
+        path = image_mapped._channel_arrays[0].filename
+        assert os.path.exists(path)
+        del image_mapped
+        gc.collect()
+        assert not os.path.exists(path)
+
+    def test_pickle_memmap(self, tmp_path):
+        if "C" not in self.image_class.axis_order:
+            pytest.skip("No channel axis")
+        data = np.arange(2 * 3 * 10 * 20, dtype=np.uint16).reshape((2, 3, 10, 20))
+        image = self.image_class(data, (1, 1, 1), axes_order="CZYX")
+        image_mapped = image.to_memmap(tmp_path)
+        dumped = pickle.dumps(image_mapped)
+        assert len(dumped) < data.nbytes
+        image_loaded = pickle.loads(dumped)  # noqa: S301
+        assert np.array_equal(image_loaded.get_data(), image.get_data())
+        image_loaded.get_channel(0)[:] = 0
+        assert np.array_equal(image_mapped.get_data(), image.get_data())
+        cut = image_mapped.cut_image(self._cut_slices(image), frame=0)
+        assert np.array_equal(pickle.loads(pickle.dumps(cut)).get_data(), cut.get_data())  # noqa: S301
+        assert np.array_equal(pickle.loads(pickle.dumps(image)).get_data(), image.get_data())  # noqa: S301
+
+    def test_pickle_memmap_temporary(self):
+        image = self.image_class(np.arange(200, dtype=np.uint8).reshape((10, 20)), (1, 1), axes_order="YX")
+        image_mapped = image.to_memmap()
+        path = image_mapped._channel_arrays[0].filename
+        dumped = pickle.dumps(image_mapped)
+        assert len(dumped) > image.get_channel(0).nbytes
+        del image_mapped
+        gc.collect()
+        assert not os.path.exists(path)
+        assert np.array_equal(pickle.loads(dumped).get_data(), image.get_data())  # noqa: S301
+
     def test_axes_pos(self):
         data = np.zeros((10, 10), np.uint8)
         image = self.image_class(data, (1, 1), axes_order="XY")
@@ -479,6 +642,17 @@ class TestMergeImage:
         assert np.all(res_image.get_channel(Channel(1)) == 1)
         assert res_image.dtype == check_dtype
 
+    def test_merge_channel_lazy_ranges(self):
+        image1 = Image(np.full((3, 10, 10), 2, dtype=np.uint8), (1, 1, 1), axes_order="ZYX")
+        image2 = Image(np.full((3, 10, 10), 5, dtype=np.uint8), (1, 1, 1), axes_order="ZYX")
+        res = image1.merge(image2, "C")
+        assert res._ranges is None
+        assert res.get_ranges() == [(2, 2), (5, 5)]
+        assert image1._ranges is None
+        image1.ranges = [(0, 10)]
+        image2.ranges = [(0, 20)]
+        assert image1.merge(image2, "C").get_ranges() == [(0, 10), (0, 20)]
+
     def test_merge_fail(self):
         image1 = Image(data=np.zeros((4, 10, 10), dtype=np.uint8), axes_order="ZXY", image_spacing=(1, 1, 1))
         image2 = Image(data=np.zeros((3, 10, 10), dtype=np.uint8), axes_order="ZXY", image_spacing=(1, 1, 1))
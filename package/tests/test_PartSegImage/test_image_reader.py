@@ -1,6 +1,8 @@
 # pylint: disable=no-self-use
+import itertools
 import math
 import os.path
+import pickle  # nosec
 import shutil
 from glob import glob
 from io import BytesIO
@@ -13,6 +15,14 @@ import PartSegData
 from PartSegImage import CziImageReader, GenericImageReader, Image, ObsepImageReader, OifImagReader, TiffImageReader
 
 
+def _is_memmap(array: np.ndarray) -> bool:
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
 class TestImageClass:
     def test_tiff_image_read(self):
         image = TiffImageReader.read_image(PartSegData.segmentation_mask_default_image)
@@ -110,6 +120,184 @@ class TestImageClass:
         with pytest.raises(NotImplementedError, match="Obsep format is not supported"):
             GenericImageReader().read(buffer, ext=".obsep")
 
+    def test_estimate_image_size_tiff(self, tmp_path):
+        data = np.zeros((3, 10, 20, 30), dtype=np.uint16)
+        tifffile.imwrite(tmp_path / "image.tif", data, imagej=True, metadata={"axes": "ZCYX"})
+        assert TiffImageReader.estimate_image_size(tmp_path / "image.tif") == data.nbytes
+        assert GenericImageReader.estimate_image_size(str(tmp_path / "image.tif")) == data.nbytes
+
+    @pytest.mark.parametrize(
+        "file_name", ["test_czi.czi", "Image0003_01.oif", "N2A_H2BGFP_dapi_falloidin_cycling1.oib", "obsep/test.obsep"]
+    )
+    def test_estimate_image_size(self, data_test_dir, file_name):
+        file_path = os.path.join(data_test_dir, file_name)
+        image = GenericImageReader.read_image(file_path)
+        assert GenericImageReader.estimate_image_size(file_path) >= image.get_data().nbytes
+
+    @pytest.mark.parametrize(("axes", "shape"), [("ZCYX", (3, 2, 10, 20)), ("TZCYX", (2, 3, 2, 10, 20))])
+    def test_tiff_lazy_read(self, tmp_path, axes, shape):
+        data = np.arange(np.prod(shape), dtype=np.uint16).reshape(shape)
+        tifffile.imwrite(tmp_path / "image.tif", data, imagej=True, metadata={"axes": axes})
+        image = TiffImageReader.read_image(tmp_path / "image.tif")
+        image_lazy = TiffImageReader.read_image(tmp_path / "image.tif", lazy=True)
+        assert _is_memmap(image_lazy.get_channel(0))
+        assert not _is_memmap(image.get_channel(0))
+        assert np.array_equal(image.get_data(), image_lazy.get_data())
+        assert image.spacing == image_lazy.spacing
+        assert image.ranges == image_lazy.ranges
+        assert np.array_equal(pickle.loads(pickle.dumps(image_lazy)).get_data(), image.get_data())  # noqa: S301
+        image_lazy.get_channel(1)[:] = 0
+        assert np.array_equal(TiffImageReader.read_image(tmp_path / "image.tif").get_data(), image.get_data())
+        # copy on write changes are not visible in file, so data need to be pickled
+        image_loaded = pickle.loads(pickle.dumps(image_lazy))  # noqa: S301
+        assert np.array_equal(image_loaded.get_data(), image_lazy.get_data())
+
+    def test_tiff_lazy_read_fallback(self, tmp_path):
+        data = np.arange(2 * 10 * 20, dtype=np.uint16).reshape((2, 10, 20))
+        tifffile.imwrite(tmp_path / "image.tif", data, compression="zlib")
+        image = TiffImageReader.read_image(tmp_path / "image.tif", lazy=True)
+        assert not _is_memmap(image.get_channel(0))
+        assert np.array_equal(image.get_data_by_axis(C=0, T=0), data)
+        with open(tmp_path / "image.tif", "rb") as f_p:
+            buffer = BytesIO(f_p.read())
+        image = GenericImageReader.read_image(buffer, lazy=True)
+        assert np.array_equal(image.get_data_by_axis(C=0, T=0), data)
+
+    @pytest.mark.parametrize("lazy", [True, False])
+    @pytest.mark.parametrize("compression", [None, "zlib"])
+    def test_tiff_selection(self, tmp_path, lazy, compression):
+        data = np.arange(2 * 3 * 4 * 10 * 20, dtype=np.uint16).reshape((3, 4, 2, 10, 20))
+        tifffile.imwrite(
+            tmp_path / "image.tif",
+            data,
+            imagej=True,
+            compression=compression,
+            metadata={"axes": "TZCYX", "Labels": ["a", "b"]},
+        )
+        image = TiffImageReader.read_image(
+            tmp_path / "image.tif", lazy=lazy, channels=[1], time_range=(1, 3), z_range=(2, 3)
+        )
+        assert image.channels == 1
+        assert image.times == 2
+        assert image.layers == 1
+        assert image.channel_names == ["b"]
+        assert np.array_equal(image.get_channel(0), data[1:3, 2:3, 1])
+        image = GenericImageReader.read_image(tmp_path / "image.tif", lazy=lazy, channels=[1, 0])
+        assert image.channel_names == ["b", "a"]
+        assert np.array_equal(image.get_channel(1), data[:, :, 0])
+
+    def test_tiff_selection_read_only_selected_pages(self, tmp_path, monkeypatch):
+        data = np.arange(2 * 3 * 4 * 10 * 20, dtype=np.uint16).reshape((3, 4, 2, 10, 20))
+        tifffile.imwrite(tmp_path / "image.tif", data, imagej=True, metadata={"axes": "TZCYX"})
+        keys = []
+        asarray = tifffile.TiffFile.asarray
+
+        def _asarray(self, key=None, **kwargs):
+            keys.append(key)
+            return asarray(self, key=key, **kwargs)
+
+        monkeypatch.setattr(tifffile.TiffFile, "asarray", _asarray)
+        image = TiffImageReader.read_image(tmp_path / "image.tif", channels=[0], time_range=(2, 3))
+        assert keys == [[16, 18, 20, 22]]
+        assert np.array_equal(image.get_channel(0), data[2:3, :, 0])
+        with pytest.raises(IndexError, match="Channel index out of range"):
+            TiffImageReader.read_image(tmp_path / "image.tif", channels=[2])
+
+    def test_tiff_selection_channels_in_page(self, tmp_path):
+        data = np.arange(3 * 10 * 20 * 3, dtype=np.uint8).reshape((3, 10, 20, 3))
+        tifffile.imwrite(tmp_path / "image.tif", data, photometric="rgb")
+        image = TiffImageReader.read_image(tmp_path / "image.tif", channels=[2], z_range=(1, 2))
+        assert image.channels == 1
+        assert np.array_equal(image.get_channel(0)[0], data[1:2, ..., 2])
+
+    def test_tiff_selection_with_mask(self, tmp_path):
+        data = np.zeros((4, 2, 10, 20), dtype=np.uint16)
+        mask = np.zeros((4, 10, 20), dtype=np.uint8)
+        mask[1] = 1
+        tifffile.imwrite(tmp_path / "image.tif", data, imagej=True, metadata={"axes": "ZCYX"})
+        tifffile.imwrite(tmp_path / "mask.tif", mask, imagej=True, metadata={"axes": "ZYX"})
+        image = TiffImageReader.read_image(tmp_path / "image.tif", tmp_path / "mask.tif", z_range=(1, 3))
+        assert image.layers == 2
+        assert np.array_equal(image.mask[0], mask[1:3])
+
+    @pytest.mark.parametrize(
+        ("axes", "shape"),
+        [
+            ("BCZYX0", (1, 3, 4, 10, 20, 3)),
+            ("TZCYX", (3, 4, 3, 10, 20)),
+            ("SZYX", (3, 4, 10, 20)),
+            ("ZYX", (4, 10, 20)),
+        ],
+    )
+    @pytest.mark.parametrize(
+        "selection", [{}, {"channels": [2, 0]}, {"time_range": (1, 3), "z_range": (1, 2)}, {"z_range": (3, 9)}]
+    )
+    def test_chunked_read(self, axes, shape, selection):
+        data = np.arange(np.prod(shape), dtype=np.uint32).reshape(shape)
+        reader = CziImageReader()
+        reader.set_selection(**selection)
+        if "C" not in axes and "S" not in axes:
+            reader.channels = None
+        expected = reader._select_data(reader.update_array_shape(data, axes))
+        output = reader._create_output(axes, shape, data.dtype, drop="0")
+        if output is None:
+            # selection outside of axis absent in file
+            assert np.array(expected).size == 0
+            return
+        out, view, indices = output
+        chunk_sizes = [
+            size if letter in "Y0" else size // 2 if letter == "X" else 1 for letter, size in zip(axes, shape)
+        ]
+        for begin in itertools.product(*(range(0, size, step) for size, step in zip(shape, chunk_sizes))):
+            chunk = data[tuple(slice(b, b + step) for b, step in zip(begin, chunk_sizes))]
+            position = reader._chunk_index(indices, begin, chunk.shape, view.shape)
+            if position is not None:
+                view[position[0]] = chunk[position[1]]
+        assert np.array_equal(out, np.array(expected))
+
+    @pytest.mark.parametrize(("cpu_count", "max_workers"), [(None, 1), (1, 1), (8, 4)])
+    def test_czi_read_all_workers(self, monkeypatch, cpu_count, max_workers):
+        class FakeCzi:
+            def asarray(self, out=None, max_workers=None):
+                self.max_workers = max_workers
+                return np.zeros((2, 3), dtype=np.uint8)
+
+        monkeypatch.setattr(os, "cpu_count", lambda: cpu_count)
+        image_file = FakeCzi()
+        CziImageReader._read_all(image_file)
+        assert image_file.max_workers == max_workers
+
+    @pytest.mark.parametrize(("axes", "shape"), [("BCZYX0", (1, 3, 4, 10, 20, 1)), ("TZCYX", (3, 4, 3, 10, 20))])
+    def test_czi_read_all_into_output(self, axes, shape):
+        data = np.arange(np.prod(shape), dtype=np.uint16).reshape(shape)
+
+        class FakeCzi:
+            def __init__(self):
+                self.axes = axes
+                self.shape = shape
+                self.dtype = data.dtype
+                self.out = None
+
+            def asarray(self, out=None, max_workers=None):
+                assert out is not None
+                assert out.shape == shape
+                out[...] = data
+                self.out = out
+                return out
+
+        reader = CziImageReader()
+        image_file = FakeCzi()
+        res = reader._read_data(image_file)
+        assert np.shares_memory(res, image_file.out)
+        assert res.base is None
+        assert np.array_equal(res, reader.update_array_shape(data, axes))
+
+    def test_chunked_read_not_supported_axes(self):
+        reader = CziImageReader()
+        assert reader._create_output("BZYX", (2, 3, 10, 20), np.uint8) is None
+        assert reader._create_output("CSYX", (2, 3, 10, 20), np.uint8) is None
+        assert reader._create_output("CSYX", (2, 1, 10, 20), np.uint8)[0].shape == (2, 1, 1, 10, 20)
+
     def test_decode_int(self):
         assert TiffImageReader.decode_int(0) == [0, 0, 0, 0]
         assert TiffImageReader.decode_int(15) == [0, 0, 0, 15]
@@ -142,6 +330,56 @@ class TestImageClass:
         image = GenericImageReader.read_image(tmp_path / "test.obsep")
         assert image.channels == 3
 
+    def test_obsep_channel_selection(self, data_test_dir):
+        image = ObsepImageReader.read_image(os.path.join(data_test_dir, "obsep", "test.obsep"))
+        image_selected = GenericImageReader.read_image(os.path.join(data_test_dir, "obsep", "test.obsep"), channels=[1])
+        assert image_selected.channels == 1
+        assert np.array_equal(image_selected.get_channel(0), image.get_channel(1))
+
+    def test_obsep_parallel_read(self, tmp_path, monkeypatch):
+        (tmp_path / "test.obsep").write_text(
+            '<root><net><node><attribute name="step width"><double val="0.5"/></attribute>'
+            '<node><attribute name="image type"><string val="DAPI"/></attribute></node>'
+            '<node><attribute name="image type"><string val="Cy5"/></attribute></node></node></net></root>'
+        )
+        for i, name in enumerate(["DAPI", "Cy5", "Cy5_deconv"], start=1):
+            data = np.full((3, 10, 20), i, dtype=np.uint16)
+            tifffile.imwrite(tmp_path / f"{name}.tif", data, imagej=True, metadata={"axes": "ZYX"}, compression="zlib")
+        monkeypatch.setattr(os, "cpu_count", lambda: 4)
+        image = GenericImageReader.read_image(tmp_path / "test.obsep")
+        assert image.channels == 3
+        assert image.get_ranges() == [(1, 1), (2, 2), (3, 3)]
+        assert np.allclose(image.spacing[0], 500 * 10**-9)
+        image = GenericImageReader.read_image(tmp_path / "test.obsep", channels=[2, 0], z_range=(1, 3))
+        assert image.channels == 2
+        assert image.layers == 2
+        assert image.get_ranges() == [(3, 3), (1, 1)]
+        assert np.array_equal(image.get_channel(0), np.full((1, 2, 10, 20), 3, dtype=np.uint16))
+        image = GenericImageReader.read_image(tmp_path / "test.obsep", channels=[1, 1])
+        assert image.get_ranges() == [(2, 2), (2, 2)]
+
+    def test_obsep_single_allocation(self, tmp_path, monkeypatch):
+        (tmp_path / "test.obsep").write_text(
+            '<root><net><node><attribute name="step width"><double val="0.5"/></attribute>'
+            '<node><attribute name="image type"><string val="DAPI"/></attribute></node>'
+            '<node><attribute name="image type"><string val="Cy5"/></attribute></node></node></net></root>'
+        )
+        for i, name in enumerate(["DAPI", "Cy5"], start=1):
+            data = np.full((3, 10, 20), i, dtype=np.uint16)
+            tifffile.imwrite(tmp_path / f"{name}.tif", data, imagej=True, metadata={"axes": "ZYX"})
+        monkeypatch.setattr(Image, "merge", lambda *_: pytest.fail("channels should not be merged"))
+        image = ObsepImageReader.read_image(tmp_path / "test.obsep")
+        assert image.channels == 2
+        assert image.channel_names == ["channel 1", "channel 2"]
+        assert image.get_ranges() == [(1, 1), (2, 2)]
+
+    def test_tiff_max_workers(self, tmp_path):
+        data = np.arange(10 * 20 * 30, dtype=np.uint16).reshape((10, 20, 30))
+        tifffile.imwrite(tmp_path / "image.tif", data, compression="zlib")
+        for max_workers in (1, 4):
+            image = TiffImageReader(max_workers=max_workers).read(tmp_path / "image.tif")
+            assert np.array_equal(image.get_channel(0)[0], data)
+
     def test_double_axes_in_dim_read(self, data_test_dir):
         image = GenericImageReader.read_image(os.path.join(data_test_dir, "double_q_in_axes.tif"))
         assert image.layers == 360
@@ -1,12 +1,16 @@
+import itertools
+from io import BytesIO
+
 import numpy as np
 import numpy.testing as npt
 import pytest
 import tifffile
 from lxml import etree  # nosec
 
+from PartSegImage import image_writer
 from PartSegImage.image import Image
 from PartSegImage.image_reader import TiffImageReader
-from PartSegImage.image_writer import IMAGEJImageWriter, ImageWriter
+from PartSegImage.image_writer import IMAGEJImageWriter, ImageWriter, _downsample_plane
 
 
 @pytest.fixture(scope="module")
@@ -108,3 +112,121 @@ def test_save_mask_imagej(tmp_path):
 
     read_mask = TiffImageReader.read_image(tmp_path / "mask.tif")
     assert np.all(np.isclose(read_mask.spacing, image.spacing))
+
+
+def _reference_downsample(plane, step, labels):
+    height, width = -(-plane.shape[0] // step), -(-plane.shape[1] // step)
+    res = np.zeros((height, width), dtype=plane.dtype)
+    for y, x in itertools.product(range(height), range(width)):
+        block = plane[y * step : (y + 1) * step, x * step : (x + 1) * step]
+        if labels:
+            values, counts = np.unique(block, return_counts=True)
+            res[y, x] = values[np.argmax(counts)]
+        else:
+            res[y, x] = np.rint(np.mean(block))
+    return res
+
+
+@pytest.mark.parametrize("labels", [True, False])
+@pytest.mark.parametrize("step", [1, 2, 3, 4])
+def test_downsample_plane(step, labels):
+    plane = np.random.default_rng(0).integers(0, 5 if labels else 1000, size=(21, 34)).astype(np.uint16)
+    npt.assert_array_equal(_downsample_plane(plane, step, labels), _reference_downsample(plane, step, labels))
+
+
+@pytest.mark.parametrize("axes_order", ["TZYXC", "ZYX"])
+def test_save_pyramid(tmp_path, axes_order):
+    shape = {"TZYXC": (2, 3, 100, 150, 2), "ZYX": (3, 100, 150)}[axes_order]
+    data = np.arange(np.prod(shape), dtype=np.uint16).reshape(shape)
+    image = Image(data, (1, 1, 1), axes_order=axes_order)
+    ImageWriter.save(image, tmp_path / "image.tif", pyramid_levels=2, tile=(32, 64))
+
+    full = image.get_image_for_save()
+    with tifffile.TiffFile(tmp_path / "image.tif") as tiff:
+        assert tiff.is_ome
+        series = tiff.series[0]
+        assert series.pages[0].is_tiled
+        assert series.pages[0].tile == (32, 64)
+        assert len(series.levels) == 3
+        assert [level.shape[-2:] for level in series.levels] == [(100, 150), (50, 75), (25, 38)]
+        for level in range(3):
+            step = 2**level
+            planes = full.reshape((-1, *full.shape[-2:]))
+            expected = np.array([_reference_downsample(plane, step, labels=False) for plane in planes])
+            npt.assert_array_equal(series.levels[level].asarray().reshape(expected.shape), expected)
+
+    read_image = TiffImageReader.read_image(tmp_path / "image.tif")
+    npt.assert_array_equal(read_image.get_channel(0), image.get_channel(0))
+
+
+def test_save_mask_pyramid(tmp_path):
+    data = np.zeros((3, 50, 70), dtype=np.uint8)
+    mask = np.zeros(data.shape, dtype=np.uint8)
+    mask[:, 5:30, 3:40] = 1
+    mask[1:, 20:47, 30:65] = 2
+    mask[2, 1::2, 1::2] = 3
+    image = Image(data, (1, 1, 1), axes_order="ZYX", mask=mask)
+    ImageWriter.save_mask(image, tmp_path / "mask.tif", pyramid_levels=2, tile=(16, 32))
+
+    with tifffile.TiffFile(tmp_path / "mask.tif") as tiff:
+        series = tiff.series[0]
+        assert [level.shape[-2:] for level in series.levels] == [(50, 70), (25, 35), (13, 18)]
+        for level in range(3):
+            step = 2**level
+            expected = np.array([_reference_downsample(plane, step, labels=True) for plane in mask])
+            npt.assert_array_equal(series.levels[level].asarray().reshape(expected.shape), expected)
+            assert set(np.unique(series.levels[level].asarray())) <= {0, 1, 2, 3}
+
+
+def test_save_pyramid_buffer():
+    image = Image(np.ones((5, 40, 40), dtype=np.uint8), (1, 1, 1), axes_order="ZYX")
+    buffer = BytesIO()
+    ImageWriter.save(image, buffer, pyramid_levels=1, tile=(16, 16))
+    buffer.seek(0)
+    with tifffile.TiffFile(buffer) as tiff:
+        assert [level.shape[-2:] for level in tiff.series[0].levels] == [(40, 40), (20, 20)]
+
+
+@pytest.mark.parametrize(("compression", "level"), [("zstd", 10), ("lzw", 5), ("adobe_deflate", None), (None, None)])
+def test_save_compression(tmp_path, compression, level):
+    data = np.zeros((3, 40, 40), dtype=np.uint16)
+    data[1, 10:30, 10:30] = 100
+    image = Image(data, (1, 1, 1), axes_order="ZYX", mask=data > 0)
+    ImageWriter.save(image, tmp_path / "image.tif", compression=compression, compression_level=level)
+    ImageWriter.save_mask(image, tmp_path / "mask.tif", compression=compression, compression_level=level)
+    for name in ("image.tif", "mask.tif"):
+        with tifffile.TiffFile(tmp_path / name) as tiff:
+            assert tiff.pages[0].compression.name == (compression or "none").upper()
+    read_image = TiffImageReader.read_image(tmp_path / "image.tif", tmp_path / "mask.tif")
+    npt.assert_array_equal(read_image.get_channel(0), image.get_channel(0))
+    npt.assert_array_equal(read_image.mask, image.mask)
+
+
+def test_compression_kwargs():
+    assert ImageWriter.compression_kwargs(None, 5) == {"compression": None}
+    assert ImageWriter.compression_kwargs("none", 5) == {"compression": None}
+    assert ImageWriter.compression_kwargs("lzw", 5) == {"compression": "lzw"}
+    assert ImageWriter.compression_kwargs("zstd") == {"compression": "zstd"}
+    assert ImageWriter.compression_kwargs("zstd", 5) == {"compression": "zstd", "compressionargs": {"level": 5}}
+    assert ImageWriter.compression_kwargs("zstd", 30) == {"compression": "zstd", "compressionargs": {"level": 22}}
+    assert ImageWriter.compression_kwargs("adobe_deflate", 22) == {
+        "compression": "adobe_deflate",
+        "compressionargs": {"level": 9},
+    }
+
+
+def test_compression_kwargs_old_tifffile(monkeypatch):
+    monkeypatch.setattr(image_writer, "_COMPRESSIONARGS_SUPPORTED", False)
+    assert ImageWriter.compression_kwargs("zstd", 30) == {"compression": ("zstd", 22)}
+    assert ImageWriter.compression_kwargs("zstd") == {"compression": "zstd"}
+    assert ImageWriter.compression_kwargs(None, 5) == {"compression": None}
+
+
+@pytest.mark.parametrize("compression", ["zstd", "lzw", "adobe_deflate", "deflate", "lzma"])
+def test_save_compression_max_level(tmp_path, compression):
+    data = np.arange(3 * 40 * 40, dtype=np.uint16).reshape((3, 40, 40))
+    image = Image(data, (1, 1, 1), axes_order="ZYX")
+    ImageWriter.save(image, tmp_path / "image.tif", compression=compression, compression_level=22)
+    with tifffile.TiffFile(tmp_path / "image.tif") as tiff:
+        assert tiff.pages[0].compression.name == compression.upper()
+    npt.assert_array_equal(TiffImageReader.read_image(tmp_path / "image.tif").get_channel(0), image.get_channel(0))